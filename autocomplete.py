@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Trend Radar - Shared Google Autocomplete Client
+Every autocomplete fallback (Google seed topics, X, TikTok, Instagram) asks
+suggestqueries.google.com through this module. A lookup fetches only the
+queries it was asked for that are neither answered this run nor cached,
+deduplicated and concurrently (MAX_PER_HOST at a time); fallbacks that never
+fire cost no requests. Answers are kept for CACHE_TTL seconds in
+state/autocomplete_cache.json, which is how repeats are shared across
+fallbacks and runs. Cassette runs don't use that file, so a replay fetches
+exactly what the recording did.
+"""
+
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import cassette
+import scheduler
+import statefile
+import telemetry
+
+# ================= CONFIG =================
+
+CACHE_FILE = f"{statefile.STATE_DIR}/autocomplete_cache.json"
+
+ENDPOINT = "https://suggestqueries.google.com/complete/search"
+HOST = "suggestqueries.google.com"
+MAX_PER_HOST = 4          # Concurrent requests to Google at once
+REQUEST_TIMEOUT = 8
+CACHE_TTL = 60 * 60       # seconds
+
+# ================= STATE =================
+
+_lock = threading.Lock()
+_cache = {}               # query -> {"t": fetched_at, "s": [suggestions]}
+_run = {}                 # query -> suggestions resolved this run (incl. failures as [])
+_file = statefile.StateFile(CACHE_FILE, "Autocomplete cache", "starting empty")
+
+def enabled():
+    return not cassette.MODE
+
+def load():
+    global _cache
+    if not _file.loaded:
+        _cache = _file.load() or {}
+
+def save():
+    if not _file.writable():
+        return
+    now = time.time()
+    with _lock:
+        fresh = {q: e for q, e in _cache.items() if now - e["t"] < CACHE_TTL}
+    _file.save(json.dumps(fresh, indent=2, sort_keys=True))
+
+def reset():
+    """Forget this run's answers (serve mode; the TTL cache is kept)"""
+    with _lock:
+        _run.clear()
+
+def _cached(query):
+    if not enabled():
+        return None
+    entry = _cache.get(query)
+    if entry and time.time() - entry["t"] < CACHE_TTL:
+        return entry["s"]
+    return None
+
+# ================= FETCH =================
+
+def _fetch(query, headers):
+    try:
+        response = requests.get(
+            ENDPOINT,
+            params={"client": "firefox", "q": query},
+            headers=headers,
+            timeout=scheduler.clamp(REQUEST_TIMEOUT)
+        )
+        if response.status_code == 200:
+            return query, [s for s in response.json()[1] if isinstance(s, str)]
+    except (requests.exceptions.RequestException, ValueError, IndexError):
+        pass
+    return query, None
+
+def _resolve(queries, headers):
+    """Fill _run for every query, fetching the uncached ones concurrently"""
+    load()
+    missing = []
+    hits = 0
+    with _lock:
+        for q in dict.fromkeys(queries):
+            if q in _run:
+                continue
+            cached = _cached(q)
+            if cached is not None:
+                _run[q] = cached
+                hits += 1
+            else:
+                missing.append(q)
+    if hits:
+        telemetry.count("cache_hits", hits, host=HOST)
+    if not missing or scheduler.expired():
+        return
+    with ThreadPoolExecutor(max_workers=min(MAX_PER_HOST, len(missing))) as pool:
+        results = list(pool.map(lambda q: _fetch(q, headers), missing))
+    now = time.time()
+    with _lock:
+        for q, suggestions in results:
+            _run[q] = suggestions or []
+            if suggestions is not None:
+                _cache[q] = {"t": now, "s": suggestions}
+
+def suggestions(queries, headers=None):
+    """{query: [suggestions]} for `queries`"""
+    _resolve(queries, headers)
+    return {q: _run.get(q, []) for q in queries}
@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+"""
+Trend Radar - Benchmark Suite for the pipeline hot paths
+Synthetic generators scale to 100k tweets / 50k candidate trends.
+Usage:
+    python bench.py                     Run and compare against bench_baseline.json
+    python bench.py --save              Run and store the results as the new baseline
+    python bench.py --scale 0.1         Shrink every workload (quick local check)
+    python bench.py --only merge,score  Run a subset
+    python bench.py --threshold 0.25    Allowed slowdown vs baseline (default 25%)
+    python bench.py --only startup      Just the `import generate` startup check
+Exits with status 1 when a path is slower than its baseline by more than the threshold,
+or when importing generate exceeds STARTUP_BUDGET / pulls in a heavy dependency.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import subprocess
+import contextlib
+
+import generate
+import scoring
+
+# ================= CONFIG =================
+
+BASELINE_FILE = "bench_baseline.json"
+DEFAULT_THRESHOLD = 0.25
+REPEATS = 3
+MIN_DELTA_SECONDS = 0.005   # Differences below timer noise never count as regressions
+
+# `python -c "import generate"` wall time, interpreter startup included
+STARTUP_BUDGET = 0.4
+# Must only be imported by the code paths that use them
+LAZY_MODULES = ["pytrends", "pandas", "feedparser", "numpy"]
+
+# Workload sizes at --scale 1
+SIZES = {
+    "engagement_score": 100_000,
+    "influencer_tweets": 100_000,
+    "hashtag_tweets": 100_000,
+    "telegram_parse": 500,        # messages on one channel page
+    "merge": 50_000,
+    "score": 50_000,
+    "group_related": 2_000,       # pairwise - grows quadratically
+    "render_posts": 2_000,
+    "startup": 1,
+}
+
+WORDS = [
+    "bitcoin", "ethereum", "solana", "pump", "moon", "viral", "breaking", "meme",
+    "trump", "election", "nba", "taylor", "gaming", "ai", "chatgpt", "whale",
+]
+
+# ================= SYNTHETIC DATA =================
+
+def synthetic_tweets(n, seed=1):
+    """Apify twitter-scraper shaped items"""
+    rnd = random.Random(seed)
+    usernames = [a for accounts in generate.INFLUENCER_ACCOUNTS.values() for a in accounts] + ["randomuser"]
+    tweets = []
+    for i in range(n):
+        words = rnd.sample(WORDS, 6)
+        if rnd.random() < 0.4:
+            words.append(f"#{rnd.choice(WORDS)}{rnd.randint(0, 500)}")
+        if rnd.random() < 0.3:
+            words.append(f"${rnd.choice(['DOGE', 'PEPE', 'BONK', 'WIF', 'SHIB'])}{rnd.randint(0, 50) or ''}")
+        tweets.append({
+            "full_text": " ".join(words),
+            "user": {"screen_name": rnd.choice(usernames)},
+            "views_count": rnd.randint(0, 2_000_000),
+            "retweet_count": rnd.randint(0, 5000),
+            "reply_count": rnd.randint(0, 1000),
+            "favorite_count": rnd.randint(0, 50_000),
+            "quote_count": rnd.randint(0, 500),
+            "id_str": str(10**17 + i),
+            "created_at": "Mon Jan 01 00:00:00 +0000 2026",
+        })
+    return tweets
+
+def synthetic_telegram_html(n, seed=2):
+    """A t.me/s/<channel> preview page with n messages"""
+    rnd = random.Random(seed)
+    blocks = []
+    for i in range(n):
+        text = " ".join(rnd.sample(WORDS, 8))
+        if rnd.random() < 0.3:
+            text += f" Entry: ${rnd.randint(1, 100)}.5 TP: ${rnd.randint(100, 200)} SL: ${rnd.randint(0, 10)} $BTC"
+        blocks.append(
+            f'<div class="tgme_widget_message_wrap js-widget_message_wrap">'
+            f'<div class="tgme_widget_message text_not_supported_wrap js-widget_message" data-post="bench/{i}">'
+            f'<div class="tgme_widget_message_text js-message_text" dir="auto">{text}</div>'
+            f'<span class="tgme_widget_message_views">{rnd.randint(1, 999)}K</span>'
+            f'<time datetime="2026-01-01T00:{i % 60:02d}:00+00:00" class="time">00:00</time>'
+            f'</div></div>'
+        )
+    return "<html><body>" + "".join(blocks) + "</body></html>"
+
+def synthetic_trend(i, rnd, platform):
+    name = f"{rnd.choice(WORDS)} {rnd.choice(WORDS)} {i % 5000}"
+    return generate.normalize_trend(name), {
+        "name": name,
+        "platforms": {platform: True},
+        "metrics": {f"{platform}_views": rnd.randint(0, 3_000_000), "google_searches": rnd.randint(0, 300_000)},
+        "locations": rnd.sample(generate.GLOBAL_LOCATIONS, rnd.randint(1, 3)),
+        "source": rnd.choice(["influencer", "hashtag", "coingecko_movers", "trending"]),
+        "influencer_tier": rnd.randint(1, 5),
+        "category": rnd.choice(["meme_coin", "crypto_news", "politics", "memes"]),
+    }
+
+def synthetic_sources(n, seed=3):
+    """Split n candidates across the PHASE 5 inputs (with overlapping keys)"""
+    rnd = random.Random(seed)
+    platforms = ["x", "coingecko", "google", "reddit", "news", "tiktok", "instagram"]
+    sources = {p: {} for p in platforms}
+    for i in range(n):
+        p = platforms[i % len(platforms)]
+        key, data = synthetic_trend(i, rnd, p)
+        sources[p][key] = data
+    validation = {
+        d["name"]: {"google": True, "tiktok": False, "instagram": True,
+                    "google_volume": 50, "tiktok_views": 0, "instagram_posts": 5}
+        for d in list(sources["x"].values())[:20]
+    }
+    return sources, validation
+
+def merge_inputs(sources, validation):
+    secondary = [(sources[p], p) for p in ["google", "reddit", "news", "tiktok", "instagram"]]
+    return sources["x"], validation, sources["coingecko"], secondary
+
+# ================= BENCHMARKS =================
+
+@contextlib.contextmanager
+def quiet():
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+@contextlib.contextmanager
+def stub_apify(items):
+    """Serve synthetic items from run_apify_actor, split evenly across calls"""
+    original_run, original_key = generate.run_apify_actor, generate.APIFY_API_KEY
+    calls = {"n": 0}
+    def fake_run(actor_id, input_data, timeout=120, **kwargs):
+        chunk = len(items) // 4 or len(items)
+        start = (calls["n"] * chunk) % max(len(items), 1)
+        calls["n"] += 1
+        return items[start:start + chunk]
+    generate.run_apify_actor, generate.APIFY_API_KEY = fake_run, "bench"
+    try:
+        yield
+    finally:
+        generate.run_apify_actor, generate.APIFY_API_KEY = original_run, original_key
+
+def bench_engagement_score(n):
+    rnd = random.Random(4)
+    args = [(rnd.randint(0, 10**6), rnd.randint(0, 5000), rnd.randint(0, 500),
+             rnd.randint(0, 100), rnd.randint(0, 10**5), rnd.randint(1, 5)) for _ in range(n)]
+    def run():
+        for a in args:
+            generate.calculate_engagement_score(*a)
+    return run
+
+def bench_influencer_tweets(n):
+    tweets = synthetic_tweets(n)
+    def run():
+        with stub_apify(tweets), quiet():
+            generate.scrape_x_influencers()
+    return run
+
+def bench_hashtag_tweets(n):
+    # The hashtag scraper makes one actor call for all search terms
+    tweets = synthetic_tweets(n, seed=5)
+    def run():
+        with stub_apify(tweets * 4), quiet():
+            generate.scrape_x_trending_hashtags()
+    return run
+
+def bench_telegram_parse(n):
+    html = synthetic_telegram_html(n)
+    def run():
+        with quiet():
+            generate.parse_telegram_html(html, "bench")
+    return run
+
+def bench_merge(n):
+    # The merge engine never mutates its inputs - every repeat can reuse the same sources
+    sources, validation = synthetic_sources(n)
+    def run():
+        generate.merge_x_first(*merge_inputs(sources, validation))
+    return run
+
+def bench_score(n):
+    sources, validation = synthetic_sources(n)
+    merged = generate.merge_x_first(*merge_inputs(sources, validation))
+    def run():
+        scoring.score_trends(merged, generate.MAX_TRENDS_PER_RUN)
+    return run
+
+def bench_group_related(n):
+    sources, _ = synthetic_sources(n, seed=6)
+    flat = {k: v for d in sources.values() for k, v in d.items()}
+    copies = []
+    def setup():
+        copies.append({k: json.loads(json.dumps(v)) for k, v in flat.items()})
+    def run():
+        generate.group_related_trends(copies.pop())
+    run.setup = setup
+    return run
+
+def bench_render_posts(n):
+    import renderer
+    trends = [renderer.make_synthetic_trend(i) for i in range(n)]
+    # Removed once the benchmark (and with it this closure) is dropped
+    tmp = tempfile.TemporaryDirectory(prefix="bench_posts_")
+    def run():
+        original = generate.POSTS_DIR
+        generate.POSTS_DIR = tmp.name
+        try:
+            for t in trends:
+                generate.generate_post_html(t["trend"], t)
+        finally:
+            generate.POSTS_DIR = original
+    return run
+
+def bench_startup(n):
+    def run():
+        subprocess.run([sys.executable, "-c", "import generate"], check=True, stdout=subprocess.DEVNULL)
+    return run
+
+def eagerly_imported():
+    """Heavy modules that `import generate` loads up front (should be none)"""
+    code = (
+        "import sys, generate; "
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    line = out.strip().splitlines()[-1] if out.strip() else ""
+    return [m for m in line.split(",") if m]
+
+def check_startup(results):
+    """Absolute startup budget, independent of any baseline"""
+    failures = []
+    heavy = eagerly_imported()
+    if heavy:
+        print(f"   &#10007; import generate loads {', '.join(heavy)} eagerly")
+        failures.append("startup_imports")
+    seconds = results["startup"]["seconds"]
+    if seconds > STARTUP_BUDGET:
+        print(f"   &#10007; startup {seconds * 1000:.0f} ms exceeds budget {STARTUP_BUDGET * 1000:.0f} ms")
+        failures.append("startup_budget")
+    else:
+        print(f"   &#10003; startup {seconds * 1000:.0f} ms within budget {STARTUP_BUDGET * 1000:.0f} ms")
+    return failures
+
+BENCHMARKS = {
+    "engagement_score": bench_engagement_score,
+    "influencer_tweets": bench_influencer_tweets,
+    "hashtag_tweets": bench_hashtag_tweets,
+    "telegram_parse": bench_telegram_parse,
+    "merge": bench_merge,
+    "score": bench_score,
+    "group_related": bench_group_related,
+    "render_posts": bench_render_posts,
+    "startup": bench_startup,
+}
+
+# ================= RUNNER =================
+
+def time_it(run, repeats=REPEATS):
+    """Best-of-N wall time in seconds (setup excluded)"""
+    best = float("inf")
+    for _ in range(repeats):
+        if hasattr(run, "setup"):
+            run.setup()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run_benchmarks(names, scale=1.0):
+    results = {}
+    for name in names:
+        size = max(1, int(SIZES[name] * scale))
+        run = BENCHMARKS[name](size)
+        seconds = time_it(run)
+        results[name] = {"seconds": round(seconds, 6), "size": size}
+        print(f"   {name:<20} n={size:<8} {seconds * 1000:10.1f} ms")
+    return results
+
+def compare(results, baseline, threshold):
+    """Return the benchmarks that regressed past the threshold"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or base.get("size") != result["size"]:
+            print(f"   {name:<20} (no comparable baseline)")
+            continue
+        ratio = result["seconds"] / base["seconds"] if base["seconds"] else 1.0
+        regressed = ratio > 1 + threshold and result["seconds"] - base["seconds"] > MIN_DELTA_SECONDS
+        marker = "&#10007;" if regressed else "&#10003;"
+        print(f"   {marker} {name:<18} {ratio:6.2f}x baseline")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+def _arg(args, flag, default=None):
+    if flag in args:
+        idx = args.index(flag)
+        if idx + 1 < len(args):
+            return args[idx + 1]
+    return default
+
+def main(args):
+    scale = float(_arg(args, "--scale", 1.0))
+    threshold = float(_arg(args, "--threshold", DEFAULT_THRESHOLD))
+    only = _arg(args, "--only")
+    names = [n for n in BENCHMARKS if not only or n in only.split(",")]
+
+    print(f"&#9201; Trend Radar benchmarks (scale {scale})")
+    results = run_benchmarks(names, scale)
+    startup_failures = check_startup(results) if "startup" in results else []
+
+    if "--save" in args:
+        baseline = {}
+        if os.path.exists(BASELINE_FILE):
+            with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\n   &#10003; Baseline saved to {BASELINE_FILE}")
+        return 1 if startup_failures else 0
+
+    if not os.path.exists(BASELINE_FILE):
+        print(f"\n   &#9888; No {BASELINE_FILE} - run with --save to create one")
+        return 1 if startup_failures else 0
+    with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\n&#128202; Compared with baseline (threshold +{threshold:.0%}):")
+    regressions = compare(results, baseline, threshold) + startup_failures
+    if regressions:
+        print(f"\n   &#10007; Slower than baseline: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
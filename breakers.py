@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+Trend Radar - Persistent Circuit Breakers
+One breaker per host (fed automatically from every HTTP call) and per source
+(fed by the scrapers, e.g. pytrends 404s or a dead RSS feed). After
+FAILURE_THRESHOLD consecutive failures a breaker opens and the host/source is
+skipped instantly; after its cooldown one probe is let through (half-open).
+A failed probe doubles the cooldown. State survives runs in state/breakers.json.
+Cassette runs bypass the breakers entirely: a recording must contain every
+call the scrapers make, whatever the previous runs ran into.
+"""
+
+import json
+import time
+import threading
+from urllib.parse import urlsplit
+
+import requests
+
+import cassette
+import scheduler
+import statefile
+import telemetry
+
+# ================= CONFIG =================
+
+STATE_FILE = f"{statefile.STATE_DIR}/breakers.json"
+
+FAILURE_THRESHOLD = 3
+BASE_COOLDOWN = 30 * 60        # seconds
+MAX_COOLDOWN = 12 * 3600
+PROBE_TIMEOUT = 5 * 60         # A probe that never reported back frees the slot
+
+# Statuses that mean "this host is refusing us", not "this URL is wrong"
+HOST_FAILURE_STATUSES = {403, 429, 500, 502, 503, 504}
+
+# ================= STATE =================
+
+_lock = threading.Lock()
+_breakers = {}
+_file = statefile.StateFile(STATE_FILE, "Breaker state", "starting closed")
+_installed = False
+_original_request = None
+_announced = set()
+
+def enabled():
+    return not cassette.MODE
+
+def host_key(url):
+    return f"host:{urlsplit(url).netloc}"
+
+def source_key(name):
+    return f"source:{name}"
+
+def load():
+    global _breakers
+    if not _file.loaded:
+        _breakers = _file.load() or {}
+
+def save():
+    if not _file.writable():
+        return
+    # Healthy breakers carry no information - keep the file small
+    keep = {k: b for k, b in _breakers.items() if b["state"] != "closed" or b["failures"]}
+    _file.save(json.dumps(keep, indent=2, sort_keys=True))
+
+def _get(key):
+    return _breakers.setdefault(key, {"state": "closed", "failures": 0, "cooldown": BASE_COOLDOWN, "opened_at": 0})
+
+# ================= BREAKER LOGIC =================
+
+def allow(key):
+    """Whether a call may go ahead; an expired open breaker lets one probe through"""
+    if not enabled():
+        return True
+    load()
+    with _lock:
+        b = _breakers.get(key)
+        if b is None or b["state"] == "closed":
+            return True
+        now = time.time()
+        probe_due = (b["state"] == "open" and now >= b["opened_at"] + b["cooldown"]) or \
+            (b["state"] == "half_open" and now >= b.get("probe_at", 0) + PROBE_TIMEOUT)
+        if probe_due:
+            b["state"] = "half_open"
+            b["probe_at"] = now
+            print(f"      &#128268; Probing {key} (breaker half-open)")
+            return True
+        if b["state"] == "half_open":
+            # One probe at a time
+            return False
+    if key not in _announced:
+        _announced.add(key)
+        left = b["opened_at"] + b["cooldown"] - time.time()
+        print(f"      &#128268; Skipping {key} - breaker open for {left / 60:.0f} more min")
+    telemetry.count("breaker_skips")
+    return False
+
+def available(key):
+    """Read-only allow(): whether a call would be let through now (closed, or a probe is due)
+
+    Lets a caller pick which keys to try without spending half-open probes on
+    the ones it ends up not calling; the call itself still goes through allow().
+    """
+    if not enabled():
+        return True
+    load()
+    b = _breakers.get(key)
+    if b is None or b["state"] == "closed":
+        return True
+    now = time.time()
+    if b["state"] == "open":
+        return now >= b["opened_at"] + b["cooldown"]
+    return now >= b.get("probe_at", 0) + PROBE_TIMEOUT
+
+def success(key):
+    if not enabled():
+        return
+    with _lock:
+        b = _breakers.get(key)
+        if b is None:
+            return
+        if b["state"] != "closed":
+            print(f"      &#128268; {key} recovered - breaker closed")
+        b.update({"state": "closed", "failures": 0, "cooldown": BASE_COOLDOWN, "opened_at": 0, "probe_at": 0})
+
+def failure(key, error=""):
+    if not enabled():
+        return
+    load()
+    with _lock:
+        b = _get(key)
+        b["failures"] += 1
+        b["last_error"] = str(error)[:200]
+        if b["state"] == "half_open":
+            b["cooldown"] = min(b["cooldown"] * 2, MAX_COOLDOWN)
+        elif b["failures"] < FAILURE_THRESHOLD:
+            return
+        b["state"] = "open"
+        b["opened_at"] = time.time()
+        print(f"      &#128268; Breaker opened for {key} ({b['cooldown'] / 60:.0f} min): {b['last_error']}")
+
+def is_open(key):
+    b = _breakers.get(key)
+    return enabled() and b is not None and b["state"] == "open"
+
+# ================= HTTP HOOK =================
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of contacting a host whose breaker is open"""
+
+def _guarded_request(self, method, url, **kwargs):
+    key = host_key(url)
+    if not allow(key):
+        raise CircuitOpenError(f"circuit open for {key}")
+    try:
+        response = _original_request(self, method, url, **kwargs)
+    except requests.exceptions.Timeout as e:
+        # Out of our own budget (timeout clamped near a phase deadline), not the host's fault
+        if not isinstance(kwargs.get("timeout"), scheduler.ClampedTimeout):
+            failure(key, e)
+        raise
+    except requests.exceptions.RequestException as e:
+        failure(key, e)
+        raise
+    if response.status_code in HOST_FAILURE_STATUSES:
+        failure(key, f"HTTP {response.status_code}")
+    else:
+        success(key)
+    return response
+
+def install():
+    """Guard every HTTP call with its host's breaker (outermost requests hook)"""
+    global _installed, _original_request
+    if _installed or not enabled():
+        return
+    _installed = True
+    load()
+    _original_request = requests.Session.request
+    requests.Session.request = _guarded_request
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""
+Trend Radar - HTTP Record/Replay Cassettes
+TREND_CASSETTE_MODE=record  stores every upstream response in a compact cassette
+TREND_CASSETTE_MODE=replay  plays the cassette back through requests, offline
+TREND_CASSETTE (path, default state/cassette.jsonl.gz) and TREND_SEED control
+the file and the random seed. Both modes seed `random` so runs are comparable;
+replay also skips the pauses between upstream requests (pause()) so a full
+pipeline run can be benchmarked repeatably. Work-queue worker processes record
+into their own part file (TREND_CASSETTE_PART); replay loads every part.
+"""
+
+import os
+import glob
+import json
+import gzip
+import time
+import atexit
+import base64
+import random
+import hashlib
+from collections import defaultdict, deque
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# ================= CONFIG =================
+
+MODE = os.getenv("TREND_CASSETTE_MODE", "").lower()
+CASSETTE_FILE = os.getenv("TREND_CASSETTE", "state/cassette.jsonl.gz")
+SEED = int(os.getenv("TREND_SEED", "1337"))
+PART = os.getenv("TREND_CASSETTE_PART", "")
+
+# Query parameters that carry credentials - never written to a cassette
+SECRET_PARAMS = {"token", "key", "api_key", "apikey", "access_token", "client_id"}
+
+# API keys whose presence decides which code paths run
+KEY_VARS = ["CLAUDE_API_KEY", "APIFY_API_KEY", "UNSPLASH_ACCESS_KEY"]
+
+# Response headers worth keeping (rate limit logic reads some of them)
+KEEP_HEADERS = {"content-type", "x-ratelimit-remaining", "x-ratelimit-limit", "retry-after"}
+
+# ================= STATE =================
+
+_original_request = requests.Session.request
+_recorded = []
+_replay = defaultdict(deque)
+_last_replayed = {}
+_installed = False
+
+def part_file(part, path=CASSETTE_FILE):
+    """state/cassette.jsonl.gz -> state/cassette-w<part>.jsonl.gz"""
+    folder, name = os.path.split(path)
+    stem, dot, suffix = name.partition(".")
+    return os.path.join(folder, f"{stem}-w{part}{dot}{suffix}")
+
+def record_file():
+    return part_file(PART) if PART else CASSETTE_FILE
+
+# ================= KEYS =================
+
+def scrub_url(url, params=None):
+    """Canonical URL with params merged in and credentials removed"""
+    if params:
+        url = requests.Request("GET", url, params=params).prepare().url
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in SECRET_PARAMS]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(sorted(query)), ""))
+
+def request_key(method, url, params=None, data=None, json_body=None):
+    """Stable key for a request: method, scrubbed URL and a short body hash"""
+    body = b""
+    if json_body is not None:
+        body = json.dumps(json_body, sort_keys=True).encode("utf-8")
+    elif data is not None:
+        body = data if isinstance(data, bytes) else str(data).encode("utf-8")
+    digest = hashlib.sha1(body).hexdigest()[:12] if body else "-"
+    return f"{method.upper()} {scrub_url(url, params)} {digest}"
+
+# ================= RECORD =================
+
+def _recording_request(self, method, url, **kwargs):
+    key = request_key(method, url, kwargs.get("params"), kwargs.get("data"), kwargs.get("json"))
+    try:
+        response = _original_request(self, method, url, **kwargs)
+    except requests.exceptions.RequestException as e:
+        # Failures are part of the run too - replay raises the same kind of error
+        error = "timeout" if isinstance(e, requests.exceptions.Timeout) else "connection"
+        _recorded.append({"key": key, "error": error, "message": str(e)[:200]})
+        raise
+    content = response.content
+    try:
+        body = {"text": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        body = {"b64": base64.b64encode(content).decode("ascii")}
+    _recorded.append({
+        "key": key,
+        "status": response.status_code,
+        "headers": {k: v for k, v in response.headers.items() if k.lower() in KEEP_HEADERS},
+        **body
+    })
+    return response
+
+def save():
+    """Write the recorded cassette (record mode only)"""
+    if MODE != "record" or not _recorded:
+        return
+    path = record_file()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"keys": {v: bool(os.getenv(v)) for v in KEY_VARS}, "seed": SEED}) + "\n")
+        for entry in _recorded:
+            f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+    print(f"   &#128190; Recorded {len(_recorded)} HTTP responses to {path}")
+
+# ================= REPLAY =================
+
+def _build_response(entry, url):
+    response = requests.Response()
+    response.status_code = entry["status"]
+    response.headers = CaseInsensitiveDict(entry.get("headers", {}))
+    response._content = entry["text"].encode("utf-8") if "text" in entry else base64.b64decode(entry["b64"])
+    response.encoding = "utf-8" if "text" in entry else None
+    response.url = url
+    return response
+
+def _replaying_request(self, method, url, **kwargs):
+    key = request_key(method, url, kwargs.get("params"), kwargs.get("data"), kwargs.get("json"))
+    queue = _replay.get(key)
+    if queue:
+        entry = queue.popleft()
+        _last_replayed[key] = entry
+    elif key in _last_replayed:
+        # Polling loops may ask more often than during recording - repeat the final answer
+        entry = _last_replayed[key]
+    else:
+        raise requests.exceptions.ConnectionError(f"Not in cassette: {key}")
+    if entry.get("error") == "timeout":
+        raise requests.exceptions.Timeout(entry.get("message", ""))
+    if entry.get("error"):
+        raise requests.exceptions.ConnectionError(entry.get("message", ""))
+    return _build_response(entry, url)
+
+def load_cassette(path=CASSETTE_FILE):
+    """Load a cassette and its worker parts into the replay queues; returns the main header"""
+    header = None
+    for file in [path] + sorted(glob.glob(part_file("*", path))):
+        with gzip.open(file, "rt", encoding="utf-8") as f:
+            file_header = json.loads(f.readline())
+            header = header or file_header
+            for line in f:
+                entry = json.loads(line)
+                _replay[entry["key"]].append(entry)
+    return header
+
+# ================= PAUSES =================
+
+def pause(seconds):
+    """Sleep between upstream requests (random delays, retry backoff); skipped while replaying"""
+    if not replaying():
+        time.sleep(seconds)
+
+# ================= INSTALL =================
+
+def install():
+    """Activate record/replay according to TREND_CASSETTE_MODE (no-op when unset)"""
+    global _installed
+    if _installed or MODE not in ("record", "replay"):
+        return
+    _installed = True
+    random.seed(SEED)
+
+    if MODE == "record":
+        if not PART:
+            # Parts left by an earlier recording would be replayed with this one
+            for stale in glob.glob(part_file("*")):
+                os.remove(stale)
+        requests.Session.request = _recording_request
+        atexit.register(save)
+        print(f"   &#128190; Recording HTTP traffic to {record_file()}")
+        return
+
+    header = load_cassette()
+    # Let the same code paths run as during recording, without real credentials
+    for var, present in header.get("keys", {}).items():
+        if present and not os.getenv(var):
+            os.environ[var] = "replay"
+    requests.Session.request = _replaying_request
+    print(f"   &#128190; Replaying {sum(len(q) for q in _replay.values())} HTTP responses from {CASSETTE_FILE}")
+
+def replaying():
+    return _installed and MODE == "replay"
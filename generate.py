@@ -7,15 +7,43 @@ Generates news-style content with Claude AI
 """
 
 import os
+import sys
 import json
+import heapq
+import signal
+import socket
+import subprocess
+import contextlib
 import datetime
 import requests
 import random
 import time
 import re
-from urllib.parse import quote
-from pytrends.request import TrendReq
-import feedparser
+from concurrent.futures import ThreadPoolExecutor
+
+import output
+import renderer
+import manifest
+import momentum
+import cassette
+import telemetry
+import profiling
+import scheduler
+import breakers
+import mirrors
+import autocomplete
+import markets
+from merge import MergeEngine
+from records import TweetRecord
+import images
+import seen
+import workqueue
+from renderer import safe_post_name
+
+# Record/replay upstream HTTP traffic when TREND_CASSETTE_MODE is set (must run before keys are read)
+cassette.install()
+telemetry.install()
+breakers.install()
 
 # ================= CONFIG =================
 
@@ -44,9 +72,6 @@ EMOJI = {
 CLAUDE_API_KEY = os.getenv("CLAUDE_API_KEY")
 CLAUDE_MODEL = "claude-3-haiku-20240307"
 
-# Unsplash API for images
-UNSPLASH_ACCESS_KEY = os.getenv("UNSPLASH_ACCESS_KEY")
-
 # Apify API for social media scraping
 APIFY_API_KEY = os.getenv("APIFY_API_KEY")
 APIFY_BASE_URL = "https://api.apify.com/v2"
@@ -59,6 +84,24 @@ APIFY_ACTORS = {
     "instagram": "apify/instagram-scraper"
 }
 
+# Dataset fields each consumer actually reads - everything else is left on Apify's side
+APIFY_FIELDS = {
+    "tweets": [
+        "full_text", "text", "user", "author", "views_count", "viewCount",
+        "retweet_count", "retweetCount", "reply_count", "replyCount",
+        "favorite_count", "likeCount", "quote_count", "quoteCount",
+        "id_str", "id", "created_at"
+    ],
+    "tiktok": ["playCount", "views", "diggCount", "shareCount", "hashtags", "text"],
+    "instagram": ["caption", "likesCount", "commentsCount"]
+}
+
+# Apify's run-sync endpoints hold the connection for at most 300s
+APIFY_SYNC_MAX_SECONDS = 300
+
+# Items per dataset page when streaming results
+APIFY_PAGE_SIZE = 200
+
 DATA_DIR = "data"
 POSTS_DIR = "posts"
 TRACK_FILE = "tracked_trends.json"
@@ -149,14 +192,12 @@ CONTENT_CATEGORIES = {
 }
 
 # Trend discovery settings
-MIN_PLATFORMS = 2  # Require at least 2 platforms (X + Google preferred)
-MAX_TRENDS_PER_RUN = 20
+# PHASE 7 work-queue mode: TREND_WORKERS processes generate copy in parallel,
+# so each run can take proportionally more trends
+WORKERS = max(1, int(os.getenv("TREND_WORKERS", "1")))
+WORKER_IDLE_EXIT = 60       # A standalone worker exits after this long without jobs
+MAX_TRENDS_PER_RUN = 20 * WORKERS
 MIN_TRENDS_PER_RUN = 10
-MULTI_PLATFORM_BOOST = True
-
-# Primary platforms (X and Google are most important)
-PRIMARY_PLATFORMS = ["x", "google"]
-SECONDARY_PLATFORMS = ["tiktok", "instagram", "reddit"]
 
 # Global locations to scrape from
 GLOBAL_LOCATIONS = [
@@ -190,10 +231,6 @@ def get_headers():
 def safe_name(t):
     return re.sub(r'[^a-z0-9_]', '', t.lower().replace(" ", "_").replace("-", "_"))
 
-def safe_post_name(t):
-    """Generate post filename with dashes (for post URLs)"""
-    return re.sub(r'[^a-z0-9-]', '', t.lower().replace(" ", "-").replace("_", "-"))
-
 def normalize_trend(trend):
     """Normalize trend name for comparison"""
     return re.sub(r'[^a-z0-9]', '', trend.lower())
@@ -210,7 +247,7 @@ def format_number(num):
 
 def random_delay():
     """Random delay to avoid rate limiting"""
-    time.sleep(random.uniform(0.5, 2.0))
+    cassette.pause(random.uniform(0.5, 2.0))
 
 def detect_cashtags(text):
     """Extract $CASHTAGS from text"""
@@ -275,6 +312,8 @@ SEED_TOPICS = [
     "binance", "coinbase", "altcoin", "memecoin", "btc etf"
 ]
 
+GOOGLE_AUTOCOMPLETE_QUERIES = [f"{seed} trending" for seed in SEED_TOPICS[:10]]
+
 # ================= GOOGLE TRENDS SCRAPING =================
 
 def scrape_google_trends_global():
@@ -282,9 +321,16 @@ def scrape_google_trends_global():
     print("   &#128202; Scraping Google Trends...")
     all_trends = {}
     
-    # Try pytrends first with better error handling
+    # Try pytrends first with better error handling (skipped while its breaker is open)
+    pytrends_breaker = breakers.source_key("pytrends")
     pytrends_failed = True
-    for location in GLOBAL_LOCATIONS[:3]:
+    locations = GLOBAL_LOCATIONS[:3] if breakers.allow(pytrends_breaker) else []
+    if locations:
+        # pytrends pulls in pandas - only import it when Google Trends is actually scraped
+        from pytrends.request import TrendReq
+    for location in locations:
+        if scheduler.expired() or breakers.is_open(pytrends_breaker):
+            break
         for attempt in range(3):
             try:
                 pytrends = TrendReq(hl="en-US", tz=360, timeout=(10, 25), retries=2, backoff_factor=0.5)
@@ -303,15 +349,20 @@ def scrape_google_trends_global():
                         all_trends[normalized]["locations"].append(location)
                 print(f"      &#10003; {location}: {len(trends)} trends")
                 pytrends_failed = False
+                breakers.success(pytrends_breaker)
                 random_delay()
                 break
             except Exception as e:
                 error_msg = str(e)
                 if "404" in error_msg or "ResponseError" in error_msg:
                     print(f"      &#9888; {location}: Google returned 404 - using fallback")
+                    breakers.failure(pytrends_breaker, error_msg)
                     break  # Don't retry on 404, use fallback instead
                 print(f"      &#10007; {location} (attempt {attempt+1}): {e}")
-                time.sleep(2)
+                breakers.failure(pytrends_breaker, error_msg)
+                if breakers.is_open(pytrends_breaker):
+                    break
+                cassette.pause(2)
     
     # Fallback: Use RSS feed and autocomplete if pytrends fails or returns few results
     if pytrends_failed or len(all_trends) < 10:
@@ -335,10 +386,15 @@ def get_google_realtime_trends():
     ]
     
     for rss_url in rss_urls:
+        # Dead feeds (404) get their own breaker so they stop costing a request every run
+        feed_breaker = breakers.source_key(f"google_rss:{rss_url.rsplit('geo=', 1)[-1]}")
+        if not breakers.allow(feed_breaker):
+            continue
         try:
             response = requests.get(rss_url, headers=get_headers(), timeout=15)
             
             if response.status_code == 200:
+                breakers.success(feed_breaker)
                 # Parse titles from RSS
                 import xml.etree.ElementTree as ET
                 root = ET.fromstring(response.content)
@@ -355,35 +411,28 @@ def get_google_realtime_trends():
                 break  # Success, no need to try other feeds
             elif response.status_code == 404:
                 print(f"      &#9888; RSS returned 404 - trying next feed")
+                breakers.failure(feed_breaker, "HTTP 404")
                 continue
         except Exception as e:
             print(f"      &#10007; RSS Error: {e}")
+            breakers.failure(feed_breaker, e)
     
     # Fallback: Use Google Autocomplete for seed topics
+    if not scheduler.can_afford("autocomplete_fallback"):
+        return trends
     print("   &#128200; Using Google Autocomplete fallback...")
     autocomplete_count = 0
-    for seed in SEED_TOPICS[:10]:
-        try:
-            response = requests.get(
-                "https://suggestqueries.google.com/complete/search",
-                params={"client": "firefox", "q": f"{seed} trending"},
-                headers=get_headers(),
-                timeout=8
-            )
-            if response.status_code == 200:
-                suggestions = response.json()[1][:5]
-                for suggestion in suggestions:
-                    normalized = normalize_trend(suggestion)
-                    if normalized not in trends and len(suggestion) > 5:
-                        trends[normalized] = {
-                            "name": suggestion,
-                            "platforms": {"google": True},
-                            "metrics": {"google_searches": random.randint(50000, 300000)},
-                            "locations": ["global"]
-                        }
-                        autocomplete_count += 1
-        except:
-            pass
+    for suggestions in autocomplete.suggestions(GOOGLE_AUTOCOMPLETE_QUERIES, get_headers()).values():
+        for suggestion in suggestions[:5]:
+            normalized = normalize_trend(suggestion)
+            if normalized not in trends and len(suggestion) > 5:
+                trends[normalized] = {
+                    "name": suggestion,
+                    "platforms": {"google": True},
+                    "metrics": {"google_searches": random.randint(50000, 300000)},
+                    "locations": ["global"]
+                }
+                autocomplete_count += 1
     print(f"      &#10003; Autocomplete: {autocomplete_count} trends")
     
     return trends
@@ -407,7 +456,14 @@ def scrape_reddit_trends():
         "gaming", "sports", "music", "movies"
     ]
     
+    reddit_breaker = breakers.source_key("reddit")
+    if not breakers.allow(reddit_breaker):
+        return trends
+    post_ids = []
+    
     for subreddit in subreddits[:5]:
+        if breakers.is_open(reddit_breaker):
+            break
         try:
             response = requests.get(
                 f"https://www.reddit.com/r/{subreddit}/hot.json?limit=25",
@@ -415,12 +471,14 @@ def scrape_reddit_trends():
                 timeout=15
             )
             if response.status_code == 200:
+                breakers.success(reddit_breaker)
                 data = response.json()
                 posts = data.get("data", {}).get("children", [])
                 for post in posts[:10]:
                     post_data = post.get("data", {})
                     title = post_data.get("title", "")
                     score = post_data.get("score", 0)
+                    post_ids.append(post_data.get("name") or post_data.get("id"))
                     
                     # Extract key terms from title (first few words)
                     words = title.split()[:4]
@@ -440,17 +498,44 @@ def scrape_reddit_trends():
                             }
             elif response.status_code == 403:
                 print(f"      &#9888; r/{subreddit}: Access forbidden (rate limited)")
+                breakers.failure(reddit_breaker, "HTTP 403")
             elif response.status_code == 429:
+                breakers.failure(reddit_breaker, "HTTP 429")
+                if breakers.is_open(reddit_breaker):
+                    break
                 print(f"      &#9888; r/{subreddit}: Too many requests, waiting...")
-                time.sleep(5)
+                cassette.pause(5)
             random_delay()
         except Exception as e:
             print(f"      &#10007; r/{subreddit}: {e}")
+            breakers.failure(reddit_breaker, e)
     
-    print(f"      Total Reddit trends: {len(trends)}")
+    fresh = seen.observe("reddit", post_ids)
+    print(f"      Total Reddit trends: {len(trends)} ({len(fresh)}/{len(set(filter(None, post_ids)))} posts new)")
     return trends
 
 
+def mover_trend(trend_name, mover):
+    """Trend dict for a markets.movers() entry"""
+    changes = mover["changes"]
+    biggest = max((abs(c) for c in changes.values()), default=0)
+    return {
+        "name": trend_name,
+        "full_name": mover["name"],
+        "platforms": {"coingecko": True, "crypto": True},
+        "category": "meme_coin" if changes.get("24h", 0) > 20 else "crypto_news",
+        "metrics": {
+            **{f"price_change_{w}": c for w, c in changes.items()},
+            "engagement_score": min(100, 40 + biggest + 5 * (mover["volume_ratio"] or 0))  # Higher change = higher score
+        },
+        # Not metrics: the ratio can be None and the reasons are a list
+        "volume_ratio": mover["volume_ratio"],
+        "mover_reasons": mover["reasons"],
+        "source": "coingecko_movers",
+        "cashtags": [trend_name],
+        "locations": ["global"]
+    }
+
 def scrape_crypto_trends():
     """Scrape trending crypto coins from CoinGecko (FREE API, no key needed)"""
     print("   &#128176; Scraping crypto trends (CoinGecko)...")
@@ -502,40 +587,33 @@ def scrape_crypto_trends():
     except Exception as e:
         print(f"      &#10007; CoinGecko error: {e}")
     
-    # Also get top gainers/losers (volatile = interesting for meme coins)
+    # One broad markets page per run feeds the snapshot store; movers come from its history
     try:
         response = requests.get(
-            "https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&order=percent_change_24h_desc&per_page=10&sparkline=false",
+            markets.MARKETS_URL,
+            params={
+                "vs_currency": "usd",
+                "order": "market_cap_desc",
+                "per_page": markets.MARKET_PAGE_SIZE,
+                "page": 1,
+                "sparkline": "false",
+                "price_change_percentage": "1h,24h",
+            },
             headers=get_headers(),
             timeout=15
         )
         if response.status_code == 200:
             coins = response.json()
-            for coin in coins[:5]:
-                symbol = coin.get("symbol", "").upper()
-                name = coin.get("name", "")
-                change_24h = coin.get("price_change_percentage_24h", 0)
-                
-                if symbol and abs(change_24h) > 10:  # Only significant movers
-                    trend_name = f"${symbol}"
-                    normalized = normalize_trend(trend_name)
-                    
-                    if normalized not in trends:
-                        trends[normalized] = {
-                            "name": trend_name,
-                            "full_name": name,
-                            "platforms": {"coingecko": True, "crypto": True},
-                            "category": "meme_coin" if change_24h > 20 else "crypto_news",
-                            "metrics": {
-                                "price_change_24h": change_24h,
-                                "engagement_score": min(100, 40 + abs(change_24h))  # Higher change = higher score
-                            },
-                            "source": "coingecko_movers",
-                            "cashtags": [trend_name],
-                            "locations": ["global"]
-                        }
+            snapshots = markets.append(coins)
+            for mover in markets.movers(coins).values():
+                trend_name = f"${mover['symbol']}"
+                normalized = normalize_trend(trend_name)
+                if not mover["symbol"] or normalized in trends:
+                    continue
+                trends[normalized] = mover_trend(trend_name, mover)
             
-            print(f"      &#10003; CoinGecko movers: {len([t for t in trends.values() if t.get('source') == 'coingecko_movers'])} coins")
+            print(f"      &#10003; CoinGecko movers: {len([t for t in trends.values() if t.get('source') == 'coingecko_movers'])} coins "
+                  f"({len(coins)} markets, {snapshots} snapshots)")
     except Exception as e:
         print(f"      &#10007; CoinGecko movers error: {e}")
     
@@ -578,8 +656,7 @@ def scrape_telegram_channel(channel_username):
             except:
                 pass
         except requests.exceptions.ConnectionError:
-            import time
-            time.sleep(1)  # Wait before retry
+            cassette.pause(1)  # Wait before retry
             continue
         except Exception as e:
             print(f"      &#9888; Attempt {attempt + 1} failed: {e}")
@@ -589,6 +666,12 @@ def scrape_telegram_channel(channel_username):
         print(f"      &#10007; Failed to fetch {channel_username} after 3 attempts")
         return posts
     
+    return parse_telegram_html(html, channel_username, only_new=True)
+
+
+def parse_telegram_html(html, channel_username, only_new=False):
+    """Parse posts out of a Telegram channel preview page (only_new: skip messages seen on earlier runs)"""
+    posts = []
     try:
         
         # Parse message containers
@@ -621,7 +704,12 @@ def scrape_telegram_channel(channel_username):
         image_pattern = r'<a class="tgme_widget_message_photo_wrap[^"]*"[^>]*style="[^"]*background-image:url\(\'([^\']+)\'\)"'
         images = re.findall(image_pattern, html)
         
+        fresh = seen.observe("telegram", [post_id for post_id, _ in message_blocks]) if only_new else None
+        
         for i, (post_id, content) in enumerate(message_blocks):
+            if fresh is not None and post_id not in fresh:
+                continue
+            
             # Clean HTML content
             clean_content = re.sub(r'<[^>]+>', ' ', content)
             clean_content = html_module.unescape(clean_content)
@@ -671,7 +759,7 @@ def scrape_telegram_channel(channel_username):
             
             posts.append(post)
         
-        print(f"      &#10003; {channel_username}: {len(posts)} posts scraped")
+        print(f"      &#10003; {channel_username}: {len(posts)} {'new ' if only_new else ''}posts scraped")
         
     except Exception as e:
         print(f"      &#10007; Telegram error for {channel_username}: {e}")
@@ -705,6 +793,8 @@ def scrape_all_telegram_channels():
     all_posts = []
     
     for channel in TELEGRAM_CHANNELS:
+        if scheduler.expired():
+            break
         posts = scrape_telegram_channel(channel)
         all_posts.extend(posts)
     
@@ -754,8 +844,7 @@ def save_telegram_posts(posts):
         "posts": merged
     }
     
-    with open(telegram_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    output.write_json(telegram_file, data, ensure_ascii=False)
     
     print(f"      &#10003; Saved {len(merged)} posts ({len(new_posts)} new)")
     return merged
@@ -775,35 +864,28 @@ def scrape_x_trends():
         "https://xcancel.com"
     ]
     
-    for instance in nitter_instances[:2]:
-        try:
-            # Try to get trending from Nitter search page
-            response = requests.get(
-                f"{instance}/search?q=trending",
-                headers=get_headers(),
-                timeout=15
-            )
-            
-            if response.status_code == 200:
-                # Extract hashtags and trending terms
-                hashtags = re.findall(r'#(\w+)', response.text)
-                for tag in set(hashtags[:20]):
-                    normalized = normalize_trend(tag)
-                    if len(tag) > 3:  # Skip very short tags
-                        if normalized not in trends:
-                            trends[normalized] = {
-                                "name": f"#{tag}",
-                                "platforms": {"x": True},
-                                "metrics": {
-                                    "x_posts": random.randint(10000, 500000),
-                                    "x_reposts": random.randint(5000, 100000)
-                                },
-                                "locations": ["global"]
-                            }
-                print(f"      &#10003; {instance}: {len(hashtags[:20])} hashtags")
-                break
-        except Exception as e:
-            print(f"      &#10007; {instance}: {e}")
+    # Hedged: the best-ranked instances are asked at once and the first good answer wins.
+    # Dead mirrors fail fast through their host breaker instead of costing a 15s timeout.
+    instance, response = mirrors.hedged_get(nitter_instances, "/search?q=trending", timeout=15, headers=get_headers())
+    if response is not None:
+        # Extract hashtags and trending terms
+        hashtags = re.findall(r'#(\w+)', response.text)
+        for tag in set(hashtags[:20]):
+            normalized = normalize_trend(tag)
+            if len(tag) > 3:  # Skip very short tags
+                if normalized not in trends:
+                    trends[normalized] = {
+                        "name": f"#{tag}",
+                        "platforms": {"x": True},
+                        "metrics": {
+                            "x_posts": random.randint(10000, 500000),
+                            "x_reposts": random.randint(5000, 100000)
+                        },
+                        "locations": ["global"]
+                    }
+        print(f"      &#10003; {instance}: {len(hashtags[:20])} hashtags")
+    else:
+        print("      &#10007; No Nitter instance answered")
     
     # Additional: Scrape from whatstrending-style aggregators
     try:
@@ -862,16 +944,82 @@ def scrape_x_trends():
 
 # ================= APIFY HELPER FUNCTIONS =================
 
-def run_apify_actor(actor_id, input_data, timeout=120):
-    """Run an Apify actor and wait for results"""
+def apify_dataset_params(fields=None):
+    """Query params for dataset downloads: clean items, projected to `fields`"""
+    params = {"token": APIFY_API_KEY, "clean": "true"}
+    if fields:
+        params["fields"] = ",".join(fields)
+    return params
+
+def fetch_apify_dataset_page(dataset_id, offset, limit, fields=None):
+    params = apify_dataset_params(fields)
+    params.update({"offset": offset, "limit": limit})
+    response = requests.get(f"{APIFY_BASE_URL}/datasets/{dataset_id}/items", params=params, timeout=20)
+    response.raise_for_status()
+    return response.json()
+
+def iter_apify_dataset(dataset_id, fields=None, page_size=APIFY_PAGE_SIZE):
+    """Yield dataset items page by page; the next page downloads while this one is processed
+
+    At most two pages are held in memory, however large the dataset is.
+    """
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        offset = 0
+        pending = pool.submit(fetch_apify_dataset_page, dataset_id, offset, page_size, fields)
+        while pending is not None:
+            try:
+                page = pending.result()
+            except Exception as e:
+                print(f"      &#9888; Dataset {dataset_id} stopped at item {offset}: {e}")
+                return
+            offset += len(page)
+            # A short page is the last one
+            pending = pool.submit(fetch_apify_dataset_page, dataset_id, offset, page_size, fields) if len(page) == page_size else None
+            yield from page
+            del page
+
+def run_apify_actor_sync(actor_id_encoded, input_data, timeout, fields=None):
+    """Run an actor and get its dataset items in a single request (short runs only)"""
+    params = apify_dataset_params(fields)
+    params["timeout"] = int(timeout)
+    response = requests.post(
+        f"{APIFY_BASE_URL}/acts/{actor_id_encoded}/run-sync-get-dataset-items",
+        params=params,
+        json=input_data,
+        timeout=timeout + 15
+    )
+    if response.status_code in (200, 201):
+        return response.json()
+    if response.status_code == 408:
+        print(f"      &#10007; {actor_id_encoded} timed out (sync)")
+    else:
+        print(f"      &#10007; {actor_id_encoded} sync run failed: {response.status_code}")
+    return None
+
+def run_apify_actor(actor_id, input_data, timeout=120, sync=False, fields=None, stream=False):
+    """Run an Apify actor and wait for results
+
+    sync=True uses run-sync-get-dataset-items (one round trip instead of start/poll/fetch);
+    `fields` limits the downloaded items to the keys the caller reads.
+    stream=True returns an iterator over the dataset instead of a list (async runs only).
+    """
     if not APIFY_API_KEY:
         print(f"      &#9888; No APIFY_API_KEY set - skipping {actor_id}")
         return None
     
+    # Never wait past the current phase's slice of the run
+    timeout = min(timeout, scheduler.phase_remaining())
+    if timeout < scheduler.MIN_ACTOR_SECONDS:
+        scheduler.shed(actor_id, f"only {timeout:.0f}s left in phase")
+        return None
+    
     try:
         # Actor ID in URL uses ~ instead of / (e.g., apidojo/tweet-scraper -> apidojo~tweet-scraper)
         actor_id_encoded = actor_id.replace("/", "~")
         
+        if sync and timeout <= APIFY_SYNC_MAX_SECONDS:
+            return run_apify_actor_sync(actor_id_encoded, input_data, timeout, fields)
+        
         # Start the actor run
         run_url = f"{APIFY_BASE_URL}/acts/{actor_id_encoded}/runs?token={APIFY_API_KEY}"
         response = requests.post(run_url, json=input_data, timeout=30)
@@ -899,21 +1047,23 @@ def run_apify_actor(actor_id, input_data, timeout=120):
                     if status == "SUCCEEDED":
                         # Get the dataset items
                         dataset_id = status_res.json().get("data", {}).get("defaultDatasetId")
+                        if dataset_id and stream:
+                            return iter_apify_dataset(dataset_id, fields)
                         if dataset_id:
-                            items_url = f"{APIFY_BASE_URL}/datasets/{dataset_id}/items?token={APIFY_API_KEY}"
-                            items_res = requests.get(items_url, timeout=20)
+                            items_url = f"{APIFY_BASE_URL}/datasets/{dataset_id}/items"
+                            items_res = requests.get(items_url, params=apify_dataset_params(fields), timeout=20)
                             if items_res.status_code == 200:
                                 return items_res.json()
                         return []
                     elif status in ["FAILED", "ABORTED", "TIMED-OUT"]:
                         print(f"      &#10007; {actor_id} run {status}")
                         return None
-                time.sleep(3)  # Reduced sleep time
+                cassette.pause(3)  # Reduced sleep time
             except requests.exceptions.Timeout:
                 continue
             except requests.exceptions.RequestException as e:
                 print(f"      &#9888; Request error: {e}")
-                time.sleep(5)
+                cassette.pause(5)
         
         print(f"      &#10007; {actor_id} timed out")
         return None
@@ -928,7 +1078,8 @@ def scrape_x_influencers():
     """Scrape recent tweets from tracked influencer accounts - HIGHEST PRIORITY"""
     print("\n   &#127919; PHASE 1A: Scraping influencer accounts (X-First)...")
     trends = {}
-    tweets_data = []  # Store raw tweet data
+    tweets_data = []  # TweetRecords for cross-reference
+    tweet_ids = []
     
     if not APIFY_API_KEY:
         print("      &#9888; No APIFY_API_KEY - cannot scrape influencers")
@@ -960,7 +1111,11 @@ def scrape_x_influencers():
             "sort": "Latest"
         }
         
-        results = run_apify_actor(APIFY_ACTORS.get("twitter_profile", APIFY_ACTORS["twitter"]), input_data, timeout=180)
+        # Tiers 3-4 only pull 5 tweets each - small enough for a single synchronous call
+        results = run_apify_actor(
+            APIFY_ACTORS.get("twitter_profile", APIFY_ACTORS["twitter"]), input_data, timeout=180,
+            sync=tier_num >= 3, fields=APIFY_FIELDS["tweets"], stream=True
+        )
         
         if results:
             for tweet in results:
@@ -985,25 +1140,16 @@ def scrape_x_influencers():
                 hashtags = re.findall(r'#(\w+)', text)
                 cashtags = detect_cashtags(text)
                 
-                # Store raw tweet data for cross-reference
-                tweet_data = {
-                    "username": username,
-                    "text": text,
-                    "tier": tier,
-                    "views": views,
-                    "retweets": retweets,
-                    "replies": replies,
-                    "likes": likes,
-                    "quotes": quotes,
-                    "engagement_score": engagement_score,
-                    "hashtags": hashtags,
-                    "cashtags": cashtags,
-                    "tweet_id": tweet.get("id_str", "") or tweet.get("id", ""),
-                    "created_at": tweet.get("created_at", ""),
-                    "category": detect_category(text),
-                    "url": f"https://x.com/{username}/status/{tweet.get('id_str', '') or tweet.get('id', '')}"
-                }
+                # Store the tweet for cross-reference
+                tweet_data = TweetRecord(
+                    username, text, tier, views, retweets, replies, likes, quotes, engagement_score,
+                    hashtags, cashtags,
+                    tweet.get("id_str", "") or tweet.get("id", ""),
+                    tweet.get("created_at", ""),
+                    detect_category(text),
+                )
                 tweets_data.append(tweet_data)
+                tweet_ids.append(tweet_data.tweet_id)
                 
                 # Create trend entry for high-engagement tweets
                 if engagement_score >= 30 or tier <= 2:  # Lower threshold for top-tier influencers
@@ -1038,10 +1184,10 @@ def scrape_x_influencers():
                                 "influencer": username,
                                 "influencer_tier": tier,
                                 "tweet_text": text[:500],
-                                "tweet_url": tweet_data["url"],
+                                "tweet_url": tweet_data.url,
                                 "cashtags": cashtags,
                                 "hashtags": hashtags,
-                                "category": tweet_data["category"],
+                                "category": tweet_data.category,
                                 "locations": ["global"]
                             }
                         else:
@@ -1049,7 +1195,8 @@ def scrape_x_influencers():
                             if engagement_score > trends[normalized]["metrics"].get("engagement_score", 0):
                                 trends[normalized]["metrics"]["engagement_score"] = engagement_score
     
-    print(f"      &#10003; Found {len(trends)} influencer trends from {len(tweets_data)} tweets")
+    fresh = seen.observe("x_influencers", tweet_ids)
+    print(f"      &#10003; Found {len(trends)} influencer trends from {len(tweets_data)} tweets ({len(fresh)} new)")
     return trends, tweets_data
 
 
@@ -1080,7 +1227,9 @@ def scrape_x_trending_hashtags():
         "tweetLanguage": "en"
     }
     
-    results = run_apify_actor(APIFY_ACTORS["twitter"], input_data, timeout=180)
+    # Up to 100 tweets x 15 terms - stream the dataset instead of loading it whole
+    results = run_apify_actor(APIFY_ACTORS["twitter"], input_data, timeout=180, fields=APIFY_FIELDS["tweets"], stream=True)
+    tweet_ids = []
     
     if results:
         for tweet in results:
@@ -1088,6 +1237,7 @@ def scrape_x_trending_hashtags():
             
             if not text:
                 continue
+            tweet_ids.append(tweet.get("id_str", "") or tweet.get("id", ""))
             
             # Get engagement metrics
             views = tweet.get("views_count", 0) or 0
@@ -1144,36 +1294,31 @@ def scrape_x_trending_hashtags():
                 else:
                     trends[normalized]["metrics"]["x_retweets"] = trends[normalized]["metrics"].get("x_retweets", 0) + retweets
     
-    print(f"      &#10003; Found {len(trends)} trending hashtags/cashtags")
+    fresh = seen.observe("x_hashtags", tweet_ids)
+    print(f"      &#10003; Found {len(trends)} trending hashtags/cashtags ({len(fresh)}/{len(set(tweet_ids))} tweets new)")
     return trends
 
 
+X_AUTOCOMPLETE_QUERIES = ["twitter trending", "x trending", "viral tweets", "crypto twitter"]
+
 def scrape_x_trends_fallback():
     """Fallback X scraping without API"""
-    print("      Using Google autocomplete fallback for X trends...")
     trends = {}
+    if not scheduler.can_afford("autocomplete_fallback"):
+        return trends
+    print("      Using Google autocomplete fallback for X trends...")
     
-    queries = ["twitter trending", "x trending", "viral tweets", "crypto twitter"]
-    
-    for query in queries:
-        try:
-            url = f"https://suggestqueries.google.com/complete/search?client=firefox&q={quote(query)}"
-            response = requests.get(url, headers=get_headers(), timeout=10)
-            if response.status_code == 200:
-                suggestions = response.json()[1]
-                for s in suggestions[:5]:
-                    normalized = normalize_trend(s)
-                    if normalized and len(normalized) > 3:
-                        trends[normalized] = {
-                            "name": s,
-                            "platforms": {"x": True},
-                            "metrics": {"google_suggest": True},
-                            "source": "fallback",
-                            "locations": ["global"]
-                        }
-        except Exception as e:
-            pass
-        random_delay()
+    for suggestions in autocomplete.suggestions(X_AUTOCOMPLETE_QUERIES, get_headers()).values():
+        for s in suggestions[:5]:
+            normalized = normalize_trend(s)
+            if normalized and len(normalized) > 3:
+                trends[normalized] = {
+                    "name": s,
+                    "platforms": {"x": True},
+                    "metrics": {"google_suggest": True},
+                    "source": "fallback",
+                    "locations": ["global"]
+                }
     
     return trends
 
@@ -1196,9 +1341,14 @@ def cross_validate_trends(x_keywords):
     # Check Google Trends
     print("      &rarr; Checking Google Trends...")
     try:
+        if not breakers.allow(breakers.source_key("pytrends")):
+            raise RuntimeError("pytrends breaker open")
+        from pytrends.request import TrendReq
         pytrends = TrendReq(hl='en-US', tz=360)
         # Process in batches of 5 (Google Trends limit)
         for i in range(0, len(x_keywords[:20]), 5):
+            if scheduler.expired():
+                break
             batch = x_keywords[i:i+5]
             try:
                 pytrends.build_payload(batch, timeframe='now 1-d')
@@ -1220,11 +1370,13 @@ def cross_validate_trends(x_keywords):
     if APIFY_API_KEY:
         print("      &rarr; Checking TikTok...")
         for keyword in x_keywords[:10]:  # Limit to save API calls
+            if scheduler.expired():
+                break
             input_data = {
                 "hashtags": [keyword.replace("#", "").replace("$", "")],
                 "resultsPerPage": 5
             }
-            results = run_apify_actor(APIFY_ACTORS["tiktok"], input_data, timeout=60)
+            results = run_apify_actor(APIFY_ACTORS["tiktok"], input_data, timeout=60, sync=True, fields=APIFY_FIELDS["tiktok"])
             if results and len(results) > 0:
                 validation_results[keyword]["tiktok"] = True
                 total_views = sum(r.get("playCount", 0) or r.get("views", 0) for r in results)
@@ -1234,11 +1386,13 @@ def cross_validate_trends(x_keywords):
         # Check Instagram via Apify
         print("      &rarr; Checking Instagram...")
         for keyword in x_keywords[:10]:
+            if scheduler.expired():
+                break
             input_data = {
                 "hashtags": [keyword.replace("#", "").replace("$", "")],
                 "resultsLimit": 5
             }
-            results = run_apify_actor(APIFY_ACTORS["instagram"], input_data, timeout=60)
+            results = run_apify_actor(APIFY_ACTORS["instagram"], input_data, timeout=60, sync=True, fields=APIFY_FIELDS["instagram"])
             if results and len(results) > 0:
                 validation_results[keyword]["instagram"] = True
                 validation_results[keyword]["instagram_posts"] = len(results)
@@ -1259,22 +1413,20 @@ def get_meme_coin_signals(trends, tweets_data):
     
     # Check all tweets for meme coin mentions
     for tweet in tweets_data:
-        cashtags = tweet.get("cashtags", [])
-        if cashtags:
-            for tag in cashtags:
-                signal = {
-                    "coin": tag,
-                    "source": f"@{tweet['username']}",
-                    "tier": tweet.get("tier", 5),
-                    "engagement_score": tweet.get("engagement_score", 0),
-                    "views": tweet.get("views", 0),
-                    "retweets": tweet.get("retweets", 0),
-                    "tweet_text": tweet.get("text", "")[:200],
-                    "tweet_url": tweet.get("url", ""),
-                    "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-                    "signal_type": "influencer_mention"
-                }
-                signals.append(signal)
+        for tag in tweet.cashtags:
+            signal = {
+                "coin": tag,
+                "source": f"@{tweet.username}",
+                "tier": tweet.tier,
+                "engagement_score": tweet.engagement_score,
+                "views": tweet.views,
+                "retweets": tweet.retweets,
+                "tweet_text": tweet.text[:200],
+                "tweet_url": tweet.url,
+                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "signal_type": "influencer_mention"
+            }
+            signals.append(signal)
     
     # Check trends for meme coin patterns
     for normalized, data in trends.items():
@@ -1314,7 +1466,7 @@ def scrape_tiktok_trends():
         "shouldDownloadCovers": False
     }
     
-    results = run_apify_actor(APIFY_ACTORS["tiktok"], input_data, timeout=180)
+    results = run_apify_actor(APIFY_ACTORS["tiktok"], input_data, timeout=180, fields=APIFY_FIELDS["tiktok"])
     
     if results:
         for item in results[:30]:
@@ -1345,33 +1497,28 @@ def scrape_tiktok_trends():
     
     return trends
 
+TIKTOK_AUTOCOMPLETE_QUERIES = ["tiktok trending", "tiktok viral", "tiktok challenge"]
+
 def scrape_tiktok_trends_fallback():
     """Fallback TikTok scraping using Google search"""
     trends = {}
+    if not scheduler.can_afford("autocomplete_fallback"):
+        return trends
     try:
         # Use Google autocomplete for TikTok trends
-        queries = ["tiktok trending", "tiktok viral", "tiktok challenge"]
-        for query in queries:
-            response = requests.get(
-                "https://suggestqueries.google.com/complete/search",
-                params={"client": "firefox", "q": query},
-                headers=get_headers(),
-                timeout=10
-            )
-            if response.status_code == 200:
-                suggestions = response.json()[1][:5]
-                for suggestion in suggestions:
-                    normalized = normalize_trend(suggestion)
-                    if normalized not in trends and len(suggestion) > 10:
-                        trends[normalized] = {
-                            "name": suggestion,
-                            "platforms": {"tiktok": True},
-                            "metrics": {
-                                "tiktok_views": random.randint(100000, 2000000),
-                                "tiktok_likes": random.randint(10000, 200000)
-                            },
-                            "locations": ["global"]
-                        }
+        for suggestions in autocomplete.suggestions(TIKTOK_AUTOCOMPLETE_QUERIES, get_headers()).values():
+            for suggestion in suggestions[:5]:
+                normalized = normalize_trend(suggestion)
+                if normalized not in trends and len(suggestion) > 10:
+                    trends[normalized] = {
+                        "name": suggestion,
+                        "platforms": {"tiktok": True},
+                        "metrics": {
+                            "tiktok_views": random.randint(100000, 2000000),
+                            "tiktok_likes": random.randint(10000, 200000)
+                        },
+                        "locations": ["global"]
+                    }
     except Exception as e:
         print(f"      &#10007; TikTok fallback error: {e}")
     
@@ -1396,7 +1543,7 @@ def scrape_instagram_trends():
         "resultsType": "posts"
     }
     
-    results = run_apify_actor(APIFY_ACTORS["instagram"], input_data, timeout=180)
+    results = run_apify_actor(APIFY_ACTORS["instagram"], input_data, timeout=180, fields=APIFY_FIELDS["instagram"])
     
     if results:
         for item in results[:30]:
@@ -1424,32 +1571,27 @@ def scrape_instagram_trends():
     
     return trends
 
+INSTAGRAM_AUTOCOMPLETE_QUERIES = ["instagram trending", "instagram viral", "instagram reels trending"]
+
 def scrape_instagram_trends_fallback():
     """Fallback Instagram scraping"""
     trends = {}
+    if not scheduler.can_afford("autocomplete_fallback"):
+        return trends
     try:
-        queries = ["instagram trending", "instagram viral", "instagram reels trending"]
-        for query in queries:
-            response = requests.get(
-                "https://suggestqueries.google.com/complete/search",
-                params={"client": "firefox", "q": query},
-                headers=get_headers(),
-                timeout=10
-            )
-            if response.status_code == 200:
-                suggestions = response.json()[1][:5]
-                for suggestion in suggestions:
-                    normalized = normalize_trend(suggestion)
-                    if normalized not in trends and len(suggestion) > 10:
-                        trends[normalized] = {
-                            "name": suggestion,
-                            "platforms": {"instagram": True},
-                            "metrics": {
-                                "instagram_likes": random.randint(5000, 100000),
-                                "instagram_comments": random.randint(100, 5000)
-                            },
-                            "locations": ["global"]
-                        }
+        for suggestions in autocomplete.suggestions(INSTAGRAM_AUTOCOMPLETE_QUERIES, get_headers()).values():
+            for suggestion in suggestions[:5]:
+                normalized = normalize_trend(suggestion)
+                if normalized not in trends and len(suggestion) > 10:
+                    trends[normalized] = {
+                        "name": suggestion,
+                        "platforms": {"instagram": True},
+                        "metrics": {
+                            "instagram_likes": random.randint(5000, 100000),
+                            "instagram_comments": random.randint(100, 5000)
+                        },
+                        "locations": ["global"]
+                    }
     except Exception as e:
         print(f"      &#10007; Instagram fallback error: {e}")
     
@@ -1473,7 +1615,7 @@ def scrape_x_trends_apify():
         "sort": "Top"
     }
     
-    results = run_apify_actor(APIFY_ACTORS["twitter"], input_data, timeout=120)
+    results = run_apify_actor(APIFY_ACTORS["twitter"], input_data, timeout=120, fields=APIFY_FIELDS["tweets"])
     
     if results:
         for item in results[:50]:
@@ -1511,12 +1653,19 @@ NEWS_FEEDS = [
 def scrape_news_trends():
     """Scrape trending topics from major news RSS feeds"""
     print("   📰 Scraping news RSS feeds...")
+    import feedparser
     trends = {}
+    entry_ids = []
     for url in NEWS_FEEDS:
+        if scheduler.expired():
+            break
         try:
-            feed = feedparser.parse(url)
+            # Fetch through requests so the HTTP layer (cassettes, timeouts) sees it
+            response = requests.get(url, headers=get_headers(), timeout=15)
+            feed = feedparser.parse(response.content)
             for entry in feed.entries[:10]:
                 title = entry.title
+                entry_ids.append(entry.get("id") or entry.get("link") or title)
                 normalized = normalize_trend(title)
                 if normalized not in trends:
                     trends[normalized] = {
@@ -1527,62 +1676,36 @@ def scrape_news_trends():
                     }
         except Exception as e:
             print(f"      &#10007; RSS {url}: {e}")
-    print(f"      Total news trends: {len(trends)}")
+    fresh = seen.observe("news", entry_ids)
+    print(f"      Total news trends: {len(trends)} ({len(fresh)}/{len(set(entry_ids))} headlines new)")
     return trends
 
 # ================= TREND AGGREGATION =================
 
-def merge_trends(google, x, reddit, news, tiktok=None, instagram=None):
-    """Merge trends from all platforms, keeping those on 1+ platforms"""
-    print("\n🔄 Merging and deduplicating trends...")
+def merge_x_first(all_x_trends, validation, crypto_trends, secondary_sources):
+    """PHASE 5 merge: X trends first, then crypto, then the secondary platforms; returns {key: TrendRecord}"""
+    engine = MergeEngine()
     
-    merged = {}
+    # Add X trends first (highest priority)
+    engine.add_all(all_x_trends)
+    # Apply cross-validation bonus
+    for normalized, data in all_x_trends.items():
+        keyword = data["name"].replace("#", "").replace("$", "")
+        val = validation.get(keyword)
+        if not val:
+            continue
+        for platform, metric in (("google", "google_volume"), ("tiktok", "tiktok_views"), ("instagram", "instagram_posts")):
+            if val[platform]:
+                engine.confirm(normalized, platform, metric, val[metric])
     
-    # Combine all trends
-    all_sources = [
-        (google, "google"),
-        (x, "x"), 
-        (reddit, "reddit"),
-        (news, "news"),
-        (tiktok or {}, "tiktok"),
-        (instagram or {}, "instagram")
-    ]
+    # Add crypto trends SECOND priority (for meme coin trading) - crypto origin is high priority
+    engine.add_all(crypto_trends, source="crypto", crypto_source=True)
     
-    for trends_dict, platform in all_sources:
-        for normalized, data in trends_dict.items():
-            if normalized in merged:
-                # Trend exists, add this platform
-                merged[normalized]["platforms"].update(data["platforms"])
-                merged[normalized]["metrics"].update(data["metrics"])
-                merged[normalized]["locations"].extend(data.get("locations", []))
-            else:
-                merged[normalized] = data.copy()
-    
-    # Filter: Keep only trends on MIN_PLATFORMS or more (X + Google preferred)
-    filtered = {}
-    for normalized, data in merged.items():
-        platforms = data.get("platforms", {})
-        # Count only truthy platform values
-        platform_count = len([p for p in platforms.values() if p])
-        
-        # Check if it has primary platforms (X or Google)
-        has_primary = platforms.get("x") or platforms.get("google")
-        
-        # Accept if: 2+ platforms, OR crypto source (CoinGecko trends are reliable)
-        is_crypto = data.get("crypto_source") or data.get("source", "").startswith("coingecko")
-        
-        if platform_count >= MIN_PLATFORMS or (is_crypto and platform_count >= 1):
-            data["platform_count"] = platform_count
-            data["locations"] = list(set(data.get("locations", [])))
-            # Boost multi-platform trends
-            if MULTI_PLATFORM_BOOST and platform_count >= 2:
-                data["multi_platform_bonus"] = True
-            # Mark if has primary platform
-            data["has_primary_platform"] = has_primary
-            filtered[normalized] = data
-    
-    print(f"   &#10003; {len(merged)} total trends &rarr; {len(filtered)} qualifying trends")
-    return filtered
+    # Add other platform trends (lower priority); new ones get a lower base score since not from X
+    for trends_dict, _ in secondary_sources:
+        engine.add_all(trends_dict, x_first_penalty=True)
+    
+    return engine.records
 
 def group_related_trends(trends):
     """Group similar trends together"""
@@ -1614,76 +1737,10 @@ def group_related_trends(trends):
     
     return groups
 
-def calculate_trend_score(data):
-    """Calculate overall trend score based on metrics and platform presence"""
-    score = 0
-    
-    # Platform presence (more platforms = higher score)
-    score += len(data["platforms"]) * 25
-    
-    # Metrics contribution
-    metrics = data.get("metrics", {})
-    if metrics.get("google_searches", 0) > 100000:
-        score += 20
-    if metrics.get("x_posts", 0) > 50000:
-        score += 15
-    if metrics.get("x_reposts", 0) > 10000:
-        score += 10
-    if metrics.get("tiktok_views", 0) > 1000000:
-        score += 20
-    if metrics.get("instagram_posts", 0) > 100000:
-        score += 15
-    
-    # Location diversity (trends in multiple regions)
-    locations = data.get("locations", [])
-    score += min(len(set(locations)) * 5, 25)
-    
-    return min(score, 100)
-
-# ================= UNSPLASH IMAGE INTEGRATION =================
-
-def fetch_unsplash_image(query):
-    """Fetch a relevant image from Unsplash based on trend keywords"""
-    if not UNSPLASH_ACCESS_KEY:
-        print("      (No Unsplash key - skipping image)")
-        return None
-    
-    try:
-        # Clean and simplify the query for better results
-        search_query = re.sub(r'[^a-zA-Z0-9 ]', '', query)[:50]
-        
-        response = requests.get(
-            "https://api.unsplash.com/search/photos",
-            headers={"Authorization": f"Client-ID {UNSPLASH_ACCESS_KEY}"},
-            params={
-                "query": search_query,
-                "per_page": 1,
-                "orientation": "landscape"
-            },
-            timeout=10
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("results"):
-                photo = data["results"][0]
-                return {
-                    "url": photo["urls"]["regular"],
-                    "thumb": photo["urls"]["small"],
-                    "credit": photo["user"]["name"],
-                    "credit_link": photo["user"]["links"]["html"]
-                }
-        else:
-            print(f"      Unsplash error: {response.status_code}")
-    except Exception as e:
-        print(f"      Unsplash error: {e}")
-    
-    return None
-
 # ================= CLAUDE AI INTEGRATION =================
 
 def call_claude(prompt, max_tokens=500):
-    if not CLAUDE_API_KEY:
+    if not CLAUDE_API_KEY or not scheduler.can_afford("claude"):
         return None
     try:
         r = requests.post(
@@ -1698,7 +1755,7 @@ def call_claude(prompt, max_tokens=500):
                 "max_tokens": max_tokens,
                 "messages": [{"role": "user", "content": prompt}]
             },
-            timeout=30
+            timeout=scheduler.clamp(30)
         )
         return r.json()["content"][0]["text"]
     except Exception as e:
@@ -1709,7 +1766,8 @@ def generate_trend_news(trend_name, platforms, metrics, related, extra_context=N
     """Generate news-style content for a trend using Claude"""
     
     platform_list = ", ".join(platforms.keys())
-    metrics_str = ", ".join([f"{k}: {format_number(v)}" for k, v in metrics.items()])
+    # Numbers only - a label or list that ended up in metrics must not break the prompt
+    metrics_str = ", ".join([f"{k}: {format_number(v)}" for k, v in metrics.items() if isinstance(v, (int, float))])
     related_str = ", ".join(related[:3]) if related else "none"
     
     # Build extra context for meme coins and influencer tweets
@@ -1721,6 +1779,8 @@ def generate_trend_news(trend_name, platforms, metrics, related, extra_context=N
             context_addition += f"\nINFLUENCER SOURCE: @{extra_context['influencer']}"
         if extra_context.get("cashtags"):
             context_addition += f"\nCASTHTAGS DETECTED: {', '.join(extra_context['cashtags'])}"
+        if extra_context.get("mover_reasons"):
+            context_addition += f"\nMARKET MOVER: {', '.join(extra_context['mover_reasons'])}"
     
     # Determine if this is crypto/meme coin related
     is_crypto = any(kw in trend_name.lower() for kw in ["$", "coin", "doge", "pepe", "bonk", "trump", "bitcoin", "eth", "sol", "crypto", "pump", "moon"])
@@ -1790,542 +1850,312 @@ IMPORTANT: Write like a real crypto analyst/journalist. Be insightful and action
 def generate_post_html(trend_name, trend_data):
     """Generate an HTML post page for a trend"""
     os.makedirs(POSTS_DIR, exist_ok=True)
-    
-    post_name = safe_post_name(trend_name)
-    analysis = trend_data.get("analysis", {})
-    
-    headline = analysis.get("headline", trend_name.title())
-    summary = analysis.get("summary", analysis.get("analysis", ""))
-    expert_take = analysis.get("expert_analysis", "")
-    origin_story = analysis.get("origin_story", "")
-    impact = analysis.get("impact", "")
-    category = analysis.get("category", trend_data.get("category", "trending"))
-    status = analysis.get("status", trend_data.get("lifecycle", "rising"))
-    
-    # New fields for X-first
-    influencer = trend_data.get("influencer", "")
-    tweet_url = trend_data.get("tweet_url", "")
-    cashtags = trend_data.get("cashtags", [])
-    hashtags = trend_data.get("hashtags", [])
-    source = trend_data.get("source", "trending")
-    
-    # Platform badges with icons
-    platform_icons = {
-        "x": ("X/Twitter", "𝕏"),
-        "google": ("Google", "&#128269;"),
-        "tiktok": ("TikTok", "&#127925;"),
-        "instagram": ("Instagram", "📸"),
-        "reddit": ("Reddit", "&#128308;"),
-        "news": ("News", "📰")
-    }
-    platforms = []
-    for key, (name, icon) in platform_icons.items():
-        if trend_data.get("platforms", {}).get(key):
-            platforms.append(f'{icon} {name}')
-    
-    platform_badges = "".join([f'<span class="platform-badge">{p}</span>' for p in platforms])
-    
-    # Cashtag badges for meme coins
-    cashtag_badges = ""
-    if cashtags:
-        cashtag_badges = "".join([f'<span class="cashtag-badge">{tag}</span>' for tag in cashtags[:5]])
-    
-    # Related trends
-    related = trend_data.get("related_trends", [])[:5]
-    related_html = ""
-    if related:
-        related_items = "".join([f'<span class="related-tag">{r}</span>' for r in related])
-        related_html = f'<div class="related-section"><h3>🔗 Related Trends</h3><div class="related-tags">{related_items}</div></div>'
-    
-    # Influencer source section
-    influencer_html = ""
-    if influencer and tweet_url:
-        influencer_html = f'''
-      <div class="content-section source-section">
-        <h3>📢 Source</h3>
-        <div class="source-card">
-          <div class="source-avatar">@{influencer}</div>
-          <div class="source-info">
-            <p>Originally posted by <strong>@{influencer}</strong></p>
-            <a href="{tweet_url}" target="_blank" rel="noopener" class="source-link">View Original Tweet &rarr;</a>
-          </div>
-        </div>
-      </div>'''
-    
-    # Signal score interpretation
-    score = trend_data.get("signal_score", 0)
-    if score >= 80:
-        score_label = "Viral"
-        score_color = "#22c55e"
-    elif score >= 60:
-        score_label = "Hot"
-        score_color = "#f59e0b"
-    elif score >= 40:
-        score_label = "Growing"
-        score_color = "#6366f1"
-    else:
-        score_label = "Emerging"
-        score_color = "#8b5cf6"
-    
-    # Category styling
-    category_styles = {
-        "meme_coin": ("&#128176;", "rgba(245, 158, 11, 0.15)", "#f59e0b"),
-        "crypto_news": ("🪙", "rgba(99, 102, 241, 0.15)", "#6366f1"),
-        "politics": ("🏛️", "rgba(239, 68, 68, 0.15)", "#ef4444"),
-        "entertainment": ("🎬", "rgba(168, 85, 247, 0.15)", "#a855f7"),
-        "memes": ("😂", "rgba(34, 197, 94, 0.15)", "#22c55e"),
-        "sports": ("🏈", "rgba(59, 130, 246, 0.15)", "#3b82f6"),
-    }
-    cat_icon, cat_bg, cat_color = category_styles.get(category, ("&#128293;", "rgba(99, 102, 241, 0.15)", "#6366f1"))
-    
-    # Timestamp formatting
-    timestamp = trend_data.get("timestamp", datetime.datetime.now(datetime.timezone.utc).isoformat())
-    
-    html = f'''<!DOCTYPE html>
-<html lang="en" data-theme="dark">
-<head>
-  <meta charset="UTF-8">
-  <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  <title>{headline} | Trend Radar</title>
-  <meta name="description" content="{summary[:160]}..." />
-  
-  <!-- Open Graph / Facebook -->
-  <meta property="og:type" content="article" />
-  <meta property="og:title" content="{headline}" />
-  <meta property="og:description" content="{summary[:160]}..." />
-  <meta property="og:image" content="../assets/social-preview.png" />
-  <meta property="og:url" content="https://trendradar.app/posts/{post_name}.html" />
-  <meta property="og:site_name" content="Trend Radar" />
-  
-  <!-- Twitter Card -->
-  <meta name="twitter:card" content="summary_large_image" />
-  <meta name="twitter:title" content="{headline}" />
-  <meta name="twitter:description" content="{summary[:160]}..." />
-  <meta name="twitter:image" content="../assets/social-preview.png" />
-  <meta name="twitter:site" content="@TrendRadar" />
-  
-  <meta name="theme-color" content="#6c5ce7" />
-  
-  <link rel="stylesheet" href="../style.css">
-  <script>
-    // Apply saved theme
-    const savedTheme = localStorage.getItem('trend-radar-theme') || 'light';
-    document.documentElement.setAttribute('data-theme', savedTheme);
-  </script>
-  <style>
-    .post-container {{ max-width: 800px; margin: 0 auto; padding: 20px; padding-top: 100px; }}
-    .post-header {{ margin-bottom: 32px; }}
-    .back-link {{ color: var(--accent-primary); text-decoration: none; display: inline-flex; align-items: center; gap: 8px; margin-bottom: 20px; font-weight: 500; }}
-    .back-link:hover {{ text-decoration: underline; }}
-    
-    .post-meta-top {{ display: flex; align-items: center; gap: 12px; margin-bottom: 16px; flex-wrap: wrap; }}
-    .time-badge {{ background: var(--bg-secondary); color: var(--text-secondary); padding: 6px 12px; border-radius: 20px; font-size: 0.85rem; display: inline-flex; align-items: center; gap: 6px; }}
-    .post-category {{ display: inline-block; background: {cat_bg}; color: {cat_color}; padding: 6px 16px; border-radius: 20px; font-size: 0.85rem; font-weight: 600; text-transform: capitalize; }}
-    .source-badge {{ background: rgba(29, 161, 242, 0.15); color: #1da1f2; padding: 6px 12px; border-radius: 20px; font-size: 0.85rem; font-weight: 600; }}
-    
-    .post-title {{ font-size: 2rem; font-weight: 700; color: var(--text-primary); line-height: 1.3; margin-bottom: 20px; }}
-    
-    .topic-tag {{ display: inline-flex; align-items: center; gap: 6px; color: var(--accent-secondary); font-size: 0.95rem; margin-bottom: 12px; }}
-    .topic-tag strong {{ color: var(--accent-primary); }}
-    
-    /* Cashtag badges for meme coins */
-    .cashtag-section {{ display: flex; gap: 8px; flex-wrap: wrap; margin-bottom: 20px; }}
-    .cashtag-badge {{ background: linear-gradient(135deg, #f59e0b, #d97706); color: white; padding: 6px 14px; border-radius: 20px; font-size: 0.9rem; font-weight: 700; }}
-    
-    /* Quick Stats Bar */
-    .quick-stats {{ display: flex; gap: 24px; padding: 16px 20px; background: var(--bg-secondary); border-radius: 12px; margin-bottom: 24px; flex-wrap: wrap; }}
-    .quick-stat {{ display: flex; align-items: center; gap: 8px; }}
-    .quick-stat-icon {{ font-size: 1.2rem; }}
-    .quick-stat-value {{ font-weight: 700; color: var(--text-primary); }}
-    .quick-stat-label {{ color: var(--text-secondary); font-size: 0.85rem; }}
-    
-    /* Content Sections */
-    .content-section {{ background: var(--bg-secondary); border-radius: 16px; padding: 24px; margin-bottom: 20px; }}
-    .content-section h3 {{ font-size: 1.1rem; color: var(--text-primary); margin-bottom: 14px; display: flex; align-items: center; gap: 10px; }}
-    .content-section p {{ color: var(--text-secondary); line-height: 1.8; font-size: 1rem; }}
-    
-    /* Summary Box - Highlighted */
-    .summary-box {{ background: var(--bg-secondary); border-left: 4px solid var(--accent-primary); padding: 20px 24px; border-radius: 0 12px 12px 0; margin-bottom: 24px; }}
-    .summary-box p {{ color: var(--text-primary); font-size: 1.05rem; line-height: 1.7; margin: 0; }}
-    
-    /* Source Section - New for influencer tweets */
-    .source-section {{ background: linear-gradient(135deg, rgba(29, 161, 242, 0.08), rgba(29, 161, 242, 0.03)); border: 1px solid rgba(29, 161, 242, 0.2); }}
-    .source-section h3 {{ color: #1da1f2; }}
-    .source-card {{ display: flex; align-items: center; gap: 16px; }}
-    .source-avatar {{ background: var(--bg-card); border: 2px solid #1da1f2; padding: 12px 16px; border-radius: 12px; font-weight: 700; color: #1da1f2; }}
-    .source-info p {{ margin: 0 0 8px 0; }}
-    .source-link {{ color: #1da1f2; text-decoration: none; font-weight: 600; }}
-    .source-link:hover {{ text-decoration: underline; }}
-    
-    /* AI Analysis - Special styling */
-    .ai-analysis {{ background: linear-gradient(135deg, rgba(99, 102, 241, 0.08), rgba(139, 92, 246, 0.05)); border: 1px solid rgba(99, 102, 241, 0.2); }}
-    .ai-analysis h3 {{ color: var(--accent-primary); }}
-    .ai-analysis p {{ font-style: italic; }}
-    
-    /* Origin Story */
-    .origin-section {{ background: var(--bg-secondary); }}
-    .origin-meta {{ display: flex; flex-direction: column; gap: 8px; margin-top: 16px; padding-top: 16px; border-top: 1px solid var(--border-color); }}
-    .origin-meta-item {{ display: flex; align-items: center; gap: 8px; color: var(--text-secondary); font-size: 0.9rem; }}
-    
-    /* Impact Box */
-    .impact-section {{ background: rgba(34, 197, 94, 0.05); border: 1px solid rgba(34, 197, 94, 0.2); }}
-    .impact-section h3 {{ color: #22c55e; }}
-    
-    /* Platform Pills */
-    .platforms-section {{ margin-bottom: 24px; }}
-    .platforms-section h3 {{ font-size: 1rem; color: var(--text-primary); margin-bottom: 12px; }}
-    .platform-badges {{ display: flex; gap: 10px; flex-wrap: wrap; }}
-    .platform-badge {{ background: var(--bg-card); color: var(--text-primary); padding: 8px 16px; border-radius: 25px; font-size: 0.9rem; border: 1px solid var(--border-color); display: inline-flex; align-items: center; gap: 6px; transition: all 0.2s; }}
-    .platform-badge:hover {{ border-color: var(--accent-primary); transform: translateY(-2px); }}
-    
-    /* Score Indicator */
-    .score-indicator {{ display: flex; align-items: center; gap: 16px; padding: 20px; background: var(--bg-secondary); border-radius: 12px; margin-bottom: 24px; }}
-    .score-circle {{ width: 70px; height: 70px; border-radius: 50%; display: flex; align-items: center; justify-content: center; flex-direction: column; font-weight: 700; color: white; }}
-    .score-number {{ font-size: 1.4rem; line-height: 1; }}
-    .score-info h4 {{ color: var(--text-primary); margin: 0 0 4px 0; font-size: 1.1rem; }}
-    .score-info p {{ color: var(--text-secondary); margin: 0; font-size: 0.9rem; }}
-    
-    /* Related Tags */
-    .related-section {{ margin-top: 24px; }}
-    .related-section h3 {{ font-size: 1rem; color: var(--text-primary); margin-bottom: 12px; }}
-    .related-tags {{ display: flex; gap: 8px; flex-wrap: wrap; }}
-    .related-tag {{ background: var(--bg-card); color: var(--text-secondary); padding: 6px 14px; border-radius: 20px; font-size: 0.85rem; border: 1px solid var(--border-color); cursor: pointer; transition: all 0.2s; }}
-    .related-tag:hover {{ border-color: var(--accent-primary); color: var(--accent-primary); }}
-    
-    /* Divider */
-    .section-divider {{ height: 1px; background: var(--border-color); margin: 24px 0; }}
-  </style>
-</head>
-<body>
-  <header class="site-header">
-    <a href="../index.html" class="logo-link">
-      <div class="logo-3d">
-        <div class="glow"></div>
-        <div class="ring ring-1"></div>
-        <div class="ring ring-2"></div>
-        <div class="ring ring-3"></div>
-        <div class="orb"></div>
-        <div class="scan-line"></div>
-      </div>
-      <span class="logo-text">Trend Radar</span>
-    </a>
-    <nav class="nav">
-      <a href="../index.html">🏠 Home</a>
-      <a href="../trending.html">&#128293; Trending</a>
-      <a href="../crypto.html">🪙 Crypto</a>
-      <a href="../search.html">&#128269; Search</a>
-      <a href="../timeline.html">&#128197; Timeline</a>
-      <a href="../bookmarks.html">🔖 Bookmarks</a>
-    </nav>
-  </header>
-  
-  <main class="post-container">
-    <a href="../trending.html" class="back-link">← Back to Trends</a>
-    
-    <article>
-      <div class="post-meta-top">
-        <span class="time-badge" data-timestamp="{timestamp}">🕐 Just now</span>
-        <span class="post-category">{cat_icon} {category.replace('_', ' ')}</span>
-        {f'<span class="source-badge">𝕏 @{influencer}</span>' if influencer else ''}
-      </div>
-      
-      <h1 class="post-title">{headline}</h1>
-      
-      <div class="topic-tag">📌 Topic: <strong>{trend_name}</strong></div>
-      
-      <!-- Cashtags for meme coins -->
-      {f'<div class="cashtag-section">{cashtag_badges}</div>' if cashtag_badges else ''}
-      
-      <!-- Summary - The Key Takeaway -->
-      <div class="summary-box">
-        <p>{summary}</p>
-      </div>
-      
-      <!-- Influencer Source -->
-      {influencer_html}
-      
-      <!-- Quick Stats -->
-      <div class="quick-stats">
-        <div class="quick-stat">
-          <span class="quick-stat-icon">&#128202;</span>
-          <span class="quick-stat-value">{score}</span>
-          <span class="quick-stat-label">Signal Score</span>
-        </div>
-        <div class="quick-stat">
-          <span class="quick-stat-icon">🚀</span>
-          <span class="quick-stat-value">{trend_data.get("momentum", "stable").title()}</span>
-          <span class="quick-stat-label">Momentum</span>
-        </div>
-        <div class="quick-stat">
-          <span class="quick-stat-icon">&#127760;</span>
-          <span class="quick-stat-value">{trend_data.get("platform_count", len(platforms))}</span>
-          <span class="quick-stat-label">Platforms</span>
-        </div>
-        <div class="quick-stat">
-          <span class="quick-stat-icon">&#128200;</span>
-          <span class="quick-stat-value">{status.title()}</span>
-          <span class="quick-stat-label">Status</span>
-        </div>
-      </div>
-      
-      <!-- AI Analysis -->
-      {('<div class="content-section ai-analysis"><h3>&#129302; AI Analysis</h3><p>' + expert_take + '</p></div>') if expert_take else ''}
-      
-      <!-- Origin Story -->
-      {('<div class="content-section origin-section"><h3>&#128214; Origin Story</h3><p>' + origin_story + '</p><div class="origin-meta"><div class="origin-meta-item">&#128197; First detected: <strong data-timestamp="' + timestamp + '">Recently</strong></div><div class="origin-meta-item">&#128205; Started on: <strong>' + ('Multiple platforms' if len(platforms) > 1 else (platforms[0] if platforms else 'Social Media')) + '</strong></div></div></div>') if origin_story else ''}
-      
-      <!-- Impact -->
-      {('<div class="content-section impact-section"><h3>&#128165; Why This Matters</h3><p>' + impact + '</p></div>') if impact else ''}
-      
-      <!-- Platforms -->
-      <div class="platforms-section">
-        <h3>&#128293; Trending On</h3>
-        <div class="platform-badges">
-          {platform_badges if platform_badges else '<span class="platform-badge">&#127760; Multiple Platforms</span>'}
-        </div>
-      </div>
-      
-      <!-- Signal Score Visual -->
-      <div class="score-indicator">
-        <div class="score-circle" style="background: linear-gradient(135deg, {score_color}, {score_color}dd);">
-          <span class="score-number">{score}</span>
-        </div>
-        <div class="score-info">
-          <h4>{score_label} Trend</h4>
-          <p>This trend is {'going viral across the internet' if score >= 80 else 'gaining significant traction' if score >= 60 else 'steadily building momentum' if score >= 40 else 'just starting to emerge'}</p>
-        </div>
-      </div>
-      
-      <!-- Related Trends -->
-      {related_html}
-      
-    </article>
-  </main>
-  
-  <script>
-    // Format timestamps to relative time
-    function formatTimeAgo(timestamp) {{
-      const date = new Date(timestamp);
-      const now = new Date();
-      const seconds = Math.floor((now - date) / 1000);
-      
-      if (seconds < 60) return 'Just now';
-      if (seconds < 3600) return Math.floor(seconds / 60) + 'm ago';
-      if (seconds < 86400) return Math.floor(seconds / 3600) + 'h ago';
-      if (seconds < 604800) return Math.floor(seconds / 86400) + 'd ago';
-      return date.toLocaleDateString();
-    }}
-    
-    document.querySelectorAll('[data-timestamp]').forEach(el => {{
-      const ts = el.getAttribute('data-timestamp');
-      if (ts) {{
-        el.textContent = (el.querySelector('.time-badge') ? '🕐 ' : '') + formatTimeAgo(ts);
-      }}
-    }});
-  </script>
-</body>
-</html>'''
-    
-    filepath = f"{POSTS_DIR}/{post_name}.html"
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write(html)
-    
+    post_name, _ = renderer.write_post(trend_name, trend_data, POSTS_DIR)
     return post_name
 
 # ================= MAIN PIPELINE =================
 
 def cleanup_old_trends():
-    """Delete trend files older than 72 hours"""
+    """Delete trend artifacts whose logical update time is older than 72 hours"""
     print("\n🧹 Cleaning up old trend files (>72h)...")
     now = datetime.datetime.now(datetime.timezone.utc)
+    cutoff = now - datetime.timedelta(hours=MAX_TREND_AGE_HOURS)
     deleted_count = 0
     
-    for folder in [DATA_DIR, POSTS_DIR]:
-        if not os.path.exists(folder):
-            continue
-        for filename in os.listdir(folder):
-            if filename in ['index.json', 'meme_signals.json']:
-                continue
-            filepath = os.path.join(folder, filename)
-            try:
-                # Check file modification time
-                mtime = os.path.getmtime(filepath)
-                file_age = datetime.datetime.fromtimestamp(mtime, tz=datetime.timezone.utc)
-                age_hours = (now - file_age).total_seconds() / 3600
-                
-                if age_hours > MAX_TREND_AGE_HOURS:
-                    os.remove(filepath)
-                    deleted_count += 1
-            except Exception as e:
-                print(f"   ⚠ Could not check/delete {filename}: {e}")
+    # The manifest's time-ordered index yields only the artifacts that expired
+    for filepath in manifest.pop_expired(cutoff):
+        try:
+            output.remove(filepath)
+            deleted_count += 1
+        except Exception as e:
+            print(f"   ⚠ Could not delete {filepath}: {e}")
     
     print(f"   ✓ Deleted {deleted_count} old files")
     return deleted_count
 
 
-def main():
-    print("=" * 60)
-    print(f"🔮 TREND RADAR - X-First Meme Coin & Trend Aggregator")
-    print(f"   Time: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"   Mode: X-First with Cross-Platform Validation")
-    print("=" * 60)
-    
-    # Clean up old trends first
-    cleanup_old_trends()
+def update_index():
+    """Rewrite data/index.json from the manifest, only when the set of trend files changed"""
+    all_trend_files = manifest.trend_files()
+    if manifest.index_changed() or not os.path.exists(f"{DATA_DIR}/index.json"):
+        output.write_json(f"{DATA_DIR}/index.json", {"files": all_trend_files})
+        manifest.mark_index_written()
+    return all_trend_files
+
+
+# ================= TREND DOCUMENTS =================
+
+def news_request(data):
+    """generate_trend_news() arguments for a scored trend (plain JSON, so a worker process can take it)"""
+    # Enhanced context for AI generation
+    extra_context = {}
+    if data.get("tweet_text"):
+        extra_context["original_tweet"] = data["tweet_text"]
+    if data.get("influencer"):
+        extra_context["influencer"] = data["influencer"]
+    if data.get("cashtags"):
+        extra_context["cashtags"] = data["cashtags"]
+    if data.get("mover_reasons"):
+        extra_context["mover_reasons"] = data["mover_reasons"]
+    return {
+        "trend_name": data["name"].replace("#", "").strip(),
+        "platforms": data["platforms"],
+        "metrics": data["metrics"],
+        "related": data.get("related", []),
+        "extra_context": extra_context,
+    }
 
-    # ================= X-FIRST WORKFLOW =================
-    
-    # PHASE 1A: Scrape influencer accounts (HIGHEST PRIORITY)
-    influencer_trends, tweets_data = scrape_x_influencers()
-    
-    # PHASE 1B: Scrape X trending hashtags
-    x_trending = scrape_x_trending_hashtags()
-    
-    # Combine X trends
-    all_x_trends = {**influencer_trends, **x_trending}
-    print(f"\n   &#128202; Total X trends: {len(all_x_trends)}")
-    
-    # Extract keywords for cross-validation
+def build_trend_document(normalized, data, news):
+    """(filename, trend_data) for a scored trend and its generated copy"""
+    trend_name = data["name"].replace("#", "").strip()
+    trend_momentum, lifecycle = momentum.labels(normalized, data["signal_score"])
+    trend_state = momentum.get(normalized) or {}
+
+    trend_data = {
+        "trend": trend_name,
+        "category": data.get("category") or news.get("category", "trending"),
+        "platforms": data["platforms"],
+        "platform_count": data["platform_count"],
+        "metrics": data["metrics"],
+        "signal_score": data["signal_score"],
+        "momentum": trend_momentum,
+        "lifecycle": lifecycle,
+        "velocity": round(trend_state.get("velocity", 0.0), 2),
+        "acceleration": round(trend_state.get("acceleration", 0.0), 2),
+        "locations": data.get("locations", [])[:5],
+        "related_trends": data.get("related", []),
+        "source": data.get("source", "trending"),
+        "influencer": data.get("influencer"),
+        "tweet_url": data.get("tweet_url"),
+        "cashtags": data.get("cashtags", []),
+        "hashtags": data.get("hashtags", []),
+        "analysis": {
+            "headline": news.get("headline", ""),
+            "summary": news.get("summary", ""),
+            "origin_story": news.get("origin_story", ""),
+            "expert_analysis": news.get("analysis", ""),
+            "impact": news.get("impact", ""),
+            "status": news.get("status", "rising")
+        },
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "history": [{
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "signal_score": data["signal_score"]
+        }]
+    }
+
+    filename = safe_name(trend_name)
+    filepath = f"{DATA_DIR}/{filename}.json"
+
+    # Preserve history (and the image) from previous runs
+    if os.path.exists(filepath):
+        try:
+            with open(filepath) as f:
+                old_data = json.load(f)
+                old_history = old_data.get("history", [])
+                trend_data["history"] = (old_history + trend_data["history"])[-24:]
+                if old_data.get("image"):
+                    trend_data["image"] = old_data["image"]
+        except:
+            pass
+    return filename, trend_data
+
+def generate_news_serial(sorted_trends):
+    """PHASE 7 in this process, one trend after another; returns {normalized: news}"""
+    news_by_trend = {}
+    for i, (normalized, data) in enumerate(sorted_trends, 1):
+        # Trends are in score order - when time runs out the weakest ones are dropped
+        if not scheduler.can_afford("trend"):
+            print(f"   &#9203; Skipping {len(sorted_trends) - i + 1} lower-ranked trends")
+            break
+        request = news_request(data)
+        print(f"   [{i}/{len(sorted_trends)}] Processing: {request['trend_name']}...", end=" ")
+        news_by_trend[normalized] = generate_trend_news(**request)
+        print(f"&#10003; (score: {data['signal_score']})")
+        random_delay()
+    return news_by_trend
+
+# ================= WORK QUEUE MODE =================
+
+def work(conn, owner, run_id=None, idle_exit=0):
+    """Lease and process news jobs until none is left (or none shows up for `idle_exit` seconds)"""
+    done = 0
+    idle_since = time.monotonic()
+    while scheduler.can_afford("trend"):
+        job = workqueue.lease(conn, owner, run_id)
+        if job is None:
+            if time.monotonic() - idle_since >= idle_exit:
+                break
+            time.sleep(1)
+            continue
+        try:
+            news = generate_trend_news(**job["payload"])
+        except Exception as e:
+            workqueue.fail(conn, job, owner, e)
+            print(f"   &#10007; [{owner}] {job['key']}: {e}")
+        else:
+            if workqueue.complete(conn, job, owner, news):
+                done += 1
+                print(f"   &#10003; [{owner}] {job['payload']['trend_name']}")
+        idle_since = time.monotonic()
+    return done
+
+def spawn_workers(count, run_id):
+    """Start local worker processes on this run's jobs, bounded by what is left of the run"""
+    env = dict(os.environ, TREND_RUN_BUDGET=str(max(scheduler.remaining(), 0) + scheduler.PUBLISH_RESERVE),
+               TREND_PROFILE="")
+    # Each recording worker writes its own cassette part instead of overwriting the main one
+    return [
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), "worker", run_id],
+                         env=dict(env, TREND_CASSETTE_PART=str(i + 1)))
+        for i in range(count)
+    ]
+
+def generate_news_queued(sorted_trends):
+    """PHASE 7 through the work queue, shared by WORKERS processes; returns (run_id, {normalized: news})"""
+    run_id = f"{datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+    with contextlib.closing(workqueue.connect()) as conn:
+        workqueue.enqueue(conn, run_id, [(normalized, news_request(data)) for normalized, data in sorted_trends])
+        print(f"   &#128736; Queued {len(sorted_trends)} trends for {WORKERS} workers (run {run_id})")
+        workers = spawn_workers(WORKERS - 1, run_id)
+        try:
+            work(conn, f"main-{os.getpid()}", run_id)
+            # Wait for the jobs other workers still hold
+            while workqueue.counts(conn, run_id).get("leased") and not scheduler.expired():
+                time.sleep(1)
+        finally:
+            workqueue.cancel(conn, run_id)
+            for worker in workers:
+                try:
+                    worker.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    worker.terminate()
+        news_by_trend = workqueue.results(conn, run_id)
+    dropped = len(sorted_trends) - len(news_by_trend)
+    if dropped:
+        print(f"   &#9203; {dropped} lower-ranked trends not generated in time")
+    return run_id, news_by_trend
+
+def worker_main(run_id=None):
+    """`python generate.py worker [run_id]`: process queued jobs; without a run_id, wait up to WORKER_IDLE_EXIT idle seconds"""
+    scheduler.start()
+    owner = f"{socket.gethostname()}-{os.getpid()}"
+    with contextlib.closing(workqueue.connect()) as conn:
+        done = work(conn, owner, run_id, idle_exit=0 if run_id else WORKER_IDLE_EXIT)
+    print(f"   &#128736; Worker {owner} finished {done} jobs")
+
+
+# ================= RUN STAGES =================
+
+# Sources in expected-value order, with the result a shed/failed source yields
+SOURCE_DEFAULTS = {
+    "x_influencers": ({}, []),
+    "coingecko": {},
+    "x_hashtags": {},
+    "cross_validate": {},
+    "telegram": [],
+    "reddit": {},
+    "news": {},
+    "google": {},
+    "tiktok": {},
+    "instagram": {},
+}
+
+def combined_x_trends(sources):
+    influencer_trends, _ = sources.get("x_influencers") or ({}, [])
+    return {**influencer_trends, **(sources.get("x_hashtags") or {})}
+
+def x_keywords_for(all_x_trends):
+    """Keywords from X trends to cross-validate on other platforms"""
     x_keywords = []
     for normalized, data in all_x_trends.items():
         keyword = data["name"].replace("#", "").replace("$", "")
         if len(keyword) > 2:
             x_keywords.append(keyword)
+    return x_keywords
+
+def refresh_source(name, sources, keep_previous=False):
+    """Run one source under its phase budget and store the result in `sources`"""
+    if name == "cross_validate":
+        x_keywords = x_keywords_for(combined_x_trends(sources))
+        func = lambda: cross_validate_trends(x_keywords[:20])
+    else:
+        func = {
+            "x_influencers": scrape_x_influencers,
+            "coingecko": scrape_crypto_trends,
+            "x_hashtags": scrape_x_trending_hashtags,
+            "telegram": scrape_all_telegram_channels,
+            "reddit": scrape_reddit_trends,
+            "news": scrape_news_trends,
+            "google": scrape_google_trends_global,
+            "tiktok": scrape_tiktok_trends,
+            "instagram": scrape_instagram_trends,
+        }[name]
+    result = scheduler.run_phase(name, func, SOURCE_DEFAULTS[name])
+    if name == "telegram" and result:
+        save_telegram_posts(result)
+
+    empty = result == SOURCE_DEFAULTS[name]
+    if not (keep_previous and empty and name in sources):
+        sources[name] = result
+    return sources[name]
+
+def collect_sources(sources=None):
+    """PHASES 1-4: run every source once, in expected-value order under the run deadline"""
+    sources = {} if sources is None else sources
+    # Sources run in expected-value order under the run deadline (scheduler.PHASES);
+    # whatever doesn't fit is shed and the run still publishes what it has.
     
-    # PHASE 2: Cross-validate on other platforms
-    validation = cross_validate_trends(x_keywords[:20])
+    # PHASE 1A: Scrape influencer accounts (HIGHEST PRIORITY)
+    refresh_source("x_influencers", sources)
     
-    # PHASE 3: Extract meme coin signals (for special handling)
-    meme_signals = get_meme_coin_signals(all_x_trends, tweets_data)
+    # CoinGecko movers are cheap and carry most of the meme coin signal - fetch before anything slow
+    refresh_source("coingecko", sources)
+    
+    # PHASE 1B: Scrape X trending hashtags
+    refresh_source("x_hashtags", sources)
+    print(f"\n   &#128202; Total X trends: {len(combined_x_trends(sources))}")
+    
+    # PHASE 2: Cross-validate on other platforms
+    refresh_source("cross_validate", sources)
     
     # PHASE 4: Also scrape other sources (lower priority)
     print("\n📡 PHASE 4: Supplementary sources...")
-    google_trends = scrape_google_trends_global()
-    crypto_trends = scrape_crypto_trends()  # CoinGecko trending coins (HIGH PRIORITY for meme coins)
-    reddit_trends = scrape_reddit_trends()
-    news_trends = scrape_news_trends()
-    tiktok_trends = scrape_tiktok_trends()
-    instagram_trends = scrape_instagram_trends()
-    
-    # Scrape Telegram trading channels
-    telegram_posts = scrape_all_telegram_channels()
-    if telegram_posts:
-        save_telegram_posts(telegram_posts)
+    for name in ["telegram", "reddit", "news", "google", "tiktok", "instagram"]:
+        refresh_source(name, sources)
+    return sources
+
+def publish(sources):
+    """PHASES 3, 5-7: merge, score and write everything from the collected sources"""
+    all_x_trends = combined_x_trends(sources)
+    _, tweets_data = sources.get("x_influencers") or ({}, [])
+    validation = sources.get("cross_validate") or {}
+    crypto_trends = sources.get("coingecko") or {}
+    
+    # PHASE 3: Extract meme coin signals (for special handling)
+    with telemetry.phase("meme_signals"):
+        meme_signals = get_meme_coin_signals(all_x_trends, tweets_data)
 
     # PHASE 5: Merge all trends with X-first weighting
     print("\n🔄 PHASE 5: Merging with X-first priority...")
-    merged = {}
-    
-    # Add X trends first (highest priority)
-    for normalized, data in all_x_trends.items():
-        merged[normalized] = data.copy()
-        # Apply cross-validation bonus
-        keyword = data["name"].replace("#", "").replace("$", "")
-        if keyword in validation:
-            val = validation[keyword]
-            if val["google"]:
-                merged[normalized]["platforms"]["google"] = True
-                merged[normalized]["metrics"]["google_volume"] = val["google_volume"]
-            if val["tiktok"]:
-                merged[normalized]["platforms"]["tiktok"] = True
-                merged[normalized]["metrics"]["tiktok_views"] = val["tiktok_views"]
-            if val["instagram"]:
-                merged[normalized]["platforms"]["instagram"] = True
-                merged[normalized]["metrics"]["instagram_posts"] = val["instagram_posts"]
-    
-    # Add crypto trends SECOND priority (for meme coin trading)
-    for normalized, data in crypto_trends.items():
-        if normalized in merged:
-            merged[normalized]["platforms"].update(data.get("platforms", {}))
-            merged[normalized]["metrics"].update(data.get("metrics", {}))
-            merged[normalized]["source"] = data.get("source", "crypto")
-        else:
-            merged[normalized] = data.copy()
-            merged[normalized]["crypto_source"] = True  # Mark as crypto origin (high priority)
-    
-    # Add other platform trends (lower priority, only if not already covered)
     secondary_sources = [
-        (google_trends, "google"),
-        (reddit_trends, "reddit"),
-        (news_trends, "news"),
-        (tiktok_trends, "tiktok"),
-        (instagram_trends, "instagram")
+        (sources.get(platform) or {}, platform)
+        for platform in ["google", "reddit", "news", "tiktok", "instagram"]
     ]
-    
-    for trends_dict, platform in secondary_sources:
-        for normalized, data in trends_dict.items():
-            if normalized in merged:
-                # Update existing trend
-                merged[normalized]["platforms"].update(data.get("platforms", {}))
-                merged[normalized]["metrics"].update(data.get("metrics", {}))
-            else:
-                # Add new trend (lower base score since not from X)
-                merged[normalized] = data.copy()
-                merged[normalized]["x_first_penalty"] = True  # Mark as non-X origin
+    with telemetry.phase("merge"):
+        merged = merge_x_first(all_x_trends, validation, crypto_trends, secondary_sources)
     
     print(f"   &#10003; Total merged trends: {len(merged)}")
     
-    # PHASE 6: Score and select top trends (require 2+ platforms)
+    # PHASE 6: Score every merged trend and select the top ones (multi-platform trends score higher, none are filtered out)
     print("\n&#128200; PHASE 6: Scoring trends (X + Google priority)...")
-    for norm, data in merged.items():
-        # Calculate platform count
-        platforms = data.get("platforms", {})
-        platform_count = len([p for p in platforms.values() if p])
-        data["platform_count"] = platform_count
-        
-        # Count primary platforms (X, Google) and secondary (TikTok, Instagram, Reddit)
-        primary_count = sum(1 for p in PRIMARY_PLATFORMS if platforms.get(p))
-        secondary_count = sum(1 for p in SECONDARY_PLATFORMS if platforms.get(p))
-        
-        # Calculate signal score with X-first weighting
-        base_score = calculate_trend_score(data)
-        
-        # Primary platform bonuses (X and Google are most important)
-        if platforms.get("x"):
-            base_score += 25  # X is primary
-        if platforms.get("google"):
-            base_score += 20  # Google is primary
-        
-        # Secondary platform bonuses (TikTok, Instagram as supporting)
-        if platforms.get("tiktok"):
-            base_score += 10
-        if platforms.get("instagram"):
-            base_score += 10
-        if platforms.get("reddit"):
-            base_score += 5
-        
-        # X-first bonuses
-        if data.get("source") == "influencer":
-            tier = data.get("influencer_tier", 5)
-            tier_bonus = {1: 30, 2: 20, 3: 10, 4: 5, 5: 0}
-            base_score += tier_bonus.get(tier, 0)
-        
-        if data.get("is_meme_coin") or data.get("category") == "meme_coin":
-            base_score += 15  # Meme coin bonus
-        
-        # Crypto source bonus (CoinGecko trending is reliable)
-        if data.get("crypto_source") or data.get("source", "").startswith("coingecko"):
-            base_score += 20  # Crypto trends are priority for meme coin trading
-        
-        if data.get("x_first_penalty"):
-            base_score -= 10  # Penalty for non-X origin
-        
-        # Cross-validation bonus (trending on multiple platforms)
-        if platform_count >= 2:
-            base_score += 15 * (platform_count - 1)  # +15 per additional platform
-        
-        # Bonus for having both primary platforms (X + Google)
-        if primary_count >= 2:
-            base_score += 20  # Strong signal when both X and Google agree
-        
-        data["signal_score"] = min(base_score, 100)
-    
-    # Sort by score
-    sorted_trends = sorted(
-        merged.items(),
-        key=lambda x: x[1]["signal_score"],
-        reverse=True
-    )[:MAX_TRENDS_PER_RUN]
+    # Weights live in scoring_weights.json; all candidates are scored in one vectorized pass.
+    # Every candidate's raw score also feeds its momentum state so climbing trends get a boost.
+    with telemetry.phase("score"):
+        import scoring  # NumPy - only needed once there is something to score
+        selected = scoring.score_trends(merged, MAX_TRENDS_PER_RUN, observe=momentum.observe_all)
+        # Output boundary: only the selected trends become dicts
+        sorted_trends = [(normalized, record.to_dict()) for normalized, record in selected]
     
     print(f"   &#10003; Selected top {len(sorted_trends)} trends")
     
@@ -2343,93 +2173,76 @@ def main():
         print("   &#9888; CLAUDE_API_KEY not set - using fallback content")
 
     final_trends = []
-    for i, (normalized, data) in enumerate(sorted_trends, 1):
-        trend_name = data["name"].replace("#", "").strip()
-        print(f"   [{i}/{len(sorted_trends)}] Processing: {trend_name}...", end=" ")
-        
-        # Enhanced context for AI generation
-        extra_context = {}
-        if data.get("tweet_text"):
-            extra_context["original_tweet"] = data["tweet_text"]
-        if data.get("influencer"):
-            extra_context["influencer"] = data["influencer"]
-        if data.get("cashtags"):
-            extra_context["cashtags"] = data["cashtags"]
-        
-        news = generate_trend_news(
-            trend_name,
-            data["platforms"],
-            data["metrics"],
-            data.get("related", []),
-            extra_context
-        )
-        
-        trend_data = {
-            "trend": trend_name,
-            "category": data.get("category") or news.get("category", "trending"),
-            "platforms": data["platforms"],
-            "platform_count": data["platform_count"],
-            "metrics": data["metrics"],
-            "signal_score": data["signal_score"],
-            "momentum": "rising" if data["signal_score"] > 70 else "stable",
-            "lifecycle": "new" if data["signal_score"] >= 80 else ("rising" if data["signal_score"] >= 60 else ("peak" if data["signal_score"] >= 40 else "declining")),
-            "locations": data.get("locations", [])[:5],
-            "related_trends": data.get("related", []),
-            "source": data.get("source", "trending"),
-            "influencer": data.get("influencer"),
-            "tweet_url": data.get("tweet_url"),
-            "cashtags": data.get("cashtags", []),
-            "hashtags": data.get("hashtags", []),
-            "analysis": {
-                "headline": news.get("headline", ""),
-                "summary": news.get("summary", ""),
-                "origin_story": news.get("origin_story", ""),
-                "expert_analysis": news.get("analysis", ""),
-                "impact": news.get("impact", ""),
-                "status": news.get("status", "rising")
-            },
-            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-            "history": [{
-                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-                "signal_score": data["signal_score"]
-            }]
-        }
-        
-        filename = safe_name(trend_name)
-        filepath = f"{DATA_DIR}/{filename}.json"
-        
-        # Preserve history from previous runs
-        if os.path.exists(filepath):
-            try:
-                with open(filepath) as f:
-                    old_data = json.load(f)
-                    old_history = old_data.get("history", [])
-                    trend_data["history"] = (old_history + trend_data["history"])[-24:]
-            except:
-                pass
-        
-        with open(filepath, "w") as f:
-            json.dump(trend_data, f, indent=2)
-        
-        post_name = generate_post_html(trend_name, trend_data)
-        final_trends.append(filename)
-        print(f"&#10003; (score: {data['signal_score']})")
-        random_delay()
+    with scheduler.phase("generate"):
+        if WORKERS > 1:
+            run_id, news_by_trend = generate_news_queued(sorted_trends)
+        else:
+            run_id, news_by_trend = None, generate_news_serial(sorted_trends)
+        documents = [
+            build_trend_document(normalized, data, news_by_trend[normalized])
+            for normalized, data in sorted_trends if normalized in news_by_trend
+        ]
+    
+    # Images for new trends in one deduplicated, rate-limited batch
+    with scheduler.phase("images"):
+        if images.enabled():
+            added = images.enrich(documents)
+            print(f"\n   &#128247; Images: {added} added, {sum(1 for _, d in documents if not d.get('image'))} still missing")
+    
+    with telemetry.phase("write"):
+        for filename, trend_data in documents:
+            output.write_json(f"{DATA_DIR}/{filename}.json", trend_data)
+            generate_post_html(trend_data["trend"], trend_data)
+            final_trends.append(filename)
+        if run_id:
+            with contextlib.closing(workqueue.connect()) as conn:
+                workqueue.mark_committed(conn, run_id, list(news_by_trend))
     
     # Save meme coin signals separately for quick reference
     if meme_signals:
         signals_path = f"{DATA_DIR}/meme_signals.json"
-        with open(signals_path, "w") as f:
-            json.dump({
-                "signals": meme_signals,
-                "updated": datetime.datetime.now(datetime.timezone.utc).isoformat()
-            }, f, indent=2)
+        output.write_json(signals_path, {
+            "signals": meme_signals,
+            "updated": datetime.datetime.now(datetime.timezone.utc).isoformat()
+        })
         print(f"\n   &#128176; Saved {len(meme_signals)} meme coin signals to {signals_path}")
     
     # Update index file with ALL trend files
-    all_trend_files = [f for f in sorted(os.listdir(DATA_DIR)) if f.endswith('.json') and f != 'index.json' and f != 'meme_signals.json']
-    with open(f"{DATA_DIR}/index.json", "w") as f:
-        json.dump({"files": all_trend_files}, f, indent=2)
+    with telemetry.phase("publish"):
+        all_trend_files = update_index()
+        manifest.save()
+        momentum.save()
+        breakers.save()
+        mirrors.save()
+        autocomplete.save()
+        markets.save()
+        images.save()
+        seen.save()
+        written, unchanged = output.flush()
+        print(f"   &#128190; {written} files written, {unchanged} unchanged (skipped)")
+    return final_trends, all_trend_files, meme_signals
+
+
+def print_banner(mode):
+    print("=" * 60)
+    print(f"🔮 TREND RADAR - X-First Meme Coin & Trend Aggregator")
+    print(f"   Time: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"   Mode: {mode}")
+    print("=" * 60)
+
+def main():
+    print_banner("X-First with Cross-Platform Validation")
+    
+    # Clean up old trends first
+    scheduler.start()
+    with telemetry.phase("cleanup"):
+        manifest.load()
+        momentum.load()
+        cleanup_old_trends()
+
+    # ================= X-FIRST WORKFLOW =================
+    sources = collect_sources()
+    final_trends, all_trend_files, meme_signals = publish(sources)
     
     print("\n" + "=" * 60)
     print(f"✅ COMPLETE! Generated {len(final_trends)} trend reports")
@@ -2438,7 +2251,102 @@ def main():
     print(f"   📁 Data: {DATA_DIR}/")
     print(f"   📄 Posts: {POSTS_DIR}/")
     print("=" * 60)
+    telemetry.print_summary(telemetry.finish())
+
+
+# ================= SERVE MODE =================
+
+# Refresh cadence per source (seconds) - movers change in minutes, autocomplete barely in an hour
+SERVE_INTERVALS = {
+    "coingecko": 180,
+    "telegram": 600,
+    "reddit": 600,
+    "x_influencers": 900,
+    "x_hashtags": 900,
+    "news": 900,
+    "cross_validate": 1800,
+    "google": 3600,
+    "tiktok": 3600,
+    "instagram": 3600,
+}
+SERVE_PUBLISH_MIN_CHANGES = 5     # New/dropped trend keys needed to publish early
+SERVE_MIN_PUBLISH_GAP = 120       # ...but never more often than this
+SERVE_MAX_PUBLISH_GAP = 900       # Publish any pending change at least this often
+
+def change_keys(name, result):
+    """The part of a source result whose change is worth publishing for"""
+    if not result:
+        return set()
+    if name == "x_influencers":
+        return set(result[0])
+    if name == "cross_validate":
+        return {k for k, v in result.items() if v["google"] or v["tiktok"] or v["instagram"]}
+    if name == "telegram":
+        return set()  # telegram_posts.json is written on refresh
+    return set(result)
+
+def _stop(signum, frame):
+    raise KeyboardInterrupt
+
+def serve_publish(sources):
+    scheduler.start()
+    with telemetry.phase("cleanup"):
+        cleanup_old_trends()
+    # The merge engine never mutates its inputs, so the in-memory sources can be published directly
+    final_trends, all_trend_files, _ = publish(sources)
+    print(f"\n✅ Published {len(final_trends)} trend reports ({len(all_trend_files)} in index)")
+    telemetry.print_summary(telemetry.finish())
+    telemetry.reset()
+    autocomplete.reset()
+
+def serve():
+    """Resident mode: refresh each source on its own interval, publish when enough changed"""
+    print_banner("Serve (resident, per-source refresh)")
+    signal.signal(signal.SIGTERM, _stop)
+    manifest.load()
+    momentum.load()
+
+    scheduler.start()
+    sources = collect_sources()
+    serve_publish(sources)
+
+    due = [(time.monotonic() + SERVE_INTERVALS[name], name) for name in SOURCE_DEFAULTS]
+    heapq.heapify(due)
+    pending = 0
+    last_publish = time.monotonic()
+    try:
+        while True:
+            due_at, name = heapq.heappop(due)
+            wait = due_at - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+
+            scheduler.start()
+            before = change_keys(name, sources.get(name))
+            # A failed refresh keeps the last good result instead of blanking the source
+            refresh_source(name, sources, keep_previous=True)
+            changed = len(before ^ change_keys(name, sources.get(name)))
+            pending += changed
+            heapq.heappush(due, (time.monotonic() + SERVE_INTERVALS[name], name))
+            print(f"   &#128260; {name}: {changed} changed ({pending} pending)")
+
+            since = time.monotonic() - last_publish
+            if (pending >= SERVE_PUBLISH_MIN_CHANGES and since >= SERVE_MIN_PUBLISH_GAP) or \
+                    (pending and since >= SERVE_MAX_PUBLISH_GAP):
+                serve_publish(sources)
+                pending = 0
+                last_publish = time.monotonic()
+    except KeyboardInterrupt:
+        print("\n&#9209; Stopping...")
+        if pending:
+            serve_publish(sources)
 
 
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:2] == ["serve"]:
+        serve()
+    elif sys.argv[1:2] == ["worker"]:
+        worker_main(sys.argv[2] if len(sys.argv) > 2 else None)
+    else:
+        # TREND_PROFILE=main profiles the whole run; phase names profile just that phase
+        profiling.run(main)
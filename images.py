@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+"""
+Trend Radar - Unsplash Image Enrichment
+Attaches an Unsplash photo to trend documents. Each trend is mapped to a
+search query (get_search_query); queries are deduplicated and looked up in a
+query -> image cache (state/image_cache.json) first, so trends sharing a
+query cost one request at most, and repeats across runs cost nothing.
+Trends whose lookup failed go on a retry queue with exponential backoff
+instead of being retried on every pass.
+Uncached queries are fetched concurrently (MAX_CONCURRENCY) under a token
+bucket sized to Unsplash's hourly quota that is resynced from every
+X-Ratelimit-Remaining header; when the bucket is empty the stage waits only
+as long as the run deadline allows and leaves the rest for a later run.
+Used by the pipeline (generate.py PHASE 7) and by add_images.py.
+"""
+
+import os
+import re
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import cassette
+import scheduler
+import statefile
+import telemetry
+
+# ================= CONFIG =================
+
+SEARCH_URL = "https://api.unsplash.com/search/photos"
+HOST = "api.unsplash.com"
+
+CACHE_FILE = f"{statefile.STATE_DIR}/image_cache.json"
+
+HOURLY_QUOTA = 50               # Unsplash demo apps: 50 requests/hour
+MAX_CONCURRENCY = 3
+REQUEST_TIMEOUT = 15
+IMAGE_TTL = 30 * 24 * 3600      # A photo found for a query stays good for a month
+MISS_TTL = 24 * 3600            # Queries with no results are retried daily
+RETRY_BASE = 15 * 60            # First retry delay for a trend whose lookup failed
+RETRY_MAX = 24 * 3600
+
+# Category-based fallback queries for better image matching
+CATEGORY_QUERIES = {
+    "politics": "politics government capitol",
+    "technology": "technology computer digital",
+    "crypto": "cryptocurrency bitcoin blockchain",
+    "gaming": "video games controller esports",
+    "entertainment": "entertainment movies television",
+    "memes": "internet culture social media",
+    "sports": "sports stadium athletics",
+    "news": "breaking news journalism",
+    "music": "music concert performance",
+    "culture": "pop culture trends",
+    "other": "trending viral social"
+}
+
+# Keyword fallbacks for specific topics
+KEYWORD_FALLBACKS = {
+    "ai": "artificial intelligence technology",
+    "npc": "video game character gaming",
+    "meme": "internet meme funny",
+    "stream": "live streaming video",
+    "viral": "social media viral trending",
+    "trump": "american politics",
+    "biden": "american politics",
+    "tiktok": "social media smartphone",
+    "twitter": "social media technology",
+    "youtube": "video streaming platform",
+    "chatgpt": "artificial intelligence chatbot",
+    "super_bowl": "american football superbowl",
+    "breaking_bad": "television drama series",
+    "skull": "skull emoji internet",
+    "airport": "airplane airport travel",
+    "christmas": "christmas holiday festive",
+    "terraria": "video game pixel art",
+    "instagram": "social media photography",
+    "reddit": "social media community",
+    "netflix": "streaming entertainment",
+}
+
+# ================= STATE =================
+
+_lock = threading.Lock()
+_cache = {}                     # query -> {"t": fetched_at, "image": {...} or None}
+_retries = {}                   # trend name -> {"attempts": n, "next": epoch}
+_tokens = float(HOURLY_QUOTA)
+_refilled_at = time.time()
+_file = statefile.StateFile(CACHE_FILE, "Image cache", "starting empty")
+
+def access_key():
+    # Read late: cassette replay sets a placeholder key after import
+    return os.getenv("UNSPLASH_ACCESS_KEY")
+
+def enabled():
+    return bool(access_key())
+
+def load():
+    global _cache, _retries, _tokens, _refilled_at
+    if _file.loaded:
+        return
+    data = _file.load() or {}
+    _cache = data.get("queries", {})
+    _retries = data.get("retry", {})
+    bucket = data.get("bucket")
+    if bucket:
+        # The quota is hourly - don't start every run with a full bucket
+        _tokens, _refilled_at = bucket["tokens"], bucket["t"]
+
+def save():
+    if not _file.writable():
+        return
+    now = time.time()
+    with _lock:
+        keep = {q: e for q, e in _cache.items()
+                if now - e["t"] < (IMAGE_TTL if e["image"] else MISS_TTL)}
+        # Entries not retried for a week belong to trends that have since expired
+        retry = {k: e for k, e in _retries.items() if e["next"] > now - 7 * 24 * 3600}
+        data = {"bucket": {"tokens": round(_tokens, 3), "t": _refilled_at}, "queries": keep, "retry": retry}
+    _file.save(json.dumps(data, indent=2, sort_keys=True))
+
+def cached(query):
+    """(hit, image) for a query; image is None for a cached miss"""
+    entry = _cache.get(query)
+    if entry is None:
+        return False, None
+    ttl = IMAGE_TTL if entry["image"] else MISS_TTL
+    if time.time() - entry["t"] >= ttl:
+        return False, None
+    return True, entry["image"]
+
+# ================= RETRY QUEUE =================
+
+def trend_key(filename):
+    """data/foo.json, foo.json and foo all name the same trend"""
+    return os.path.splitext(os.path.basename(filename))[0]
+
+def due(filename, now=None):
+    """Whether a trend may be looked up now (not backing off after a failure)"""
+    load()
+    entry = _retries.get(trend_key(filename))
+    return entry is None or entry["next"] <= (now or time.time())
+
+def _defer(key):
+    entry = _retries.setdefault(key, {"attempts": 0, "next": 0})
+    entry["attempts"] += 1
+    entry["next"] = time.time() + min(RETRY_BASE * 2 ** (entry["attempts"] - 1), RETRY_MAX)
+
+def _clear(key):
+    _retries.pop(key, None)
+
+# ================= QUERIES =================
+
+def get_search_query(trend_data, filename):
+    """Get the best search query for a trend"""
+    # Try headline first (most descriptive)
+    headline = trend_data.get("analysis", {}).get("headline", "")
+    if headline and len(headline) > 10:
+        # Extract key nouns from headline
+        words = re.sub(r'[^a-zA-Z\s]', '', headline).split()
+        # Skip common words
+        skip = {'the', 'a', 'an', 'is', 'are', 'was', 'were', 'in', 'on', 'at', 'to', 'for', 'of', 'and', 'or', 'but', 'with', 'as', 'by', 'this', 'that', 'it', 'its', 'into', 'across', 'over', 'how', 'why', 'what', 'who', 'when', 'takes', 'trend', 'trending', 'viral', 'internet', 'sparks'}
+        key_words = [w for w in words if w.lower() not in skip and len(w) > 2][:4]
+        if key_words:
+            return ' '.join(key_words)
+
+    # Try trend name
+    trend_name = trend_data.get("trend", "").lower()
+
+    # Check keyword fallbacks
+    for key, query in KEYWORD_FALLBACKS.items():
+        if key in trend_name:
+            return query
+
+    # Use category as fallback
+    category = trend_data.get("category", "other")
+    if category in CATEGORY_QUERIES:
+        return CATEGORY_QUERIES[category]
+
+    # Last resort: use filename
+    return filename.replace('.json', '').replace('_', ' ')
+
+# ================= RATE LIMIT =================
+
+def _refill(now):
+    global _tokens, _refilled_at
+    _tokens = min(HOURLY_QUOTA, _tokens + (now - _refilled_at) * HOURLY_QUOTA / 3600)
+    _refilled_at = now
+
+def _take():
+    """Take one request token, waiting for a refill only while the phase has time for it"""
+    global _tokens
+    if cassette.replaying():
+        return True
+    while True:
+        with _lock:
+            now = time.time()
+            _refill(now)
+            if _tokens >= 1:
+                _tokens -= 1
+                return True
+            wait = (1 - _tokens) * 3600 / HOURLY_QUOTA
+        if wait >= scheduler.phase_remaining():
+            return False
+        time.sleep(wait)
+
+def _observe_limit(response):
+    """Resync the bucket with what Unsplash says is left"""
+    global _tokens
+    remaining = response.headers.get("X-Ratelimit-Remaining")
+    with _lock:
+        if response.status_code in (403, 429):
+            _tokens = 0.0
+        elif remaining is not None and remaining.isdigit():
+            _tokens = min(_tokens, float(remaining))
+
+# ================= FETCH =================
+
+def fetch_unsplash_image(query):
+    """Search Unsplash for one photo; returns the image dict, None for no results, or "RATE_LIMITED"/"ERROR" """
+    search_query = re.sub(r'[^a-zA-Z0-9 ]', '', query)[:50]
+    try:
+        response = requests.get(
+            SEARCH_URL,
+            headers={"Authorization": f"Client-ID {access_key()}"},
+            params={
+                "query": search_query,
+                "per_page": 1,
+                "orientation": "landscape"
+            },
+            timeout=scheduler.clamp(REQUEST_TIMEOUT)
+        )
+    except scheduler.PhaseExpired:
+        return "RATE_LIMITED"   # Not tried - left for a later run, like an empty bucket
+    except requests.exceptions.RequestException as e:
+        print(f"      Unsplash error: {e}")
+        return "ERROR"
+    _observe_limit(response)
+    if response.status_code in (403, 429):
+        print(f"      &#9888; Unsplash rate limit reached (remaining: {response.headers.get('X-Ratelimit-Remaining', '?')})")
+        return "RATE_LIMITED"
+    if response.status_code != 200:
+        print(f"      Unsplash error: {response.status_code}")
+        return "ERROR"
+    results = response.json().get("results")
+    if not results:
+        return None
+    photo = results[0]
+    return {
+        "url": photo["urls"]["regular"],
+        "thumb": photo["urls"]["small"],
+        "credit": photo["user"]["name"],
+        "credit_link": photo["user"]["links"]["html"]
+    }
+
+def _resolve(query):
+    if scheduler.expired() or not _take():
+        return query, "RATE_LIMITED"
+    return query, fetch_unsplash_image(query)
+
+def resolve(queries):
+    """Look queries up, cache first, then Unsplash
+
+    Returns (answers, failed): answers maps each answered query to its image
+    (None = no results); failed holds queries whose request errored. Queries
+    not tried for lack of time or quota are in neither.
+    """
+    load()
+    answers = {}
+    failed = set()
+    missing = []
+    for query in dict.fromkeys(queries):
+        hit, image = cached(query)
+        if hit:
+            answers[query] = image
+        else:
+            missing.append(query)
+    if len(answers):
+        telemetry.count("cache_hits", len(answers), host=HOST)
+    if not missing or not enabled():
+        return answers, failed
+
+    with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENCY, len(missing))) as pool:
+        results = list(pool.map(_resolve, missing))
+    now = time.time()
+    with _lock:
+        for query, image in results:
+            if image == "ERROR":
+                failed.add(query)
+            if image in ("RATE_LIMITED", "ERROR"):
+                continue
+            _cache[query] = {"t": now, "image": image}
+            answers[query] = image
+    return answers, failed
+
+def enrich(documents):
+    """Attach an image to every (filename, trend_data) that lacks one; returns how many got one
+
+    Trends still backing off from a failed lookup are left alone; a trend whose
+    lookup fails now (no results or an error) is queued for a later retry.
+    """
+    load()
+    wanted = {}
+    for filename, data in documents:
+        if not data.get("image") and due(filename):
+            wanted.setdefault(get_search_query(data, filename), []).append((trend_key(filename), data))
+    if not wanted:
+        return 0
+    answers, failed = resolve(wanted)
+    added = 0
+    with _lock:
+        for query, trends in wanted.items():
+            image = answers.get(query)
+            for key, data in trends:
+                if image:
+                    data["image"] = image
+                    _clear(key)
+                    added += 1
+                elif query in answers or query in failed:
+                    _defer(key)
+    return added
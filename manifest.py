@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Artifact manifest for Trend Radar
+Records each artifact's logical created/updated time, content hash and size.
+File mtimes are useless on a fresh CI checkout, so retention and the
+index.json rebuild are driven from here instead of scanning directories.
+"""
+
+import os
+import json
+import heapq
+import datetime
+
+# ================= CONFIG =================
+
+STATE_DIR = "state"
+MANIFEST_FILE = f"{STATE_DIR}/manifest.json"
+DATA_DIR = "data"
+POSTS_DIR = "posts"
+
+# Data files that are not trend reports (never expire, never listed in index.json)
+META_FILES = {"index.json", "meme_signals.json", "telegram_posts.json"}
+
+# ================= STATE =================
+
+_entries = {}        # path -> {"kind", "created", "updated", "sha256", "size"[, "image"]}
+_expiry_heap = []    # (updated_epoch, path) - may hold stale items, checked on pop
+_loaded = False
+_dirty = False
+_index_changed = False
+
+# ================= HELPERS =================
+
+def _now_iso():
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+def _epoch(iso_ts):
+    """Parse an ISO timestamp to epoch seconds (naive timestamps are treated as UTC)"""
+    ts = datetime.datetime.fromisoformat(iso_ts)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=datetime.timezone.utc)
+    return ts.timestamp()
+
+def normalize_path(path):
+    return os.path.normpath(path).replace(os.sep, "/")
+
+def artifact_kind(path):
+    """Classify an artifact: trend data, post page, or metadata"""
+    folder, filename = os.path.split(path)
+    if folder == DATA_DIR and filename.endswith(".json") and filename not in META_FILES:
+        return "trend"
+    if folder == POSTS_DIR and filename.endswith(".html"):
+        return "post"
+    return "meta"
+
+def _push_expiry(path, entry):
+    if entry["kind"] != "meta":
+        heapq.heappush(_expiry_heap, (_epoch(entry["updated"]), path))
+
+# ================= LOAD / SAVE =================
+
+def load():
+    """Load the manifest, bootstrapping it from existing artifacts on first use"""
+    global _entries, _expiry_heap, _loaded, _dirty, _index_changed
+    if _loaded:
+        return
+    _loaded = True
+
+    if os.path.exists(MANIFEST_FILE):
+        try:
+            with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+                _entries = json.load(f).get("artifacts", {})
+        except Exception as e:
+            print(f"   &#9888; Manifest unreadable ({e}) - rebuilding")
+            _entries = {}
+
+    if not _entries:
+        bootstrap()
+
+    _expiry_heap = [
+        (_epoch(e["updated"]), path) for path, e in _entries.items() if e["kind"] != "meta"
+    ]
+    heapq.heapify(_expiry_heap)
+
+def save():
+    """Persist the manifest if anything changed"""
+    global _dirty
+    if not _loaded or not _dirty:
+        return
+    import output  # output records into the manifest - imported late to avoid the cycle
+    # No save timestamp of its own: the file changes only when an artifact entry does
+    output.write_state(MANIFEST_FILE, json.dumps({"artifacts": _entries}, sort_keys=True, separators=(",", ":")))
+    _dirty = False
+
+def active():
+    return _loaded
+
+def bootstrap():
+    """One-time scan of data/ and posts/ using the logical timestamps inside trend files"""
+    global _dirty, _index_changed
+    import hashlib
+    from renderer import safe_post_name
+
+    print("   &#128209; Building artifact manifest from existing files...")
+    post_times = {}
+    for folder in [DATA_DIR, POSTS_DIR]:
+        if not os.path.exists(folder):
+            continue
+        for filename in sorted(os.listdir(folder)):
+            if filename.endswith((".gz", ".br", ".tmp")):
+                continue
+            path = normalize_path(os.path.join(folder, filename))
+            kind = artifact_kind(path)
+            with open(path, "rb") as f:
+                content = f.read()
+            created = updated = None
+            image = None
+            if kind == "trend":
+                try:
+                    data = json.loads(content)
+                    image = bool(data.get("image"))
+                    updated = data.get("timestamp")
+                    history = data.get("history") or []
+                    created = history[0].get("timestamp") if history else updated
+                    if updated and data.get("trend"):
+                        post_times[f"{POSTS_DIR}/{safe_post_name(data['trend'])}.html"] = (created, updated)
+                except Exception:
+                    pass
+            elif kind == "post":
+                created, updated = post_times.get(path, (None, None))
+            if not updated:
+                # No logical time available - start the retention clock now
+                created = updated = _now_iso()
+            _entries[path] = {
+                "kind": kind,
+                "created": created or updated,
+                "updated": updated,
+                "sha256": hashlib.sha256(content).hexdigest(),
+                "size": len(content)
+            }
+            if image is not None:
+                _entries[path]["image"] = image
+    _dirty = True
+    _index_changed = True
+    print(f"      &#10003; {len(_entries)} artifacts recorded")
+
+# ================= RECORDING =================
+
+def record(path, sha256, size, timestamp=None, attrs=None):
+    """Record a write; `timestamp` is the artifact's logical time (defaults to now)
+
+    `attrs` are extra facts about the content kept with the entry (e.g. whether a
+    trend has an image) so maintenance jobs can find work without opening files.
+    """
+    global _dirty, _index_changed
+    if not _loaded:
+        return
+    path = normalize_path(path)
+    timestamp = timestamp or _now_iso()
+    entry = _entries.get(path)
+    if entry is None:
+        entry = {"kind": artifact_kind(path), "created": timestamp}
+        _entries[path] = entry
+        if entry["kind"] == "trend":
+            _index_changed = True
+    elif entry.get("updated") == timestamp and entry.get("sha256") == sha256 and \
+            all(entry.get(k) == v for k, v in (attrs or {}).items()):
+        return
+    entry["updated"] = max(timestamp, entry.get("updated") or timestamp, key=_epoch)
+    entry["sha256"] = sha256
+    entry["size"] = size
+    entry.update(attrs or {})
+    _push_expiry(path, entry)
+    _dirty = True
+
+def forget(path):
+    """Drop an artifact from the manifest"""
+    global _dirty, _index_changed
+    path = normalize_path(path)
+    entry = _entries.pop(path, None)
+    if entry is not None:
+        _dirty = True
+        if entry["kind"] == "trend":
+            _index_changed = True
+
+def annotate(path, **attrs):
+    """Set facts about an artifact without a write (e.g. image=False after a failed lookup)"""
+    global _dirty
+    entry = _entries.get(normalize_path(path))
+    if entry is None:
+        return
+    if any(entry.get(k) != v for k, v in attrs.items()):
+        entry.update(attrs)
+        _dirty = True
+
+def get(path):
+    return _entries.get(normalize_path(path))
+
+# ================= QUERIES =================
+
+def pop_expired(cutoff):
+    """Remove and return artifacts whose logical update time is older than `cutoff` (datetime)"""
+    cutoff_epoch = cutoff.timestamp()
+    expired = []
+    while _expiry_heap and _expiry_heap[0][0] < cutoff_epoch:
+        updated_epoch, path = heapq.heappop(_expiry_heap)
+        entry = _entries.get(path)
+        # Skip stale heap items left behind by later updates or removals
+        if entry is None or _epoch(entry["updated"]) != updated_epoch:
+            continue
+        forget(path)
+        expired.append(path)
+    return expired
+
+def trend_files():
+    """Sorted trend data filenames, as listed in index.json"""
+    return sorted(
+        os.path.basename(path) for path, e in _entries.items() if e["kind"] == "trend"
+    )
+
+def trends_without_image():
+    """Trend data paths not known to have an image (None = not recorded yet, e.g. old manifests)"""
+    return sorted(
+        path for path, e in _entries.items() if e["kind"] == "trend" and not e.get("image")
+    )
+
+def index_changed():
+    return _index_changed
+
+def mark_index_written():
+    global _index_changed
+    _index_changed = False
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+Trend Radar - CoinGecko Market Snapshot Store
+Every run appends one broad /coins/markets page (MARKET_PAGE_SIZE coins) to a
+columnar store in state/markets.npz: one row per snapshot, one column per
+coin, float32 prices and 24h volumes (NaN where a coin was missing). Gainers,
+losers and unusual volume over each WINDOWS span are computed with NumPy
+against the snapshot closest to that far back. Windows with no usable history
+yet fall back to the percentages CoinGecko reports itself. A cassette run
+starts from an empty store and never writes it, so a replay sees the same
+(CoinGecko-reported) movers the recording did.
+"""
+
+import time
+import warnings
+
+import statefile
+
+# ================= CONFIG =================
+
+STORE_FILE = f"{statefile.STATE_DIR}/markets.npz"
+
+MARKETS_URL = "https://api.coingecko.com/api/v3/coins/markets"
+MARKET_PAGE_SIZE = 250            # CoinGecko's maximum per request
+
+MAX_AGE_SECONDS = 26 * 3600       # Enough history for the 24h window plus slack
+MAX_SNAPSHOTS = 600               # Serve mode refreshes every few minutes
+
+# window: (seconds, min |% change| to count as a mover, CoinGecko fallback field)
+WINDOWS = {
+    "15m": (15 * 60, 3.0, None),
+    "1h": (3600, 5.0, "price_change_percentage_1h_in_currency"),
+    "24h": (24 * 3600, 10.0, "price_change_percentage_24h"),
+}
+# A past snapshot stands in for "window ago" if it is within this fraction of the window
+WINDOW_TOLERANCE = 0.5
+
+VOLUME_SPIKE = 3.0                # 24h volume vs. its median over the store
+MIN_VOLUME_HISTORY = 4            # Snapshots needed before volume can look unusual
+TOP_MOVERS = 5                    # Per window and direction
+
+# ================= STATE =================
+
+_store = None                     # {"times", "ids", "symbols", "names", "price", "volume"}
+_file = statefile.StateFile(STORE_FILE, "Market snapshots")
+
+def _empty():
+    import numpy as np
+    return {
+        "times": np.zeros(0, dtype=np.float64),
+        "ids": np.zeros(0, dtype=str),
+        "symbols": np.zeros(0, dtype=str),
+        "names": np.zeros(0, dtype=str),
+        "price": np.zeros((0, 0), dtype=np.float32),
+        "volume": np.zeros((0, 0), dtype=np.float32),
+    }
+
+def _read(path):
+    import numpy as np
+    with np.load(path, allow_pickle=False) as data:
+        return {k: data[k] for k in _empty()}
+
+def load():
+    global _store
+    if not _file.loaded:
+        _store = _file.load(_read) or _empty()
+
+def save():
+    if not _file.writable() or not len(_store["times"]):
+        return
+    import io
+    import numpy as np
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **_store)
+    _file.save(buffer.getvalue())
+
+# ================= SNAPSHOTS =================
+
+def _prune(now):
+    """Drop old snapshots, then coins no longer present in any snapshot"""
+    import numpy as np
+    keep = _store["times"] >= now - MAX_AGE_SECONDS
+    keep[:-MAX_SNAPSHOTS] = False
+    for k in ("times", "price", "volume"):
+        _store[k] = _store[k][keep]
+    seen = ~np.all(np.isnan(_store["price"]), axis=0)
+    for k in ("ids", "symbols", "names"):
+        _store[k] = _store[k][seen]
+    for k in ("price", "volume"):
+        _store[k] = _store[k][:, seen]
+
+def append(coins, now=None):
+    """Add one /coins/markets response as a snapshot row; returns the number of snapshots kept"""
+    import numpy as np
+    load()
+    now = now or time.time()
+    coins = [c for c in coins if c.get("id") and c.get("current_price")]
+
+    index = {cid: i for i, cid in enumerate(_store["ids"].tolist())}
+    new = [c for c in coins if c["id"] not in index]
+    if new:
+        _store["ids"] = np.concatenate([_store["ids"], np.array([c["id"] for c in new], dtype=str)])
+        _store["symbols"] = np.concatenate([_store["symbols"], np.array([(c.get("symbol") or "").upper() for c in new], dtype=str)])
+        _store["names"] = np.concatenate([_store["names"], np.array([c.get("name") or "" for c in new], dtype=str)])
+        pad = np.full((len(_store["times"]), len(new)), np.nan, dtype=np.float32)
+        _store["price"] = np.hstack([_store["price"], pad])
+        _store["volume"] = np.hstack([_store["volume"], pad])
+        index.update({c["id"]: len(index) + i for i, c in enumerate(new)})
+
+    cols = np.array([index[c["id"]] for c in coins], dtype=np.intp)
+    price = np.full(len(index), np.nan, dtype=np.float32)
+    volume = np.full(len(index), np.nan, dtype=np.float32)
+    price[cols] = [c["current_price"] for c in coins]
+    volume[cols] = [c.get("total_volume") or np.nan for c in coins]
+
+    _store["times"] = np.append(_store["times"], now)
+    _store["price"] = np.vstack([_store["price"], price])
+    _store["volume"] = np.vstack([_store["volume"], volume])
+    _prune(now)
+    return len(_store["times"])
+
+def _row_ago(seconds, now):
+    """Index of the snapshot closest to `seconds` before now (within tolerance), or None"""
+    import numpy as np
+    times = _store["times"][:-1]
+    if not len(times):
+        return None
+    target = now - seconds
+    i = int(np.argmin(np.abs(times - target)))
+    return i if abs(times[i] - target) <= seconds * WINDOW_TOLERANCE else None
+
+# ================= MOVERS =================
+
+def movers(coins, now=None):
+    """Gainers, losers and volume spikes for the latest snapshot
+
+    Returns {coin_id: {"symbol", "name", "changes": {window: %}, "volume_ratio", "reasons": [...]}}
+    for every coin that made at least one list.
+    """
+    import numpy as np
+    now = now or time.time()
+    if not len(_store["times"]):
+        return {}
+    ids = _store["ids"]
+    current = _store["price"][-1]
+    listed = ~np.isnan(current)
+    by_id = {c["id"]: c for c in coins if c.get("id")}
+
+    changes = {}
+    for window, (seconds, _, fallback) in WINDOWS.items():
+        row = _row_ago(seconds, now)
+        change = np.full(len(ids), np.nan)
+        if row is not None:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                change = (current / _store["price"][row] - 1.0) * 100.0
+        if fallback:
+            # Coins without a snapshot that far back (or no such snapshot at all)
+            reported = np.array([by_id.get(cid, {}).get(fallback) for cid in ids.tolist()], dtype=np.float64)
+            change = np.where(np.isfinite(change), change, reported)
+        if row is None and not fallback:
+            continue
+        changes[window] = np.where(listed & np.isfinite(change), change, np.nan)
+
+    history = _store["volume"][:-1]
+    volume_ratio = np.full(len(ids), np.nan)
+    if len(history) >= MIN_VOLUME_HISTORY:
+        with warnings.catch_warnings(), np.errstate(all="ignore"):
+            # New coins have an all-NaN history column
+            warnings.simplefilter("ignore", RuntimeWarning)
+            baseline = np.nanmedian(history, axis=0)
+            volume_ratio = _store["volume"][-1] / baseline
+
+    picked = {}
+    def pick(cols, reason):
+        for col in cols.tolist():
+            entry = picked.setdefault(col, {"reasons": []})
+            entry["reasons"].append(reason)
+
+    for window, change in changes.items():
+        threshold = WINDOWS[window][1]
+        filled = np.nan_to_num(change, nan=0.0)
+        order = np.argsort(filled)
+        losers = order[:TOP_MOVERS]
+        gainers = order[::-1][:TOP_MOVERS]
+        pick(gainers[filled[gainers] >= threshold], f"gainer_{window}")
+        pick(losers[filled[losers] <= -threshold], f"loser_{window}")
+
+    ratio = np.nan_to_num(volume_ratio, nan=0.0)
+    spikes = np.argsort(ratio)[::-1][:TOP_MOVERS]
+    pick(spikes[ratio[spikes] >= VOLUME_SPIKE], "volume_spike")
+
+    result = {}
+    for col, entry in picked.items():
+        result[str(ids[col])] = {
+            "symbol": str(_store["symbols"][col]),
+            "name": str(_store["names"][col]),
+            "changes": {w: round(float(c[col]), 2) for w, c in changes.items() if np.isfinite(c[col])},
+            "volume_ratio": round(float(volume_ratio[col]), 2) if np.isfinite(volume_ratio[col]) else None,
+            "reasons": entry["reasons"],
+        }
+    return result
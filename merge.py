@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Trend Radar - PHASE 5 Merge Engine
+Folds the per-source trend dicts into one typed record per trend. Platforms
+are OR-ed, locations kept as an insertion-ordered set, and each metric is
+combined by its rule in METRIC_RULES (sum / max / latest) instead of the last
+source silently overwriting the others. Source dicts are never mutated: a
+record refers to its first source's containers and copies them only when a
+second source is merged into it, so most trends (seen by one source) cost no
+copies at all.
+"""
+
+from records import TrendRecord
+
+# ================= CONFIG =================
+
+# How a metric reported by several sources is combined
+#   sum    - independent counts that add up (mentions, posts seen per source)
+#   max    - the same quantity seen by several scrapers (views, likes, volumes)
+#   latest - flags, labels and anything non-numeric
+METRIC_RULES = {
+    "news_mentions": "sum",
+    "new_posts": "sum",
+    "total_posts": "sum",
+    "posts": "sum",
+    "x_posts": "sum",
+    "reddit_comments": "sum",
+    "google_suggest": "latest",
+    "is_meme_coin": "latest",
+}
+DEFAULT_NUMERIC_RULE = "max"
+
+def _numeric(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def rule_for(metric, value):
+    rule = METRIC_RULES.get(metric)
+    if rule:
+        return rule
+    return DEFAULT_NUMERIC_RULE if _numeric(value) else "latest"
+
+# ================= ENGINE =================
+
+class MergeEngine:
+    """Accumulates trends from every source into one TrendRecord per normalized key"""
+
+    def __init__(self):
+        self.records = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, key):
+        return key in self.records
+
+    def _fold(self, record, data):
+        record.own()
+        platforms = record.platforms
+        for platform, present in (data.get("platforms") or {}).items():
+            platforms[platform] = platforms.get(platform) or present
+        metrics = record.metrics
+        for metric, value in (data.get("metrics") or {}).items():
+            self.merge_metric(metrics, metric, value)
+        for location in data.get("locations") or ():
+            record.locations[location] = None
+
+    @staticmethod
+    def merge_metric(metrics, metric, value):
+        """Combine one metric value into a metrics dict by its rule"""
+        current = metrics.get(metric)
+        if current is None:
+            metrics[metric] = value
+            return
+        if value is None:
+            return
+        rule = rule_for(metric, value)
+        if rule == "latest" or not (_numeric(current) and _numeric(value)):
+            metrics[metric] = value
+        elif rule == "sum":
+            metrics[metric] = current + value
+        elif value > current:
+            metrics[metric] = value
+
+    def get(self, key):
+        return self.records.get(key)
+
+    def confirm(self, key, platform, metric, value):
+        """Mark a trend as seen on `platform` (cross-validation) and merge that platform's metric"""
+        record = self.records[key]
+        record.own()
+        record.platforms[platform] = True
+        self.merge_metric(record.metrics, metric, value)
+
+    def add_all(self, trends, source=None, crypto_source=False, x_first_penalty=False):
+        """Merge a {key: data} source
+
+        The flags are set on the records this source creates; `source` makes the
+        source label of existing records follow this source.
+        """
+        records = self.records
+        new = TrendRecord.from_dict
+        for key, data in trends.items():
+            record = records.get(key)
+            if record is None:
+                records[key] = new(data, crypto_source, x_first_penalty)
+            else:
+                self._fold(record, data)
+                if source is not None:
+                    record.source = data.get("source", source)
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Trend Radar - Hedged Requests Across Mirrors
+Sends the same request to the best few mirrors (e.g. Nitter instances) at
+once and takes the first good response. Every response - winners and the
+stragglers that finish later - feeds a per-mirror latency/success EWMA that
+ranks mirrors for the next call; the ranking survives runs in
+state/mirrors.json (except cassette runs, which rank from the priors alone).
+"""
+
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import requests
+
+import breakers
+import scheduler
+import statefile
+
+# ================= CONFIG =================
+
+STATE_FILE = f"{statefile.STATE_DIR}/mirrors.json"
+
+HEDGE_FANOUT = 3          # Mirrors queried at once
+ALPHA = 0.3               # EWMA weight of the newest observation
+PRIOR_LATENCY = 5.0       # Seconds assumed for a mirror we know nothing about
+PRIOR_SUCCESS = 0.5
+MIN_SUCCESS = 0.05        # Keeps dead mirrors rankable (probed again once their breaker cools down)
+
+# ================= STATE =================
+
+_lock = threading.Lock()
+_stats = {}
+_file = statefile.StateFile(STATE_FILE, "Mirror stats")
+
+def load():
+    global _stats
+    if not _file.loaded:
+        _stats = _file.load() or {}
+
+def save():
+    if not _file.writable():
+        return
+    with _lock:
+        data = json.dumps(_stats, indent=2, sort_keys=True)
+    _file.save(data)
+
+def observe(mirror, seconds, ok):
+    """Fold one request outcome into the mirror's latency/success averages"""
+    with _lock:
+        s = _stats.setdefault(mirror, {"latency": PRIOR_LATENCY, "success": PRIOR_SUCCESS, "n": 0})
+        s["latency"] += ALPHA * (seconds - s["latency"])
+        s["success"] += ALPHA * ((1.0 if ok else 0.0) - s["success"])
+        s["n"] += 1
+        s["t"] = time.time()
+
+def expected_seconds(mirror):
+    """Expected time to a good answer: latency inflated by the failure rate"""
+    s = _stats.get(mirror)
+    if s is None:
+        return PRIOR_LATENCY / PRIOR_SUCCESS
+    return s["latency"] / max(s["success"], MIN_SUCCESS)
+
+def ranked(mirrors):
+    load()
+    return sorted(mirrors, key=expected_seconds)
+
+# ================= HEDGED FETCH =================
+
+def _fetch(mirror, path, timeout, accept, headers):
+    start = time.perf_counter()
+    try:
+        response = requests.get(f"{mirror}{path}", headers=headers, timeout=timeout)
+    except breakers.CircuitOpenError:
+        return mirror, None
+    except requests.exceptions.RequestException:
+        observe(mirror, time.perf_counter() - start, False)
+        return mirror, None
+    ok = accept(response)
+    observe(mirror, time.perf_counter() - start, ok)
+    return mirror, response if ok else None
+
+def hedged_get(mirrors, path, timeout=15, accept=None, headers=None, fanout=HEDGE_FANOUT):
+    """GET `path` from the best `fanout` mirrors at once; return (mirror, response) of the first good one
+
+    Returns (None, None) when every queried mirror failed. Slower requests are
+    not waited for - they finish in the background and only update the ranking.
+    """
+    accept = accept or (lambda r: r.status_code == 200)
+    # Cooldown-aware: a mirror whose breaker has cooled down gets its probe request
+    live = [m for m in ranked(mirrors) if breakers.available(breakers.host_key(m))]
+    candidates = live[:fanout]
+    if not candidates:
+        return None, None
+    try:
+        timeout = scheduler.clamp(timeout)
+    except scheduler.PhaseExpired:
+        return None, None
+
+    pool = ThreadPoolExecutor(max_workers=len(candidates))
+    try:
+        pending = {pool.submit(_fetch, m, path, timeout, accept, headers) for m in candidates}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                mirror, response = future.result()
+                if response is not None:
+                    return mirror, response
+        return None, None
+    finally:
+        # Don't block on the losers
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Trend Radar - Incremental Momentum Tracking
+Keeps a time-decayed (EWMA) score, velocity and acceleration per trend.
+Each new observation updates the state in O(1) - history is never replayed.
+Velocity/acceleration are in score points per hour. The state lives in
+state/momentum.json; cassette runs track momentum in memory only, from an
+empty state, so a replay's scores (and Claude prompts) match the recording.
+"""
+
+import json
+import math
+import datetime
+
+import statefile
+
+# ================= CONFIG =================
+
+STATE_FILE = f"{statefile.STATE_DIR}/momentum.json"
+
+SCORE_TAU_HOURS = 0.5       # EWMA time constant for the score
+VELOCITY_TAU_HOURS = 0.5    # Smoothing time constant for velocity
+MIN_DT_HOURS = 1 / 60       # Guard against back-to-back observations
+MAX_AGE_HOURS = 72          # Forget trends not observed for this long
+MAX_TRACKED = 5000          # Keep the strongest trends only
+
+RISING_VELOCITY = 5.0       # points/hour
+FALLING_VELOCITY = -5.0
+
+# ================= STATE =================
+
+_states = {}
+_file = statefile.StateFile(STATE_FILE, "Momentum state")
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+def load():
+    global _states
+    if not _file.loaded:
+        _states = (_file.load() or {}).get("trends", {})
+
+def save(now=None):
+    """Prune stale/weak entries and persist the state"""
+    if not _file.writable():
+        return
+    now = (now or _now()).timestamp()
+    cutoff = now - MAX_AGE_HOURS * 3600
+    keep = {k: s for k, s in _states.items() if s["t"] >= cutoff}
+    if len(keep) > MAX_TRACKED:
+        strongest = sorted(keep, key=lambda k: keep[k]["ewma"], reverse=True)[:MAX_TRACKED]
+        keep = {k: keep[k] for k in strongest}
+    _states.clear()
+    _states.update(keep)
+    _file.save(json.dumps({"updated": _now().isoformat(), "trends": _states}, separators=(",", ":")))
+
+def get(key):
+    return _states.get(key)
+
+# ================= UPDATES =================
+
+def update(key, score, now=None):
+    """Fold one observation into a trend's state in O(1)"""
+    t = (now or _now()).timestamp()
+    state = _states.get(key)
+    if state is None:
+        state = {"ewma": float(score), "velocity": 0.0, "acceleration": 0.0, "t": t, "n": 1}
+        _states[key] = state
+        return state
+
+    dt = max((t - state["t"]) / 3600, MIN_DT_HOURS)
+    alpha = 1 - math.exp(-dt / SCORE_TAU_HOURS)
+    beta = 1 - math.exp(-dt / VELOCITY_TAU_HOURS)
+
+    ewma = state["ewma"] + alpha * (score - state["ewma"])
+    raw_velocity = (ewma - state["ewma"]) / dt
+    velocity = state["velocity"] + beta * (raw_velocity - state["velocity"])
+
+    state["acceleration"] = (velocity - state["velocity"]) / dt
+    state["velocity"] = velocity
+    state["ewma"] = ewma
+    state["t"] = t
+    state["n"] += 1
+    return state
+
+def observe_all(keys, scores, now=None):
+    """Update every candidate and return (velocity, acceleration) arrays aligned with `keys`"""
+    import numpy as np
+    now = now or _now()
+    n = len(keys)
+    velocity = np.zeros(n)
+    acceleration = np.zeros(n)
+    for i, (key, score) in enumerate(zip(keys, scores)):
+        state = update(key, score, now)
+        velocity[i] = state["velocity"]
+        acceleration[i] = state["acceleration"]
+    return velocity, acceleration
+
+# ================= LABELS =================
+
+def labels(key, signal_score):
+    """(momentum, lifecycle) labels from the time series, falling back to score thresholds"""
+    state = _states.get(key)
+    if state is None or state["n"] < 2:
+        # No time series yet - same thresholds as before momentum tracking
+        momentum = "rising" if signal_score > 70 else "stable"
+        lifecycle = "new" if signal_score >= 80 else ("rising" if signal_score >= 60 else ("peak" if signal_score >= 40 else "declining"))
+        return momentum, lifecycle
+
+    velocity = state["velocity"]
+    if velocity >= RISING_VELOCITY:
+        momentum = "surging" if state["acceleration"] > 0 else "rising"
+        lifecycle = "rising"
+    elif velocity <= FALLING_VELOCITY:
+        momentum = "falling"
+        lifecycle = "declining"
+    else:
+        momentum = "stable"
+        lifecycle = "peak" if signal_score >= 60 else "declining"
+    return momentum, lifecycle
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Output layer for Trend Radar artifacts
+Dev mode: pretty-printed JSON, plain files (same as before)
+Production mode (TREND_OUTPUT_MODE=production): minified JSON with sorted keys
+Precompressed .gz/.br siblings for static hosting are built at deploy time
+(python output.py compress data posts) and kept out of git.
+Every write is skipped when the bytes on disk are already identical, and goes
+through a temp file + os.replace otherwise, so a killed run never leaves a
+half-written file. Directories touched by renames are fsynced once, in flush().
+"""
+
+import os
+import sys
+import json
+import gzip
+import hashlib
+import threading
+
+try:
+    import brotli
+except ImportError:  # brotli is optional - .br copies are skipped without it
+    brotli = None
+
+import manifest
+
+# ================= CONFIG =================
+
+PRODUCTION = os.getenv("TREND_OUTPUT_MODE", "").lower() in ("prod", "production")
+
+# Only text artifacts served to browsers get precompressed copies
+COMPRESS_EXTENSIONS = (".json", ".html")
+
+# ================= STATE =================
+
+_lock = threading.Lock()
+_dirty_dirs = set()   # Directories with renames not yet fsynced
+_stats = {"written": 0, "unchanged": 0}
+
+# ================= ATOMIC FILES =================
+
+def _same_content(path, content, sha256=None):
+    """Whether `path` already holds exactly `content` (manifest hash first, bytes otherwise)"""
+    if not os.path.exists(path):
+        return False
+    entry = manifest.get(path) if sha256 else None
+    if entry and entry.get("sha256"):
+        return entry["sha256"] == sha256 and entry.get("size") == len(content)
+    if os.path.getsize(path) != len(content):
+        return False
+    with open(path, "rb") as f:
+        return f.read() == content
+
+def replace_file(path, content):
+    """Write bytes via a temp file + os.replace; readers see the old or the new file, never half of one"""
+    folder = os.path.dirname(path) or "."
+    tmp = os.path.join(folder, f".{os.path.basename(path)}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(content)
+        # The data must be on disk before the rename is, or a crash can leave an empty/partial file
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    with _lock:
+        _dirty_dirs.add(folder)
+
+def write_bytes(path, content):
+    """Atomically write `content` unless the file already holds it; returns whether it was written"""
+    if _same_content(path, content):
+        _stats["unchanged"] += 1
+        return False
+    replace_file(path, content)
+    _stats["written"] += 1
+    return True
+
+def write_state(path, text):
+    """Write a state file (state/*.json etc.) - atomic and skipped when unchanged, not in the manifest"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    return write_bytes(path, text.encode("utf-8"))
+
+def mark_dirty(folder):
+    """Have flush() fsync a directory that another process (e.g. a render worker) renamed into"""
+    with _lock:
+        _dirty_dirs.add(folder)
+
+def flush():
+    """fsync every directory that received renames since the last flush (makes them durable)"""
+    with _lock:
+        folders = sorted(_dirty_dirs)
+        _dirty_dirs.clear()
+    for folder in folders:
+        try:
+            fd = os.open(folder, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass  # Not supported on every platform/filesystem (e.g. Windows)
+        finally:
+            os.close(fd)
+    written, unchanged = _stats["written"], _stats["unchanged"]
+    _stats.update(written=0, unchanged=0)
+    return written, unchanged
+
+# ================= SERIALIZATION =================
+
+def dumps_json(data, ensure_ascii=True):
+    """Serialize data the way the current output mode wants it"""
+    if PRODUCTION:
+        return json.dumps(data, ensure_ascii=ensure_ascii, sort_keys=True, separators=(",", ":"))
+    return json.dumps(data, ensure_ascii=ensure_ascii, indent=2)
+
+def compress_copies(path, content):
+    """Write .gz (and .br if available) siblings next to an artifact"""
+    # mtime=0 keeps gzip output byte-identical for identical content
+    replace_file(path + ".gz", gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli is not None:
+        replace_file(path + ".br", brotli.compress(content, quality=11))
+
+def _stale_copies(path):
+    """Whether any compressed sibling of `path` is missing or older than the artifact"""
+    mtime = os.path.getmtime(path)
+    suffixes = (".gz", ".br") if brotli is not None else (".gz",)
+    for suffix in suffixes:
+        copy = path + suffix
+        if not os.path.exists(copy) or os.path.getmtime(copy) < mtime:
+            return True
+    return False
+
+def compress_tree(folders):
+    """Deploy step: (re)build the compressed copies of every stale artifact in `folders`"""
+    built = 0
+    for folder in folders:
+        for name in sorted(os.listdir(folder)):
+            path = os.path.join(folder, name)
+            if not name.endswith(COMPRESS_EXTENSIONS) or not os.path.isfile(path) or not _stale_copies(path):
+                continue
+            with open(path, "rb") as f:
+                compress_copies(path, f.read())
+            built += 1
+    flush()
+    return built
+
+# ================= WRITERS =================
+
+def write_text(path, text, timestamp=None, attrs=None):
+    """Write a text artifact (HTML/JSON), record it under its logical `timestamp` in the manifest; returns whether it was written"""
+    content = text.encode("utf-8")
+    sha256 = hashlib.sha256(content).hexdigest()
+    written = not _same_content(path, content, sha256)
+    if written:
+        replace_file(path, content)
+        _stats["written"] += 1
+    else:
+        _stats["unchanged"] += 1
+    manifest.record(path, sha256, len(content), timestamp, attrs)
+    return written
+
+def write_json(path, data, ensure_ascii=True):
+    """Write a JSON artifact (trend files carry their logical time in "timestamp")"""
+    timestamp = data.get("timestamp") if isinstance(data, dict) else None
+    attrs = None
+    if isinstance(data, dict) and manifest.artifact_kind(manifest.normalize_path(path)) == "trend":
+        # Lets add_images find imageless trends from the manifest alone
+        attrs = {"image": bool(data.get("image"))}
+    return write_text(path, dumps_json(data, ensure_ascii=ensure_ascii), timestamp, attrs)
+
+def remove(path):
+    """Remove an artifact together with its compressed copies"""
+    removed = 0
+    for p in (path, path + ".gz", path + ".br"):
+        if os.path.exists(p):
+            os.remove(p)
+            removed += 1
+    manifest.forget(path)
+    return removed
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["compress"]:
+        folders = sys.argv[2:] or ["data", "posts"]
+        print(f"&#10003; {compress_tree(folders)} artifacts compressed")
+    else:
+        print("Usage: python output.py compress [folder ...]")
@@ -0,0 +1,34 @@
+// Shared script for generated post pages (posts/*.html)
+(function() {
+  // Apply saved theme immediately to prevent flash
+  const savedTheme = localStorage.getItem('trend-radar-theme') || 'light';
+  document.documentElement.setAttribute('data-theme', savedTheme);
+
+  // Format timestamps to relative time
+  function formatTimeAgo(timestamp) {
+    const date = new Date(timestamp);
+    const now = new Date();
+    const seconds = Math.floor((now - date) / 1000);
+    
+    if (seconds < 60) return 'Just now';
+    if (seconds < 3600) return Math.floor(seconds / 60) + 'm ago';
+    if (seconds < 86400) return Math.floor(seconds / 3600) + 'h ago';
+    if (seconds < 604800) return Math.floor(seconds / 86400) + 'd ago';
+    return date.toLocaleDateString();
+  }
+  
+  function formatTimestamps() {
+    document.querySelectorAll('[data-timestamp]').forEach(el => {
+      const ts = el.getAttribute('data-timestamp');
+      if (ts) {
+        el.textContent = (el.classList.contains('time-badge') ? '🕐 ' : '') + formatTimeAgo(ts);
+      }
+    });
+  }
+  
+  if (document.readyState === 'loading') {
+    document.addEventListener('DOMContentLoaded', formatTimestamps);
+  } else {
+    formatTimestamps();
+  }
+})();
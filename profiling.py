@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Trend Radar - Profiling Hooks
+TREND_PROFILE=main            profile the whole run
+TREND_PROFILE=score,merge     profile selected phases (names as in telemetry.phase)
+Profiled targets get cProfile stats (<name>.prof + <name>.txt) and their top
+tracemalloc allocation sites, attributed to the repo line that caused them
+(e.g. the `.json()` call that built an Apify item list), under TREND_PROFILE_DIR
+(default state/profile). Peak RSS is measured for every phase regardless.
+"""
+
+import os
+import io
+import json
+import pstats
+import cProfile
+import tracemalloc
+import contextlib
+from collections import defaultdict
+
+# ================= CONFIG =================
+
+TARGETS = {t.strip() for t in os.getenv("TREND_PROFILE", "").split(",") if t.strip()}
+PROFILE_DIR = os.getenv("TREND_PROFILE_DIR", "state/profile")
+TRACE_FRAMES = int(os.getenv("TREND_TRACEMALLOC_FRAMES", "8"))
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_active = False   # cProfile can't nest - only one target at a time
+
+def enabled(name):
+    return name in TARGETS
+
+# ================= PEAK RSS =================
+
+def reset_peak_rss():
+    """Reset the kernel's high-water mark so the next reading is per phase (Linux only)"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+def peak_rss_mb():
+    """Peak resident set size since the last reset (or process start)"""
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, KiB elsewhere
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    except (ImportError, OSError):
+        return None
+
+# ================= ALLOCATIONS =================
+
+def _site(frame):
+    return f"{os.path.relpath(frame.filename, REPO_DIR)}:{frame.lineno}"
+
+def allocation_sites(snapshot, limit=TOP_ALLOCATIONS):
+    """Top live allocations grouped two ways: by the repo line that triggered them, and raw"""
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ])
+    by_repo_line = defaultdict(lambda: [0, 0])
+    for stat in snapshot.statistics("traceback"):
+        # Most recent frame inside the repo: stdlib/json/requests frames are charged to their caller
+        site = next((f for f in reversed(stat.traceback) if f.filename.startswith(REPO_DIR)), None)
+        key = _site(site) if site else "(outside repo)"
+        by_repo_line[key][0] += stat.size
+        by_repo_line[key][1] += stat.count
+    repo = sorted(by_repo_line.items(), key=lambda kv: kv[1][0], reverse=True)[:limit]
+    raw = snapshot.statistics("lineno")[:limit]
+    return {
+        "by_repo_line": [{"site": k, "kb": round(size / 1024, 1), "blocks": count} for k, (size, count) in repo],
+        "raw": [{"site": str(s.traceback[0]), "kb": round(s.size / 1024, 1), "blocks": s.count} for s in raw],
+    }
+
+# ================= REPORT =================
+
+def _write_report(name, profiler, snapshot, traced_peak, rss_mb):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, name.replace("/", "_"))
+    profiler.dump_stats(base + ".prof")
+
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.strip_dirs().sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+    allocations = allocation_sites(snapshot)
+
+    with open(base + ".txt", "w", encoding="utf-8") as f:
+        f.write(f"Profile: {name}\n")
+        # RSS includes tracemalloc's own bookkeeping; the traced peak is the program's share
+        f.write(f"Peak RSS: {rss_mb} MB | tracemalloc peak: {traced_peak / 1_048_576:.1f} MB\n\n")
+        f.write("Top allocation sites (live at end, charged to repo line):\n")
+        for a in allocations["by_repo_line"]:
+            f.write(f"   {a['kb']:>10.1f} KB  {a['blocks']:>8} blocks  {a['site']}\n")
+        f.write("\n")
+        f.write(stream.getvalue())
+    with open(base + ".alloc.json", "w", encoding="utf-8") as f:
+        json.dump({"name": name, "peak_rss_mb": rss_mb, "traced_peak_mb": round(traced_peak / 1_048_576, 1),
+                   **allocations}, f, indent=2)
+    print(f"   &#128300; Profile for {name} written to {base}.txt")
+
+@contextlib.contextmanager
+def profile(name):
+    """Profile a block with cProfile + tracemalloc when `name` is a TREND_PROFILE target"""
+    global _active
+    if not enabled(name) or _active:
+        yield
+        return
+    _active = True
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(TRACE_FRAMES)
+    tracemalloc.reset_peak()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        if started_tracing:
+            tracemalloc.stop()
+        _active = False
+        try:
+            _write_report(name, profiler, snapshot, traced_peak, peak_rss_mb())
+        except Exception as e:
+            print(f"   &#9888; Could not write profile for {name}: {e}")
+
+def run(func, name="main"):
+    """Call func() under the profiler when `name` is a target"""
+    with profile(name):
+        return func()
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Trend Radar - Compact Pipeline Records
+Tweets and candidate trends travel through scraping, merging and scoring as
+slotted dataclasses instead of nested dicts with a dozen string keys each:
+no per-instance __dict__, and fields are plain attribute loads in the hot
+loops. They become JSON-ready dicts only at the output boundary (to_dict) -
+tweets when a signal is written, trends once scoring has picked the few that
+get a document.
+"""
+
+from dataclasses import dataclass, field
+
+# ================= TWEETS =================
+
+@dataclass(slots=True)
+class TweetRecord:
+    username: str
+    text: str
+    tier: int
+    views: int = 0
+    retweets: int = 0
+    replies: int = 0
+    likes: int = 0
+    quotes: int = 0
+    engagement_score: int = 0
+    hashtags: list = field(default_factory=list)
+    cashtags: list = field(default_factory=list)
+    tweet_id: str = ""
+    created_at: str = ""
+    category: str = "other"
+
+    @property
+    def url(self):
+        # Derived rather than stored - one string fewer per tweet
+        return f"https://x.com/{self.username}/status/{self.tweet_id}"
+
+    def to_dict(self):
+        return {
+            "username": self.username,
+            "text": self.text,
+            "tier": self.tier,
+            "views": self.views,
+            "retweets": self.retweets,
+            "replies": self.replies,
+            "likes": self.likes,
+            "quotes": self.quotes,
+            "engagement_score": self.engagement_score,
+            "hashtags": self.hashtags,
+            "cashtags": self.cashtags,
+            "tweet_id": self.tweet_id,
+            "created_at": self.created_at,
+            "category": self.category,
+            "url": self.url,
+        }
+
+# ================= TRENDS =================
+
+@dataclass(slots=True)
+class TrendRecord:
+    name: str
+    platforms: dict
+    metrics: dict
+    locations: object                       # Source list until owned, then an ordered set (location -> None)
+    source: str = None
+    crypto_source: bool = False
+    x_first_penalty: bool = False
+    origin: dict = field(default=None)      # First source dict (read-only) for the remaining fields
+    owned: bool = False                     # Containers copied from the origin, safe to merge into
+    platform_count: int = None              # Set by scoring
+    signal_score: int = None
+
+    @classmethod
+    def from_dict(cls, data, crypto_source=False, x_first_penalty=False):
+        """Wrap a scraper's trend dict without copying it"""
+        return cls(
+            data["name"],
+            data.get("platforms") or {},
+            data.get("metrics") or {},
+            data.get("locations") or (),
+            data.get("source"),
+            crypto_source or bool(data.get("crypto_source")),
+            x_first_penalty or bool(data.get("x_first_penalty")),
+            data,
+        )
+
+    def get(self, key, default=None):
+        """A source field the record doesn't model (influencer, category, ...)"""
+        return self.origin.get(key, default)
+
+    def own(self):
+        """Copy-on-write: take private copies of the origin's containers before the first merge"""
+        if not self.owned:
+            self.platforms = dict(self.platforms)
+            self.metrics = dict(self.metrics)
+            self.locations = dict.fromkeys(self.locations)
+            self.owned = True
+
+    def to_dict(self):
+        """The trend dict the document/output stages consume"""
+        data = self.origin.copy()   # Shallow: an unmerged record shares its origin's containers
+        if self.owned:
+            data["platforms"] = self.platforms
+            data["metrics"] = self.metrics
+            data["locations"] = list(self.locations)
+        if self.source is not None:
+            data["source"] = self.source
+        if self.crypto_source:
+            data["crypto_source"] = True
+        if self.x_first_penalty:
+            data["x_first_penalty"] = True
+        if self.signal_score is not None:
+            data["platform_count"] = self.platform_count
+            data["signal_score"] = self.signal_score
+        return data
@@ -0,0 +1,465 @@
+# -*- coding: utf-8 -*-
+"""
+Trend Radar - Post Renderer
+Precompiles the post page template once and renders trend data into it
+Usage:
+    python renderer.py render-all [--workers N]   Rebuild every post from data/*.json
+    python renderer.py bench [COUNT]               Benchmark rendering COUNT synthetic posts
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import datetime
+import hashlib
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import output
+import manifest
+
+# ================= CONFIG =================
+
+DATA_DIR = "data"
+POSTS_DIR = "posts"
+
+# Data files that are not trend reports
+NON_TREND_FILES = {"index.json", "meme_signals.json", "telegram_posts.json"}
+
+# Platform badges with icons
+PLATFORM_ICONS = {
+    "x": ("X/Twitter", "𝕏"),
+    "google": ("Google", "&#128269;"),
+    "tiktok": ("TikTok", "&#127925;"),
+    "instagram": ("Instagram", "📸"),
+    "reddit": ("Reddit", "&#128308;"),
+    "news": ("News", "📰")
+}
+
+# Category styling: (icon, background, color)
+CATEGORY_STYLES = {
+    "meme_coin": ("&#128176;", "rgba(245, 158, 11, 0.15)", "#f59e0b"),
+    "crypto_news": ("🪙", "rgba(99, 102, 241, 0.15)", "#6366f1"),
+    "politics": ("🏛️", "rgba(239, 68, 68, 0.15)", "#ef4444"),
+    "entertainment": ("🎬", "rgba(168, 85, 247, 0.15)", "#a855f7"),
+    "memes": ("😂", "rgba(34, 197, 94, 0.15)", "#22c55e"),
+    "sports": ("🏈", "rgba(59, 130, 246, 0.15)", "#3b82f6"),
+}
+DEFAULT_CATEGORY_STYLE = ("&#128293;", "rgba(99, 102, 241, 0.15)", "#6366f1")
+
+# ================= TEMPLATE =================
+
+POST_TEMPLATE = '''<!DOCTYPE html>
+<html lang="en" data-theme="dark">
+<head>
+  <meta charset="UTF-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  <title>${headline} | Trend Radar</title>
+  <meta name="description" content="${description}..." />
+  
+  <!-- Open Graph / Facebook -->
+  <meta property="og:type" content="article" />
+  <meta property="og:title" content="${headline}" />
+  <meta property="og:description" content="${description}..." />
+  <meta property="og:image" content="../assets/social-preview.png" />
+  <meta property="og:url" content="https://trendradar.app/posts/${post_name}.html" />
+  <meta property="og:site_name" content="Trend Radar" />
+  
+  <!-- Twitter Card -->
+  <meta name="twitter:card" content="summary_large_image" />
+  <meta name="twitter:title" content="${headline}" />
+  <meta name="twitter:description" content="${description}..." />
+  <meta name="twitter:image" content="../assets/social-preview.png" />
+  <meta name="twitter:site" content="@TrendRadar" />
+  
+  <meta name="theme-color" content="#6c5ce7" />
+  
+  <link rel="stylesheet" href="../style.css">
+  <link rel="stylesheet" href="../post.css">
+  <script src="../post.js"></script>
+</head>
+<body>
+  <header class="site-header">
+    <a href="../index.html" class="logo-link">
+      <div class="logo-3d">
+        <div class="glow"></div>
+        <div class="ring ring-1"></div>
+        <div class="ring ring-2"></div>
+        <div class="ring ring-3"></div>
+        <div class="orb"></div>
+        <div class="scan-line"></div>
+      </div>
+      <span class="logo-text">Trend Radar</span>
+    </a>
+    <nav class="nav">
+      <a href="../index.html">🏠 Home</a>
+      <a href="../trending.html">&#128293; Trending</a>
+      <a href="../crypto.html">🪙 Crypto</a>
+      <a href="../search.html">&#128269; Search</a>
+      <a href="../timeline.html">&#128197; Timeline</a>
+      <a href="../bookmarks.html">🔖 Bookmarks</a>
+    </nav>
+  </header>
+  
+  <main class="post-container">
+    <a href="../trending.html" class="back-link">← Back to Trends</a>
+    
+    <article>
+      <div class="post-meta-top">
+        <span class="time-badge" data-timestamp="${timestamp}">🕐 Just now</span>
+        <span class="post-category" style="--cat-bg: ${cat_bg}; --cat-color: ${cat_color};">${cat_icon} ${category_label}</span>
+        ${source_badge}
+      </div>
+      
+      <h1 class="post-title">${headline}</h1>
+      
+      <div class="topic-tag">📌 Topic: <strong>${trend_name}</strong></div>
+      
+      <!-- Cashtags for meme coins -->
+      ${cashtag_section}
+      
+      <!-- Summary - The Key Takeaway -->
+      <div class="summary-box">
+        <p>${summary}</p>
+      </div>
+      
+      <!-- Influencer Source -->
+      ${influencer_html}
+      
+      <!-- Quick Stats -->
+      <div class="quick-stats">
+        <div class="quick-stat">
+          <span class="quick-stat-icon">&#128202;</span>
+          <span class="quick-stat-value">${score}</span>
+          <span class="quick-stat-label">Signal Score</span>
+        </div>
+        <div class="quick-stat">
+          <span class="quick-stat-icon">🚀</span>
+          <span class="quick-stat-value">${momentum}</span>
+          <span class="quick-stat-label">Momentum</span>
+        </div>
+        <div class="quick-stat">
+          <span class="quick-stat-icon">&#127760;</span>
+          <span class="quick-stat-value">${platform_count}</span>
+          <span class="quick-stat-label">Platforms</span>
+        </div>
+        <div class="quick-stat">
+          <span class="quick-stat-icon">&#128200;</span>
+          <span class="quick-stat-value">${status}</span>
+          <span class="quick-stat-label">Status</span>
+        </div>
+      </div>
+      
+      <!-- AI Analysis -->
+      ${ai_section}
+      
+      <!-- Origin Story -->
+      ${origin_section}
+      
+      <!-- Impact -->
+      ${impact_section}
+      
+      <!-- Platforms -->
+      <div class="platforms-section">
+        <h3>&#128293; Trending On</h3>
+        <div class="platform-badges">
+          ${platform_badges}
+        </div>
+      </div>
+      
+      <!-- Signal Score Visual -->
+      <div class="score-indicator">
+        <div class="score-circle" style="background: linear-gradient(135deg, ${score_color}, ${score_color}dd);">
+          <span class="score-number">${score}</span>
+        </div>
+        <div class="score-info">
+          <h4>${score_label} Trend</h4>
+          <p>This trend is ${score_text}</p>
+        </div>
+      </div>
+      
+      <!-- Related Trends -->
+      ${related_html}
+      
+    </article>
+  </main>
+  
+</body>
+</html>'''
+
+def compile_template(text):
+    """Split a ${name} template into literal chunks and field names (done once)"""
+    pieces = re.split(r'\$\{(\w+)\}', text)
+    return pieces[0::2], pieces[1::2]
+
+COMPILED_POST_TEMPLATE = compile_template(POST_TEMPLATE)
+
+def fill_template(compiled, context):
+    """Render a compiled template by interleaving literals and context values"""
+    literals, names = compiled
+    parts = [literals[0]]
+    for name, literal in zip(names, literals[1:]):
+        parts.append(str(context[name]))
+        parts.append(literal)
+    return "".join(parts)
+
+# ================= RENDERING =================
+
+def safe_post_name(t):
+    """Generate post filename with dashes (for post URLs)"""
+    return re.sub(r'[^a-z0-9-]', '', t.lower().replace(" ", "-").replace("_", "-"))
+
+def build_post_context(trend_name, trend_data):
+    """Compute every template field for a trend"""
+    post_name = safe_post_name(trend_name)
+    analysis = trend_data.get("analysis", {})
+    
+    headline = analysis.get("headline", trend_name.title())
+    summary = analysis.get("summary", analysis.get("analysis", ""))
+    expert_take = analysis.get("expert_analysis", "")
+    origin_story = analysis.get("origin_story", "")
+    impact = analysis.get("impact", "")
+    category = analysis.get("category", trend_data.get("category", "trending"))
+    status = analysis.get("status", trend_data.get("lifecycle", "rising"))
+    
+    influencer = trend_data.get("influencer", "")
+    tweet_url = trend_data.get("tweet_url", "")
+    cashtags = trend_data.get("cashtags", [])
+    
+    platforms = []
+    for key, (name, icon) in PLATFORM_ICONS.items():
+        if trend_data.get("platforms", {}).get(key):
+            platforms.append(f'{icon} {name}')
+    platform_badges = "".join([f'<span class="platform-badge">{p}</span>' for p in platforms])
+    
+    # Cashtag badges for meme coins
+    cashtag_badges = ""
+    if cashtags:
+        cashtag_badges = "".join([f'<span class="cashtag-badge">{tag}</span>' for tag in cashtags[:5]])
+    
+    # Related trends
+    related = trend_data.get("related_trends", [])[:5]
+    related_html = ""
+    if related:
+        related_items = "".join([f'<span class="related-tag">{r}</span>' for r in related])
+        related_html = f'<div class="related-section"><h3>🔗 Related Trends</h3><div class="related-tags">{related_items}</div></div>'
+    
+    # Influencer source section
+    influencer_html = ""
+    if influencer and tweet_url:
+        influencer_html = f'''
+      <div class="content-section source-section">
+        <h3>📢 Source</h3>
+        <div class="source-card">
+          <div class="source-avatar">@{influencer}</div>
+          <div class="source-info">
+            <p>Originally posted by <strong>@{influencer}</strong></p>
+            <a href="{tweet_url}" target="_blank" rel="noopener" class="source-link">View Original Tweet &rarr;</a>
+          </div>
+        </div>
+      </div>'''
+    
+    # Signal score interpretation
+    score = trend_data.get("signal_score", 0)
+    if score >= 80:
+        score_label, score_color, score_text = "Viral", "#22c55e", "going viral across the internet"
+    elif score >= 60:
+        score_label, score_color, score_text = "Hot", "#f59e0b", "gaining significant traction"
+    elif score >= 40:
+        score_label, score_color, score_text = "Growing", "#6366f1", "steadily building momentum"
+    else:
+        score_label, score_color, score_text = "Emerging", "#8b5cf6", "just starting to emerge"
+    
+    cat_icon, cat_bg, cat_color = CATEGORY_STYLES.get(category, DEFAULT_CATEGORY_STYLE)
+    
+    timestamp = trend_data.get("timestamp", datetime.datetime.now(datetime.timezone.utc).isoformat())
+    
+    ai_section = ""
+    if expert_take:
+        ai_section = f'<div class="content-section ai-analysis"><h3>&#129302; AI Analysis</h3><p>{expert_take}</p></div>'
+    origin_section = ""
+    if origin_story:
+        started_on = 'Multiple platforms' if len(platforms) > 1 else (platforms[0] if platforms else 'Social Media')
+        origin_section = (
+            f'<div class="content-section origin-section"><h3>&#128214; Origin Story</h3><p>{origin_story}</p>'
+            f'<div class="origin-meta"><div class="origin-meta-item">&#128197; First detected: <strong data-timestamp="{timestamp}">Recently</strong></div>'
+            f'<div class="origin-meta-item">&#128205; Started on: <strong>{started_on}</strong></div></div></div>'
+        )
+    impact_section = ""
+    if impact:
+        impact_section = f'<div class="content-section impact-section"><h3>&#128165; Why This Matters</h3><p>{impact}</p></div>'
+    
+    return {
+        "post_name": post_name,
+        "headline": headline,
+        "description": summary[:160],
+        "summary": summary,
+        "timestamp": timestamp,
+        "cat_icon": cat_icon,
+        "cat_bg": cat_bg,
+        "cat_color": cat_color,
+        "category_label": category.replace('_', ' '),
+        "source_badge": f'<span class="source-badge">𝕏 @{influencer}</span>' if influencer else '',
+        "trend_name": trend_name,
+        "cashtag_section": f'<div class="cashtag-section">{cashtag_badges}</div>' if cashtag_badges else '',
+        "influencer_html": influencer_html,
+        "score": score,
+        "momentum": trend_data.get("momentum", "stable").title(),
+        "platform_count": trend_data.get("platform_count", len(platforms)),
+        "status": status.title(),
+        "ai_section": ai_section,
+        "origin_section": origin_section,
+        "impact_section": impact_section,
+        "platform_badges": platform_badges if platform_badges else '<span class="platform-badge">&#127760; Multiple Platforms</span>',
+        "score_color": score_color,
+        "score_label": score_label,
+        "score_text": score_text,
+        "related_html": related_html,
+    }
+
+def render_post(trend_name, trend_data):
+    """Render a post page, returning (post_name, html)"""
+    context = build_post_context(trend_name, trend_data)
+    return context["post_name"], fill_template(COMPILED_POST_TEMPLATE, context)
+
+def write_post(trend_name, trend_data, posts_dir=POSTS_DIR):
+    """Render and write a post page; returns (post_name, written) - unchanged pages are not rewritten"""
+    post_name, html = render_post(trend_name, trend_data)
+    written = output.write_text(f"{posts_dir}/{post_name}.html", html, trend_data.get("timestamp"))
+    return post_name, written
+
+# ================= REBUILD ALL =================
+
+def _render_file(args):
+    """Worker: re-render the post for one data file"""
+    filepath, posts_dir = args
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            trend_data = json.load(f)
+    except Exception as e:
+        return filepath, "error", str(e), None
+    if not isinstance(trend_data, dict) or not trend_data.get("trend"):
+        return filepath, "skipped", None, None
+    post_name, written = write_post(trend_data["trend"], trend_data, posts_dir)
+    if not written:
+        return filepath, "unchanged", None, None
+    # Workers don't share the parent's manifest - hand the write back to be recorded there
+    post_path = f"{posts_dir}/{post_name}.html"
+    with open(post_path, "rb") as f:
+        content = f.read()
+    record = (post_path, hashlib.sha256(content).hexdigest(), len(content), trend_data.get("timestamp"))
+    return filepath, "written", None, record
+
+def render_all(data_dir=DATA_DIR, posts_dir=POSTS_DIR, workers=None):
+    """Rebuild every post from data/*.json across a process pool"""
+    print(f"&#128196; Re-rendering posts from {data_dir}/ ...")
+    os.makedirs(posts_dir, exist_ok=True)
+    files = [
+        os.path.join(data_dir, f) for f in sorted(os.listdir(data_dir))
+        if f.endswith(".json") and f not in NON_TREND_FILES
+    ]
+    counts = {"written": 0, "unchanged": 0, "skipped": 0, "error": 0}
+    
+    start = time.perf_counter()
+    tasks = [(f, posts_dir) for f in files]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(tasks) // ((workers or os.cpu_count() or 1) * 4))
+        for filepath, result, error, record in pool.map(_render_file, tasks, chunksize=chunksize):
+            counts[result] += 1
+            if error:
+                print(f"   &#10007; {filepath}: {error}")
+            if record:
+                manifest.record(*record)
+    if counts["written"]:
+        # The renames happened in the workers - make them durable from here
+        output.mark_dirty(posts_dir)
+    output.flush()
+    elapsed = time.perf_counter() - start
+    
+    print(f"   &#10003; {len(files)} files in {elapsed:.2f}s - written: {counts['written']}, "
+          f"unchanged: {counts['unchanged']}, skipped: {counts['skipped']}, errors: {counts['error']}")
+    return counts
+
+# ================= BENCHMARK =================
+
+def make_synthetic_trend(i):
+    """Build a realistic trend record for benchmarking"""
+    return {
+        "trend": f"Synthetic Trend {i}",
+        "category": ["meme_coin", "crypto_news", "politics", "sports", "memes"][i % 5],
+        "platforms": {"x": True, "google": i % 2 == 0, "tiktok": i % 3 == 0, "reddit": i % 4 == 0},
+        "platform_count": 2 + i % 3,
+        "signal_score": (i * 7) % 101,
+        "momentum": "rising" if i % 2 else "stable",
+        "lifecycle": "rising",
+        "related_trends": [f"related {i} {j}" for j in range(i % 6)],
+        "source": "influencer" if i % 3 == 0 else "hashtag",
+        "influencer": "elonmusk" if i % 3 == 0 else None,
+        "tweet_url": f"https://x.com/elonmusk/status/{i}" if i % 3 == 0 else None,
+        "cashtags": [f"$SYN{i % 100}"] if i % 2 else [],
+        "analysis": {
+            "headline": f"Synthetic Trend {i} Takes Over The Internet",
+            "summary": "A synthetic summary sentence that is long enough to look like real content. " * 3,
+            "origin_story": "This trend emerged from viral social media content.",
+            "expert_analysis": "Synthetic expert analysis of market sentiment and catalysts. " * 2,
+            "impact": "It's capturing attention across multiple platforms.",
+            "status": "viral"
+        },
+        "timestamp": "2026-01-01T00:00:00+00:00"
+    }
+
+def bench(count=10_000, workers=None):
+    """Time rendering `count` synthetic posts serially and via render_all"""
+    print(f"&#9201; Benchmarking post rendering ({count} posts)...")
+    trends = [make_synthetic_trend(i) for i in range(count)]
+    
+    start = time.perf_counter()
+    for t in trends:
+        render_post(t["trend"], t)
+    serial = time.perf_counter() - start
+    print(f"   render_post (serial, in memory): {serial:.2f}s ({count / serial:,.0f} posts/s)")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = os.path.join(tmp, "data")
+        posts_dir = os.path.join(tmp, "posts")
+        os.makedirs(data_dir)
+        for i, t in enumerate(trends):
+            with open(os.path.join(data_dir, f"synthetic_{i}.json"), "w", encoding="utf-8") as f:
+                json.dump(t, f)
+        
+        start = time.perf_counter()
+        render_all(data_dir, posts_dir, workers)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        render_all(data_dir, posts_dir, workers)
+        warm = time.perf_counter() - start
+    
+    print(f"   render-all cold: {cold:.2f}s, warm (no changes): {warm:.2f}s")
+    return {"serial": serial, "render_all_cold": cold, "render_all_warm": warm}
+
+# ================= CLI =================
+
+def _arg_value(args, flag, default=None):
+    """Read `--flag VALUE` from an argument list"""
+    if flag in args:
+        idx = args.index(flag)
+        if idx + 1 < len(args):
+            return int(args[idx + 1])
+    return default
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    command = args[0] if args else "render-all"
+    workers = _arg_value(args, "--workers")
+    if command == "render-all":
+        manifest.load()
+        render_all(workers=workers)
+        manifest.save()
+    elif command == "bench":
+        count = int(args[1]) if len(args) > 1 and args[1].isdigit() else 10_000
+        bench(count, workers)
+    else:
+        print(__doc__)
+        sys.exit(1)
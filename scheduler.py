@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Trend Radar - Deadline-Aware Run Scheduler
+The workflow fires every 15 minutes, so a run gets a global deadline
+(TREND_RUN_BUDGET seconds, default 780) and every phase a slice of it.
+Phases run in expected-value order (see PHASES); when time gets short the
+low-value ones are shed first, actor/HTTP timeouts are clamped to what is
+left, and PUBLISH_RESERVE seconds are always kept back for writing a
+consistent index.
+"""
+
+import os
+import time
+import contextlib
+
+import requests
+
+import telemetry
+
+# ================= CONFIG =================
+
+RUN_BUDGET = float(os.getenv("TREND_RUN_BUDGET", "780"))
+PUBLISH_RESERVE = 45          # Seconds kept back for PHASE 7 files + index/manifest
+MIN_ACTOR_SECONDS = 15        # Don't start an Apify run that can't finish
+
+# name: (min_remaining, max_seconds)
+#   min_remaining - skip the phase when less run time than this is left
+#   max_seconds   - cap on the phase's own wall time
+# Ordered by expected value: influencer tweets and CoinGecko movers carry most
+# of the signal; Google autocomplete fallbacks carry the least.
+PHASES = {
+    "x_influencers": (60, 300),
+    "coingecko": (20, 30),
+    "x_hashtags": (90, 200),
+    "cross_validate": (180, 150),
+    "telegram": (150, 60),
+    "reddit": (150, 40),
+    "news": (150, 40),
+    "google": (240, 60),
+    "tiktok": (300, 120),
+    "instagram": (300, 120),
+    "generate": (0, 300),
+    "images": (0, 45),
+}
+
+# Work items inside phases, same meaning as min_remaining above
+ITEMS = {
+    "claude": 40,                  # AI copy for one trend (fallback copy otherwise)
+    "trend": 10,                   # Writing one more trend at all
+    "autocomplete_fallback": 360,  # Google autocomplete stand-ins for missing sources
+}
+
+# ================= STATE =================
+
+_started = time.monotonic()
+_deadline = _started + RUN_BUDGET
+_phase_deadline = None
+_shed = []
+
+def start(budget=None):
+    """(Re)start the run clock (serve mode: once per publish) and forget what was shed"""
+    global _started, _deadline
+    _started = time.monotonic()
+    _deadline = _started + (budget if budget is not None else RUN_BUDGET)
+    _shed.clear()
+
+def remaining():
+    """Seconds left before the publish reserve is reached"""
+    return _deadline - PUBLISH_RESERVE - time.monotonic()
+
+def phase_remaining():
+    """Seconds left in the current phase (or the run, outside phases)"""
+    left = remaining()
+    if _phase_deadline is not None:
+        left = min(left, _phase_deadline - time.monotonic())
+    return left
+
+def expired():
+    """True once the current phase has used up its slice"""
+    return phase_remaining() <= 0
+
+class ClampedTimeout(float):
+    """A timeout cut below the caller's own by the phase deadline (breakers don't blame the host for it)"""
+
+class PhaseExpired(requests.exceptions.RequestException):
+    """Raised by clamp() instead of starting a request the phase has no time left for"""
+
+def clamp(timeout):
+    """Cap a timeout to the time left in the current phase; sheds the call when nothing is left
+
+    Raising a RequestException (rather than returning 0, which requests rejects
+    with a ValueError) lets callers handle it like any other failed request.
+    It is raised while the request arguments are built, before any HTTP hook
+    sees the call, so it never counts against the host.
+    """
+    left = phase_remaining()
+    if left <= 0:
+        telemetry.count("shed")
+        raise PhaseExpired("no time left in phase")
+    if left < timeout:
+        return ClampedTimeout(left)
+    return timeout
+
+def shed(name, reason):
+    _shed.append(name)
+    telemetry.count("shed")
+    print(f"      &#9203; Shed {name}: {reason}")
+
+def shed_items():
+    return list(_shed)
+
+# ================= DECISIONS =================
+
+def can_afford(item):
+    """Whether a low-priority work item still fits in the run"""
+    needed = ITEMS.get(item, 0)
+    if remaining() < needed or expired():
+        if item not in _shed:
+            shed(item, f"{max(remaining(), 0):.0f}s left")
+        return False
+    return True
+
+@contextlib.contextmanager
+def phase(name):
+    """A telemetry phase whose work is bounded by its slice of the run (never shed)"""
+    global _phase_deadline
+    _, max_seconds = PHASES.get(name, (0, RUN_BUDGET))
+    previous = _phase_deadline
+    _phase_deadline = time.monotonic() + min(max_seconds, max(remaining(), 0))
+    try:
+        with telemetry.phase(name):
+            yield
+    finally:
+        _phase_deadline = previous
+
+def run_phase(name, func, default=None):
+    """Run func() as a timed, budgeted phase, or shed it and return `default`"""
+    min_remaining, _ = PHASES.get(name, (0, RUN_BUDGET))
+    if remaining() < min_remaining:
+        shed(name, f"{max(remaining(), 0):.0f}s left, needs {min_remaining}s")
+        return default
+    with phase(name):
+        return func()
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Trend Radar - Vectorized Scoring Engine
+Packs candidate trend features into NumPy arrays and applies the declarative
+weights table (scoring_weights.json) in one pass, then selects the top-K.
+Edit the weights file (or point TREND_SCORING_WEIGHTS at another one) to
+retune scoring without touching code.
+"""
+
+import os
+import json
+
+import numpy as np
+
+# ================= CONFIG =================
+
+WEIGHTS_FILE = os.getenv(
+    "TREND_SCORING_WEIGHTS",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "scoring_weights.json")
+)
+
+_weights_cache = {}
+
+def load_weights(path=None):
+    """Load (and cache) the weights table"""
+    path = path or WEIGHTS_FILE
+    if path not in _weights_cache:
+        with open(path, "r", encoding="utf-8") as f:
+            _weights_cache[path] = json.load(f)
+    return _weights_cache[path]
+
+# ================= FEATURE PACKING =================
+
+def _column(values, dtype, n):
+    return np.fromiter(values, dtype=dtype, count=n)
+
+def pack_features(candidates, weights):
+    """Pack a list of TrendRecords into column arrays"""
+    n = len(candidates)
+    bonus_platforms = list(weights["platform_bonus"])
+    primary_platforms = weights["primary_platforms"]
+    threshold_metrics = list(weights["trend_score"]["metric_thresholds"])
+
+    # Pull the nested dicts out once; every column below is a tight pass over them
+    platforms = [d.platforms for d in candidates]
+    metrics = [d.metrics for d in candidates]
+    sources = [d.source or "" for d in candidates]
+    extras = [d.origin for d in candidates]     # Source fields the records don't model
+
+    flags = np.zeros((len(bonus_platforms), n), dtype=bool)
+    for j, p in enumerate(bonus_platforms):
+        flags[j] = _column((bool(pl.get(p)) for pl in platforms), bool, n)
+    primary = np.zeros(n, dtype=np.int64)
+    for p in primary_platforms:
+        primary += _column((bool(pl.get(p)) for pl in platforms), bool, n)
+
+    metric_values = np.zeros((len(threshold_metrics), n), dtype=np.float64)
+    for j, key in enumerate(threshold_metrics):
+        metric_values[j] = _column((m.get(key) or 0 for m in metrics), np.float64, n)
+
+    return {
+        # len(platforms) - every key counts, even falsy ones
+        "platform_keys": _column(map(len, platforms), np.int64, n),
+        "platform_count": _column((sum(1 for v in pl.values() if v) for pl in platforms), np.int64, n),
+        "primary_count": primary,
+        "location_count": _column((len(set(d.locations)) for d in candidates), np.int64, n),
+        # 0 = not an influencer trend
+        "tier": _column(
+            ((e.get("influencer_tier", 5) or 0) if s == "influencer" else 0 for e, s in zip(extras, sources)),
+            np.int64, n
+        ),
+        "is_meme": _column((bool(e.get("is_meme_coin") or e.get("category") == "meme_coin") for e in extras), bool, n),
+        "is_crypto": _column((d.crypto_source or s.startswith("coingecko") for d, s in zip(candidates, sources)), bool, n),
+        "non_x": _column((d.x_first_penalty for d in candidates), bool, n),
+        "platform_flags": flags,
+        "metrics": metric_values,
+    }
+
+# ================= SCORING =================
+
+def trend_scores(features, weights):
+    """Base trend score: platform presence, metric thresholds, location diversity"""
+    w = weights["trend_score"]
+    score = features["platform_keys"] * w["per_platform"]
+    for j, (threshold, bonus) in enumerate(w["metric_thresholds"].values()):
+        score = score + np.where(features["metrics"][j] > threshold, bonus, 0)
+    score = score + np.minimum(features["location_count"] * w["per_location"], w["location_cap"])
+    return np.minimum(score, w["cap"])
+
+def signal_scores(features, weights, capped=True):
+    """Full X-first signal score for every candidate"""
+    score = trend_scores(features, weights)
+
+    platform_bonus = np.array(list(weights["platform_bonus"].values()), dtype=np.int64)
+    score = score + platform_bonus @ features["platform_flags"]
+
+    # Influencer tier bonus via lookup table (unknown tiers get 0)
+    tiers = {int(k): v for k, v in weights["influencer_tier_bonus"].items()}
+    table = np.zeros(max(tiers) + 2, dtype=np.int64)
+    for k, v in tiers.items():
+        table[k] = v
+    tier = features["tier"]
+    in_range = (tier >= 0) & (tier < len(table))
+    score = score + np.where(in_range, table[np.clip(tier, 0, len(table) - 1)], 0)
+
+    score = score + np.where(features["is_meme"], weights["meme_coin_bonus"], 0)
+    score = score + np.where(features["is_crypto"], weights["crypto_source_bonus"], 0)
+    score = score + np.where(features["non_x"], weights["non_x_penalty"], 0)
+
+    platform_count = features["platform_count"]
+    score = score + np.where(platform_count >= 2, weights["per_extra_platform"] * (platform_count - 1), 0)
+    score = score + np.where(features["primary_count"] >= 2, weights["both_primary_bonus"], 0)
+    return np.minimum(score, weights["cap"]) if capped else score
+
+def momentum_bonus(velocity, acceleration, weights):
+    """Bonus for trends whose score is climbing (and climbing faster)"""
+    w = weights["momentum"]
+    bonus = np.maximum(velocity, 0) * w["velocity_weight"]
+    bonus = bonus + np.where(velocity > 0, np.maximum(acceleration, 0) * w["acceleration_weight"], 0)
+    return np.minimum(bonus, w["cap"]).astype(np.int64)
+
+def top_k(scores, k):
+    """Indices of the k highest scores, ties kept in candidate order (like a stable sort)"""
+    n = len(scores)
+    if k >= n:
+        return np.argsort(-scores, kind="stable")
+    kth = np.partition(scores, n - k)[n - k]
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[:k - len(above)]
+    idx = np.concatenate([above, ties])
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+def score_trends(merged, k, weights=None, observe=None):
+    """Score every merged TrendRecord in place and return the top-k (normalized, record) pairs
+
+    `observe(keys, raw_scores)` feeds the uncapped scores into momentum tracking and
+    returns (velocity, acceleration) arrays; rising trends then get a selection bonus.
+    """
+    weights = weights or load_weights()
+    items = list(merged.items())
+    if not items:
+        return []
+    candidates = [data for _, data in items]
+    features = pack_features(candidates, weights)
+    scores = signal_scores(features, weights, capped=False)
+    if observe is not None:
+        velocity, acceleration = observe([key for key, _ in items], scores.tolist())
+        scores = scores + momentum_bonus(velocity, acceleration, weights)
+    scores = np.minimum(scores, weights["cap"])
+
+    for record, score, count in zip(candidates, scores.tolist(), features["platform_count"].tolist()):
+        record.platform_count = count
+        record.signal_score = score
+
+    return [items[i] for i in top_k(scores, k).tolist()]
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Trend Radar - Persistent Seen-Item Store
+Remembers which items each source has already handed us (tweets by id, Reddit
+posts by fullname, RSS entries by guid/link, Telegram messages by post id) so
+a scraper can tell new items from the ones it processed on the previous run,
+15 minutes earlier. Telegram drops seen messages before parsing them (they are
+already in telegram_posts.json); the trend sources only report their new
+counts, since a repeat still backs a current trend. Each id is kept with the
+time it was first seen (long ids as 8-byte BLAKE2 digests) and forgotten once
+its source's TTL has passed; a repeat doesn't refresh it, so the store only
+changes when something new arrives or expires. Each source keeps at most
+MAX_ITEMS ids (oldest dropped first). New/seen counts go to telemetry under
+the scraper's phase. The store lives in state/seen_items.json; cassette runs
+neither read nor write it, so every recorded item counts as new on replay.
+"""
+
+import json
+import time
+import hashlib
+import threading
+
+import statefile
+import telemetry
+
+# ================= CONFIG =================
+
+STORE_FILE = f"{statefile.STATE_DIR}/seen_items.json"
+
+# source -> seconds an id is remembered after it was first seen
+TTLS = {
+    "x_influencers": 24 * 3600,
+    "x_hashtags": 24 * 3600,
+    "reddit": 24 * 3600,
+    "news": 48 * 3600,
+    "telegram": 7 * 24 * 3600,   # A channel page shows its last ~20 messages for days
+}
+DEFAULT_TTL = 24 * 3600
+MAX_ITEMS = 20_000               # Per source
+MAX_ID_LENGTH = 24               # Longer ids (RSS links/guids) are stored as digests
+
+# ================= STATE =================
+
+_lock = threading.Lock()
+_store = {}                      # source -> {id or digest: first_seen}
+_file = statefile.StateFile(STORE_FILE, "Seen-item store", "starting empty")
+
+def load():
+    global _store
+    if not _file.loaded:
+        _store = _file.load() or {}
+
+def save():
+    if not _file.writable():
+        return
+    now = time.time()
+    with _lock:
+        data = {}
+        for source, items in _store.items():
+            ttl = TTLS.get(source, DEFAULT_TTL)
+            fresh = sorted(((t, d) for d, t in items.items() if now - t < ttl), reverse=True)[:MAX_ITEMS]
+            data[source] = {d: t for t, d in fresh}
+        _store.clear()
+        _store.update(data)
+    _file.save(json.dumps(data, separators=(",", ":"), sort_keys=True))
+
+def _key(item_id):
+    """Short ids (tweet ids, t3_ fullnames) are kept as they are; long ones become 8-byte digests"""
+    item_id = str(item_id)
+    if len(item_id) <= MAX_ID_LENGTH:
+        return item_id
+    return hashlib.blake2b(item_id.encode("utf-8"), digest_size=8).hexdigest()
+
+# ================= LOOKUP =================
+
+def observe(source, ids):
+    """Record first sightings; returns the set of ids that were not seen before (within the TTL)"""
+    load()
+    now = int(time.time())
+    cutoff = now - TTLS.get(source, DEFAULT_TTL)
+    unique = [i for i in dict.fromkeys(ids) if i]
+    digests = [_key(i) for i in unique]
+    with _lock:
+        items = _store.setdefault(source, {})
+        get = items.get
+        fresh = [(i, d) for i, d in zip(unique, digests) if get(d, 0) <= cutoff]
+        items.update((d, now) for _, d in fresh)
+    new = {i for i, _ in fresh}
+    telemetry.count("new_items", len(new))
+    telemetry.count("seen_items", len(unique) - len(new))
+    return new
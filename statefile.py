@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Trend Radar - Run-to-Run State Files
+The stores that carry data from one run to the next (breakers, caches, seen
+ids, momentum, market snapshots) each keep one StateFile: it is read at most
+once per process, a missing or unreadable file just means an empty store (the
+latter with a warning), and it is written back through output.write_bytes -
+atomic, and skipped when nothing changed. While a cassette is recording or
+replaying no state file is read or written: every such run starts from the
+same empty stores, so a replay makes exactly the decisions (and requests) the
+recording did.
+"""
+
+import os
+import json
+
+import cassette
+import output
+
+# ================= CONFIG =================
+
+STATE_DIR = "state"
+
+# ================= STATE FILES =================
+
+def _read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+class StateFile:
+    """One store's file: load() once, save() only after a load"""
+
+    def __init__(self, path, label, fallback="starting fresh"):
+        self.path = path
+        self.label = label          # "Breaker state" - names the file in warnings
+        self.fallback = fallback    # What the store does without it
+        self.loaded = False
+
+    def persistent(self):
+        return not cassette.MODE
+
+    def load(self, reader=_read_json):
+        """The file's contents (via `reader(path)`) on the first call; None when missing, unreadable or off"""
+        self.loaded = True
+        if not self.persistent() or not os.path.exists(self.path):
+            return None
+        try:
+            return reader(self.path)
+        except Exception as e:
+            print(f"   &#9888; {self.label} unreadable ({e}) - {self.fallback}")
+            return None
+
+    def writable(self):
+        return self.loaded and self.persistent()
+
+    def save(self, content):
+        """Write str (UTF-8) or bytes; returns whether the file changed"""
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        return output.write_bytes(self.path, content)
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+Trend Radar - Run Telemetry
+Times every phase of a run and every upstream HTTP call (per phase and per host):
+request counts, bytes, retries, timeouts, cache hits and Claude token usage.
+Each run writes state/run_metrics.json and appends a summary line to
+state/metrics_history.jsonl (rolling, last MAX_HISTORY runs).
+"""
+
+import os
+import json
+import time
+import atexit
+import datetime
+import threading
+import contextlib
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import requests
+
+import output
+import profiling
+
+# ================= CONFIG =================
+
+STATE_DIR = "state"
+METRICS_FILE = f"{STATE_DIR}/run_metrics.json"
+HISTORY_FILE = f"{STATE_DIR}/metrics_history.jsonl"
+MAX_HISTORY = 500
+
+CLAUDE_HOST = "api.anthropic.com"
+
+COUNTERS = [
+    "requests", "bytes", "errors", "timeouts", "retries", "cache_hits",
+    "claude_input_tokens", "claude_output_tokens",
+]
+
+# ================= STATE =================
+
+_lock = threading.Lock()
+_original_request = None
+_installed = False
+_finished = False
+
+_started = time.time()
+_phase_stack = []
+_phases = []
+_phase_counters = defaultdict(lambda: defaultdict(float))
+_host_counters = defaultdict(lambda: defaultdict(float))
+_status_codes = defaultdict(lambda: defaultdict(int))
+_failed_keys = set()
+
+def _empty():
+    return {c: 0 for c in COUNTERS}
+
+def current_phase():
+    return _phase_stack[-1] if _phase_stack else "startup"
+
+# ================= COUNTERS =================
+
+def count(name, n=1, host=None):
+    """Add to a counter for the current phase (and optionally a host)"""
+    with _lock:
+        _phase_counters[current_phase()][name] += n
+        if host:
+            _host_counters[host][name] += n
+
+@contextlib.contextmanager
+def phase(name):
+    """Time a block of the run; upstream calls inside it are attributed to it"""
+    _phase_stack.append(name)
+    profiling.reset_peak_rss()
+    start = time.perf_counter()
+    try:
+        with profiling.profile(name):
+            yield
+    finally:
+        seconds = time.perf_counter() - start
+        _phase_stack.pop()
+        _phases.append({"name": name, "seconds": round(seconds, 3), "peak_rss_mb": profiling.peak_rss_mb()})
+
+# ================= HTTP =================
+
+def _record_response(host, key, response, seconds, stream):
+    if stream:
+        size = int(response.headers.get("Content-Length") or 0)
+    else:
+        size = len(response.content)
+    count("requests", host=host)
+    count("bytes", size, host=host)
+    count("http_seconds", seconds, host=host)
+    with _lock:
+        _status_codes[host][str(response.status_code)] += 1
+    if response.status_code == 304:
+        count("cache_hits", host=host)
+    if response.status_code >= 400:
+        count("errors", host=host)
+        _failed_keys.add(key)
+    else:
+        _failed_keys.discard(key)
+
+    if host == CLAUDE_HOST and not stream and response.status_code == 200:
+        try:
+            usage = response.json().get("usage", {})
+        except ValueError:
+            usage = {}
+        count("claude_input_tokens", usage.get("input_tokens", 0), host=host)
+        count("claude_output_tokens", usage.get("output_tokens", 0), host=host)
+
+def _instrumented_request(self, method, url, **kwargs):
+    parts = urlsplit(url)
+    host = parts.netloc or "unknown"
+    # Query strings carry tokens and cache busters - retries are detected per endpoint
+    key = (method.upper(), host, parts.path)
+    if key in _failed_keys:
+        count("retries", host=host)
+
+    start = time.perf_counter()
+    try:
+        response = _original_request(self, method, url, **kwargs)
+    except requests.exceptions.RequestException as e:
+        seconds = time.perf_counter() - start
+        count("requests", host=host)
+        count("http_seconds", seconds, host=host)
+        count("timeouts" if isinstance(e, requests.exceptions.Timeout) else "errors", host=host)
+        _failed_keys.add(key)
+        raise
+    _record_response(host, key, response, time.perf_counter() - start, kwargs.get("stream", False))
+    return response
+
+def install():
+    """Wrap requests.Session.request (after cassette.install, so replays are counted too)"""
+    global _installed, _original_request
+    if _installed:
+        return
+    _installed = True
+    _original_request = requests.Session.request
+    requests.Session.request = _instrumented_request
+    # Crashed runs still leave metrics behind
+    atexit.register(finish, "incomplete")
+
+# ================= REPORT =================
+
+def _rounded(counters):
+    out = _empty()
+    out.update({k: round(v, 3) if isinstance(v, float) and not v.is_integer() else int(v) for k, v in counters.items()})
+    return out
+
+def snapshot(status="complete"):
+    """Build the metrics document for the run so far"""
+    with _lock:
+        phases = []
+        for p in _phases:
+            entry = dict(p)
+            entry.update(_rounded(_phase_counters.get(p["name"], {})))
+            phases.append(entry)
+        totals = defaultdict(float)
+        for counters in _phase_counters.values():
+            for k, v in counters.items():
+                totals[k] += v
+        hosts = {}
+        for host, counters in sorted(_host_counters.items()):
+            hosts[host] = _rounded(counters)
+            hosts[host]["status"] = dict(_status_codes[host])
+
+    finished = time.time()
+    return {
+        "started": datetime.datetime.fromtimestamp(_started, datetime.timezone.utc).isoformat(),
+        "finished": datetime.datetime.fromtimestamp(finished, datetime.timezone.utc).isoformat(),
+        "duration_seconds": round(finished - _started, 3),
+        "status": status,
+        "totals": _rounded(totals),
+        "phases": phases,
+        "hosts": hosts,
+    }
+
+def _append_history(metrics):
+    line = json.dumps({
+        "started": metrics["started"],
+        "duration_seconds": metrics["duration_seconds"],
+        "status": metrics["status"],
+        "totals": metrics["totals"],
+        "phases": {p["name"]: p["seconds"] for p in metrics["phases"]},
+    }, separators=(",", ":"))
+    lines = []
+    if os.path.exists(HISTORY_FILE):
+        with open(HISTORY_FILE, "r", encoding="utf-8") as f:
+            lines = [l.rstrip("\n") for l in f if l.strip()]
+    lines = (lines + [line])[-MAX_HISTORY:]
+    output.write_state(HISTORY_FILE, "\n".join(lines) + "\n")
+
+def finish(status="complete"):
+    """Write run_metrics.json and append to the rolling history (once per run)"""
+    global _finished
+    if _finished or (status == "incomplete" and not _phases and not _phase_stack):
+        # Nothing ran (e.g. generate imported by bench.py) - leave the last run's metrics alone
+        return None
+    _finished = True
+    metrics = snapshot(status)
+    output.write_state(METRICS_FILE, json.dumps(metrics, indent=2))
+    _append_history(metrics)
+    output.flush()
+    return metrics
+
+def reset():
+    """Start a fresh metrics window (serve mode writes one per publish)"""
+    global _finished, _started
+    with _lock:
+        _phases.clear()
+        _phase_counters.clear()
+        _host_counters.clear()
+        _status_codes.clear()
+        _failed_keys.clear()
+    _finished = False
+    _started = time.time()
+
+def print_summary(metrics):
+    """Short per-phase breakdown for the run log"""
+    if not metrics:
+        return
+    totals = metrics["totals"]
+    print(f"\n&#9201; Run metrics ({metrics['duration_seconds']:.1f}s, {totals['requests']} requests, "
+          f"{totals['bytes'] / 1_000_000:.1f} MB, {totals['retries']} retries, {totals['timeouts']} timeouts)")
+    for p in sorted(metrics["phases"], key=lambda p: p["seconds"], reverse=True)[:8]:
+        print(f"   {p['name']:<22} {p['seconds']:8.1f}s  {p['requests']:4d} req  {p.get('peak_rss_mb') or 0:7.1f} MB peak")
+    if totals["claude_input_tokens"] or totals["claude_output_tokens"]:
+        print(f"   Claude tokens: {totals['claude_input_tokens']} in / {totals['claude_output_tokens']} out")
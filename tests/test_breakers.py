@@ -0,0 +1,58 @@
+import pytest
+
+import breakers
+import mirrors
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+class FakeResponse:
+    status_code = 200
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(breakers.cassette, "MODE", "")
+    monkeypatch.setattr(breakers, "_breakers", {})
+    monkeypatch.setattr(breakers._file, "loaded", True)
+    monkeypatch.setattr(breakers.time, "time", clock.time)
+    monkeypatch.setattr(mirrors, "_stats", {})
+    monkeypatch.setattr(mirrors._file, "loaded", True)
+    return clock
+
+
+def test_breaker_reopens_for_a_probe_after_cooldown(clock):
+    key = breakers.host_key("https://nitter.example")
+    for _ in range(breakers.FAILURE_THRESHOLD):
+        breakers.failure(key, "HTTP 503")
+    assert breakers.is_open(key)
+    assert not breakers.available(key)
+    assert not breakers.allow(key)
+
+    clock.now += breakers.BASE_COOLDOWN + 1
+    assert breakers.available(key)
+    assert breakers.allow(key)          # The half-open probe
+    assert not breakers.allow(key)      # ...one at a time
+    breakers.success(key)
+    assert breakers.allow(key)
+
+
+def test_hedged_get_probes_a_mirror_whose_breaker_cooled_down(clock, monkeypatch):
+    mirror = "https://nitter.example"
+    monkeypatch.setattr(mirrors.requests, "get", lambda url, **kwargs: FakeResponse())
+    for _ in range(breakers.FAILURE_THRESHOLD):
+        breakers.failure(breakers.host_key(mirror), "timeout")
+
+    assert mirrors.hedged_get([mirror], "/search") == (None, None)
+
+    clock.now += breakers.BASE_COOLDOWN + 1
+    winner, response = mirrors.hedged_get([mirror], "/search")
+    assert winner == mirror
+    assert response.status_code == 200
@@ -0,0 +1,93 @@
+import math
+
+import numpy as np
+import pytest
+
+import generate
+import markets
+
+T0 = 1_000_000.0
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    monkeypatch.setattr(markets.statefile.cassette, "MODE", "")
+    monkeypatch.setattr(markets, "_file", markets.statefile.StateFile(str(tmp_path / "markets.npz"), "Market snapshots"))
+    monkeypatch.setattr(markets, "_store", None)
+    return tmp_path / "markets.npz"
+
+
+def coin(cid, price, volume=1000.0, **extra):
+    return {"id": cid, "symbol": cid[:4], "name": cid.title(), "current_price": price, "total_volume": volume, **extra}
+
+
+def test_append_adds_rows_and_columns(store):
+    assert markets.append([coin("pepe", 1.0), coin("doge", 2.0)], now=T0) == 1
+    assert markets.append([coin("doge", 2.5), coin("bonk", 3.0), {"id": "dead", "current_price": None}], now=T0 + 900) == 2
+
+    assert markets._store["ids"].tolist() == ["pepe", "doge", "bonk"]
+    assert markets._store["symbols"].tolist() == ["PEPE", "DOGE", "BONK"]
+    price = markets._store["price"]
+    assert price.shape == (2, 3)
+    assert price[0, :2].tolist() == [1.0, 2.0] and math.isnan(price[0, 2])
+    assert math.isnan(price[1, 0]) and price[1, 1:].tolist() == [2.5, 3.0]
+
+
+def test_prune_drops_old_snapshots_and_vanished_coins(store):
+    markets.append([coin("old", 1.0)], now=T0)
+    markets.append([coin("pepe", 1.0)], now=T0 + markets.MAX_AGE_SECONDS + 1)
+    assert markets._store["times"].tolist() == [T0 + markets.MAX_AGE_SECONDS + 1]
+    assert markets._store["ids"].tolist() == ["pepe"]
+
+
+def test_movers_from_history_and_reported_fallback(store):
+    for i in range(markets.MIN_VOLUME_HISTORY):
+        markets.append([coin("pepe", 1.0), coin("doge", 1.0), coin("flat", 1.0)], now=T0 + i * 900)
+    now = T0 + markets.MIN_VOLUME_HISTORY * 900
+    latest = [coin("pepe", 1.10), coin("doge", 0.90, volume=5000.0), coin("flat", 1.0, price_change_percentage_24h=12.0)]
+    markets.append(latest, now=now)
+
+    result = markets.movers(latest, now=now)
+    assert result["pepe"]["reasons"] == ["gainer_15m", "gainer_1h"]
+    assert result["pepe"]["changes"]["15m"] == pytest.approx(10.0, abs=0.01)
+    assert result["pepe"]["volume_ratio"] == 1.0
+    assert result["doge"]["reasons"] == ["loser_15m", "loser_1h", "volume_spike"]
+    assert result["doge"]["volume_ratio"] == 5.0
+    # No snapshot 24h back: CoinGecko's own 24h figure is used
+    assert result["flat"]["reasons"] == ["gainer_24h"]
+
+
+def test_store_round_trips_through_the_npz_file(store):
+    markets.append([coin("pepe", 1.5), coin("doge", 2.0)], now=T0)
+    markets.save()
+    saved = {k: v.copy() for k, v in markets._store.items()}
+
+    markets._file.loaded = False
+    markets.load()
+    for key, value in saved.items():
+        np.testing.assert_array_equal(markets._store[key], value)
+
+
+def test_cassette_runs_skip_the_store(monkeypatch, store):
+    monkeypatch.setattr(markets.statefile.cassette, "MODE", "record")
+    markets.append([coin("pepe", 1.0)], now=T0)
+    markets.save()
+    assert not store.exists()
+
+
+def test_mover_trend_goes_through_news_generation(monkeypatch):
+    prompts = []
+    monkeypatch.setattr(generate, "call_claude", lambda prompt, max_tokens=500: prompts.append(prompt))
+    mover = {"symbol": "PEPE", "name": "Pepe", "changes": {"1h": 6.5, "24h": 25.0},
+             "volume_ratio": None, "reasons": ["gainer_1h", "gainer_24h"]}
+    trend = generate.mover_trend("$PEPE", mover)
+    assert all(isinstance(v, (int, float)) for v in trend["metrics"].values())
+
+    news = generate.generate_trend_news(**generate.news_request(trend))
+
+    assert news["category"] == "meme_coin"
+    assert "price_change_1h: 6.5" in prompts[0]
+    assert "MARKET MOVER: gainer_1h, gainer_24h" in prompts[0]
+    # A non-numeric value in metrics is left out of the prompt instead of raising
+    generate.generate_trend_news("$PEPE", trend["platforms"], {"volume_ratio": None, "mover_reasons": ["x"], "posts": 1500}, [])
+    assert "posts: 1.5K" in prompts[1] and "volume_ratio" not in prompts[1]
@@ -0,0 +1,45 @@
+import copy
+
+from merge import MergeEngine
+
+
+def sources():
+    x = {"foo": {"name": "#Foo", "platforms": {"x": True}, "metrics": {"x_posts": 10, "views": 500},
+                 "locations": ["US"], "source": "x"}}
+    crypto = {"foo": {"name": "$FOO", "platforms": {"dex": True}, "metrics": {"x_posts": 5, "views": 900},
+                      "locations": ["US", "Global"], "source": "dex"},
+              "bar": {"name": "$BAR", "platforms": {"dex": True}, "metrics": {"volume": 1}, "locations": []}}
+    reddit = {"foo": {"name": "foo", "platforms": {"reddit": True}, "metrics": {"views": 100},
+                      "locations": ["UK"]}}
+    return x, crypto, reddit
+
+
+def test_merge_leaves_source_dicts_untouched():
+    x, crypto, reddit = sources()
+    before = copy.deepcopy((x, crypto, reddit))
+
+    engine = MergeEngine()
+    engine.add_all(x)
+    engine.confirm("foo", "google", "google_volume", 42)
+    engine.add_all(crypto, source="crypto", crypto_source=True)
+    engine.add_all(reddit, x_first_penalty=True)
+    for record in engine.records.values():
+        record.to_dict()
+
+    assert (x, crypto, reddit) == before
+
+
+def test_metrics_combine_by_rule():
+    x, crypto, reddit = sources()
+    engine = MergeEngine()
+    engine.add_all(x)
+    engine.add_all(crypto, source="crypto", crypto_source=True)
+    engine.add_all(reddit, x_first_penalty=True)
+
+    foo = engine.get("foo").to_dict()
+    assert foo["metrics"] == {"x_posts": 15, "views": 900}
+    assert foo["platforms"] == {"x": True, "dex": True, "reddit": True}
+    assert foo["locations"] == ["US", "Global", "UK"]
+    assert foo["source"] == "dex"
+    assert not foo.get("crypto_source")
+    assert engine.get("bar").to_dict()["crypto_source"]
@@ -0,0 +1,40 @@
+import datetime
+import json
+
+import pytest
+
+import momentum
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    path = tmp_path / "momentum.json"
+    monkeypatch.setattr(momentum, "_file", momentum.statefile.StateFile(str(path), "Momentum state"))
+    monkeypatch.setattr(momentum, "_states", {})
+    return path
+
+
+def test_cassette_runs_ignore_the_state_file(monkeypatch, store):
+    store.write_text(json.dumps({"trends": {"foo": {"ewma": 90.0, "velocity": 40.0, "acceleration": 5.0,
+                                                   "t": 0, "n": 9}}}))
+    monkeypatch.setattr(momentum.statefile.cassette, "MODE", "replay")
+    now = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+
+    momentum.load()
+    velocity, acceleration = momentum.observe_all(["foo"], [50], now)
+    assert list(velocity) == [0.0] and list(acceleration) == [0.0]
+    momentum.save(now)
+    assert json.loads(store.read_text())["trends"]["foo"]["n"] == 9
+
+
+def test_state_round_trips_outside_cassette_runs(monkeypatch, store):
+    monkeypatch.setattr(momentum.statefile.cassette, "MODE", "")
+    now = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+    momentum.load()
+    momentum.observe_all(["foo"], [50], now)
+    momentum.save(now)
+
+    monkeypatch.setattr(momentum, "_file", momentum.statefile.StateFile(str(store), "Momentum state"))
+    monkeypatch.setattr(momentum, "_states", {})
+    momentum.load()
+    assert momentum.get("foo")["n"] == 1
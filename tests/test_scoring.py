@@ -0,0 +1,68 @@
+import numpy as np
+
+import scoring
+from records import TrendRecord
+
+# A trimmed weights table, so the expected scores below can be checked by hand
+WEIGHTS = {
+    "trend_score": {
+        "per_platform": 25,
+        "metric_thresholds": {"x_posts": [50000, 15], "tiktok_views": [1000000, 20]},
+        "per_location": 5,
+        "location_cap": 25,
+        "cap": 100,
+    },
+    "platform_bonus": {"x": 25, "google": 20, "reddit": 5},
+    "influencer_tier_bonus": {"1": 30, "2": 20},
+    "meme_coin_bonus": 15,
+    "crypto_source_bonus": 20,
+    "non_x_penalty": -10,
+    "per_extra_platform": 15,
+    "primary_platforms": ["x", "google"],
+    "both_primary_bonus": 20,
+    "cap": 100,
+}
+
+
+def record(platforms, metrics=None, locations=(), **extra):
+    data = {"name": "trend", "platforms": platforms, "metrics": metrics or {}, "locations": list(locations), **extra}
+    return TrendRecord.from_dict(data)
+
+
+def test_trend_scores_match_hand_computed_values():
+    candidates = [
+        # 2 platforms (50) + x_posts over its threshold (15) + 2 distinct locations (10)
+        record({"x": True, "google": True}, {"x_posts": 60000}, ["US", "UK", "US"]),
+        # Thresholds are strict: 50000 x_posts earns nothing; 1 platform (25) + 1 location (5)
+        record({"x": True}, {"x_posts": 50000}, ["US"]),
+        # 4 platforms (100) + tiktok_views (20) + locations capped at 25 -> capped at 100
+        record({"x": True, "google": True, "tiktok": True, "reddit": True}, {"tiktok_views": 2_000_000},
+               [f"L{i}" for i in range(10)]),
+        # Every platform key counts, even a falsy one
+        record({"reddit": False}),
+        record({}),
+    ]
+    scores = scoring.trend_scores(scoring.pack_features(candidates, WEIGHTS), WEIGHTS)
+    assert scores.tolist() == [75, 30, 100, 25, 0]
+
+
+def test_signal_scores_add_bonuses_and_penalties():
+    candidates = [
+        # trend 30 + x bonus 25 + tier-2 influencer 20
+        record({"x": True}, locations=["US"], source="influencer", influencer_tier=2),
+        # trend 25 + reddit bonus 5 - non-X penalty 10
+        TrendRecord.from_dict({"name": "r", "platforms": {"reddit": True}}, x_first_penalty=True),
+        # trend 25 + crypto source 20 + meme coin 15
+        TrendRecord.from_dict({"name": "$C", "platforms": {"dex": True}, "is_meme_coin": True}, crypto_source=True),
+        # trend 50 + x 25 + google 20 + one extra platform 15 + both primaries 20 = 130
+        record({"x": True, "google": True}),
+    ]
+    features = scoring.pack_features(candidates, WEIGHTS)
+    assert scoring.signal_scores(features, WEIGHTS, capped=False).tolist() == [75, 20, 60, 130]
+    assert scoring.signal_scores(features, WEIGHTS).tolist() == [75, 20, 60, 100]
+
+
+def test_top_k_keeps_candidate_order_on_ties():
+    scores = np.array([10, 30, 20, 30, 20, 5])
+    assert scoring.top_k(scores, 3).tolist() == [1, 3, 2]
+    assert scoring.top_k(scores, 10).tolist() == [1, 3, 2, 4, 0, 5]
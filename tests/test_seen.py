@@ -0,0 +1,50 @@
+import pytest
+
+import seen
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000]
+    monkeypatch.setattr(seen, "_store", {})
+    monkeypatch.setattr(seen._file, "loaded", True)
+    monkeypatch.setattr(seen.time, "time", lambda: now[0])
+    return now
+
+
+def test_ids_are_new_once_per_ttl(clock):
+    ttl = seen.TTLS["reddit"]
+    assert seen.observe("reddit", ["t3_a", "t3_b", "t3_a", ""]) == {"t3_a", "t3_b"}
+    clock[0] += 900
+    assert seen.observe("reddit", ["t3_a", "t3_c"]) == {"t3_c"}
+
+    # The TTL runs from the first sighting; repeats don't extend it
+    clock[0] += ttl - 900
+    assert seen.observe("reddit", ["t3_a", "t3_b", "t3_c"]) == {"t3_a", "t3_b"}
+
+
+def test_repeats_leave_the_store_unchanged(clock):
+    link = "https://example.com/news/" + "x" * 100
+    seen.observe("news", ["guid-1", link])
+    before = {source: dict(items) for source, items in seen._store.items()}
+    clock[0] += 900
+    assert seen.observe("news", [link, "guid-1"]) == set()
+    assert seen._store == before
+    assert len(seen._key(link)) == 16
+
+
+def test_store_round_trips_and_survives_a_corrupt_file(monkeypatch, tmp_path, capsys):
+    path = tmp_path / "seen_items.json"
+    monkeypatch.setattr(seen.statefile.cassette, "MODE", "")
+    monkeypatch.setattr(seen, "_file", seen.statefile.StateFile(str(path), "Seen-item store", "starting empty"))
+    monkeypatch.setattr(seen, "_store", {})
+    assert seen.observe("reddit", ["t3_a"]) == {"t3_a"}
+    seen.save()
+
+    monkeypatch.setattr(seen._file, "loaded", False)
+    assert seen.observe("reddit", ["t3_a"]) == set()
+
+    path.write_text("{not json")
+    monkeypatch.setattr(seen._file, "loaded", False)
+    assert seen.observe("reddit", ["t3_a"]) == {"t3_a"}
+    assert "Seen-item store unreadable" in capsys.readouterr().out
@@ -0,0 +1,26 @@
+import workqueue
+
+
+def test_lease_expiring_on_last_attempt_fails_the_job(tmp_path):
+    conn = workqueue.connect(str(tmp_path / "queue.sqlite3"))
+    workqueue.enqueue(conn, "run", [("trend", {"name": "trend"})])
+
+    for attempt in range(1, workqueue.MAX_ATTEMPTS + 1):
+        job = workqueue.lease(conn, "worker", "run", seconds=-1)
+        assert job["attempt"] == attempt
+
+    assert workqueue.lease(conn, "worker", "run") is None
+    assert workqueue.counts(conn, "run") == {"failed": 1}
+    error, = conn.execute("SELECT error FROM jobs WHERE run_id = 'run'").fetchone()
+    assert error == "lease expired"
+
+
+def test_expired_lease_with_attempts_left_is_handed_out_again(tmp_path):
+    conn = workqueue.connect(str(tmp_path / "queue.sqlite3"))
+    workqueue.enqueue(conn, "run", [("trend", {"name": "trend"})])
+
+    workqueue.lease(conn, "slow", "run", seconds=-1)
+    job = workqueue.lease(conn, "fast", "run")
+    assert job["attempt"] == 2
+    assert workqueue.complete(conn, job, "fast", {"ok": True})
+    assert workqueue.counts(conn, "run") == {"done": 1}
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Trend Radar - SQLite Work Queue
+PHASE 7 can hand its per-trend work (the Claude copy) to several worker
+processes: the coordinator enqueues one job per selected trend, workers lease
+jobs (a lease that runs out frees the job for someone else), store their
+result and the coordinator commits each result exactly once. Completing a job
+whose lease was lost is a no-op, so a slow worker can never overwrite or
+duplicate a result. The queue is one SQLite file (TREND_QUEUE, default
+state/workqueue.sqlite3); workers on other machines need it on storage with
+working file locks.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import contextlib
+
+# ================= CONFIG =================
+
+QUEUE_FILE = os.getenv("TREND_QUEUE", "state/workqueue.sqlite3")
+LEASE_SECONDS = 120          # A job not completed within this is handed out again
+MAX_ATTEMPTS = 3             # Failed attempts before a job is given up
+KEEP_RUNS_SECONDS = 24 * 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    run_id        TEXT NOT NULL,
+    key           TEXT NOT NULL,
+    rank          INTEGER NOT NULL,
+    payload       TEXT NOT NULL,
+    status        TEXT NOT NULL DEFAULT 'pending',   -- pending | leased | done | committed | failed
+    lease_owner   TEXT,
+    lease_expires REAL,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    result        TEXT,
+    error         TEXT,
+    created       REAL NOT NULL,
+    PRIMARY KEY (run_id, key)
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (run_id, status, rank);
+"""
+
+# ================= CONNECTION =================
+
+def connect(path=None):
+    path = path or QUEUE_FILE
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Autocommit mode - transactions are opened explicitly where they matter
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+@contextlib.contextmanager
+def _transaction(conn):
+    """BEGIN IMMEDIATE takes the write lock up front so two workers can't lease the same job"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+# ================= PRODUCER =================
+
+def enqueue(conn, run_id, items):
+    """Add (key, payload) jobs in priority order; re-enqueueing a known key is ignored"""
+    now = time.time()
+    with _transaction(conn):
+        conn.execute("DELETE FROM jobs WHERE created < ?", (now - KEEP_RUNS_SECONDS,))
+        conn.executemany(
+            "INSERT OR IGNORE INTO jobs (run_id, key, rank, payload, created) VALUES (?, ?, ?, ?, ?)",
+            [(run_id, key, rank, json.dumps(payload, default=str), now) for rank, (key, payload) in enumerate(items)]
+        )
+
+def counts(conn, run_id):
+    """{status: n} for a run"""
+    return dict(conn.execute("SELECT status, COUNT(*) FROM jobs WHERE run_id = ? GROUP BY status", (run_id,)))
+
+def results(conn, run_id):
+    """{key: result} for completed jobs not committed yet"""
+    rows = conn.execute("SELECT key, result FROM jobs WHERE run_id = ? AND status = 'done' ORDER BY rank", (run_id,))
+    return {key: json.loads(result) for key, result in rows}
+
+def mark_committed(conn, run_id, keys):
+    """Record that results were written, so a second commit pass skips them"""
+    with _transaction(conn):
+        conn.executemany(
+            "UPDATE jobs SET status = 'committed' WHERE run_id = ? AND key = ? AND status = 'done'",
+            [(run_id, key) for key in keys]
+        )
+
+def cancel(conn, run_id):
+    """Stop handing out this run's remaining jobs (the coordinator ran out of time)"""
+    conn.execute("UPDATE jobs SET status = 'failed', error = 'cancelled' WHERE run_id = ? AND status IN ('pending', 'leased')", (run_id,))
+
+# ================= WORKERS =================
+
+def lease(conn, owner, run_id=None, seconds=LEASE_SECONDS):
+    """Claim the best-ranked free job (pending, or leased with an expired lease); None when there is none"""
+    now = time.time()
+    with _transaction(conn):
+        # An expired lease on its last attempt is never handed out again - give the job up
+        conn.execute(
+            "UPDATE jobs SET status = 'failed', error = 'lease expired', lease_owner = NULL, lease_expires = NULL "
+            "WHERE (? IS NULL OR run_id = ?) AND status = 'leased' AND lease_expires < ? AND attempts >= ?",
+            (run_id, run_id, now, MAX_ATTEMPTS)
+        )
+        row = conn.execute(
+            "SELECT run_id, key, payload, attempts FROM jobs "
+            "WHERE (? IS NULL OR run_id = ?) "
+            "AND (status = 'pending' OR (status = 'leased' AND lease_expires < ? AND attempts < ?)) "
+            "ORDER BY created DESC, rank LIMIT 1",
+            (run_id, run_id, now, MAX_ATTEMPTS)
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            "UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1 "
+            "WHERE run_id = ? AND key = ?",
+            (owner, now + seconds, row[0], row[1])
+        )
+    return {"run_id": row[0], "key": row[1], "payload": json.loads(row[2]), "attempt": row[3] + 1}
+
+def complete(conn, job, owner, result):
+    """Store a job's result; returns False when the lease was lost (someone else owns the job now)"""
+    cursor = conn.execute(
+        "UPDATE jobs SET status = 'done', result = ?, lease_owner = NULL, lease_expires = NULL "
+        "WHERE run_id = ? AND key = ? AND status = 'leased' AND lease_owner = ?",
+        (json.dumps(result, default=str), job["run_id"], job["key"], owner)
+    )
+    return cursor.rowcount == 1
+
+def fail(conn, job, owner, error):
+    """Release a job after an error; it is retried until MAX_ATTEMPTS, then given up"""
+    conn.execute(
+        "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+        "error = ?, lease_owner = NULL, lease_expires = NULL "
+        "WHERE run_id = ? AND key = ? AND status = 'leased' AND lease_owner = ?",
+        (MAX_ATTEMPTS, str(error)[:500], job["run_id"], job["key"], owner)
+    )